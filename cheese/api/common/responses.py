@@ -1,7 +1,19 @@
 # Copyright (c) 2024
 # License: MIT
 
-from typing import Any, Dict, Optional, List
+import dataclasses
+import hashlib
+import json
+from typing import Any, Callable, Dict, Optional, List
+
+import frappe
+from frappe.utils.response import json_handler
+from werkzeug.wrappers import Response
+
+try:
+	import orjson
+except ImportError:
+	orjson = None
 
 
 def success(
@@ -20,16 +32,11 @@ def success(
 	Returns:
 		Formatted success response
 	"""
-	response = {
-		"success": True,
-		"message": message,
-		"data": data or {}
-	}
-	
+	# Built as one literal per shape; `data` stays a fresh dict because callers
+	# add keys to res["data"] after the fact.
 	if meta:
-		response["meta"] = meta
-	
-	return response
+		return {"success": True, "message": message, "data": data or {}, "meta": meta}
+	return {"success": True, "message": message, "data": data or {}}
 
 
 def error(
@@ -60,7 +67,6 @@ def error(
 	}
 	
 	# Set HTTP status code in Frappe response
-	import frappe
 	frappe.response["http_status_code"] = status_code
 	
 	return response
@@ -109,6 +115,32 @@ def paginated_response(
 	}
 
 
+def window_total(rows: List[Dict[str, Any]], page: int, count_rows: Callable[[], int]) -> int:
+	"""
+	Total match count of a page selected with ``COUNT(*) OVER() AS total_count``
+
+	Every row carries the full count, so no second COUNT query is needed; the
+	column is popped from the rows. Past the last page there is no row to read
+	it from, and count_rows() runs the separate COUNT instead.
+	
+	Args:
+		rows: Rows of the page query, each with a total_count column
+		page: Current page number
+		count_rows: Callable returning the number of matching rows
+		
+	Returns:
+		Total number of matching rows
+	"""
+	if rows:
+		total = int(rows[0]["total_count"] or 0)
+		for row in rows:
+			row.pop("total_count", None)
+		return total
+	if page > 1:
+		return int(count_rows() or 0)
+	return 0
+
+
 def created(
 	message: str = "Resource created successfully",
 	data: Optional[Dict[str, Any]] = None
@@ -123,7 +155,6 @@ def created(
 	Returns:
 		Formatted created response
 	"""
-	import frappe
 	frappe.response["http_status_code"] = 201
 	return success(message, data)
 
@@ -190,3 +221,117 @@ def forbidden(message: str = "Forbidden") -> Dict[str, Any]:
 		Formatted forbidden response
 	"""
 	return error(message, "FORBIDDEN", {}, 403)
+
+
+def _json_default(obj: Any) -> Any:
+	"""Stdlib json fallback: dataclass rows as dicts, everything else via Frappe."""
+	if dataclasses.is_dataclass(obj) and not isinstance(obj, type):
+		return dataclasses.asdict(obj)
+	return json_handler(obj)
+
+
+def json_response(payload: Dict[str, Any]):
+	"""
+	Serialize a response payload once and hand Frappe a ready-made Response
+
+	Whitelisted methods that return a werkzeug Response bypass Frappe's stdlib
+	JSON encoding. The payload is wrapped in the usual ``message`` envelope so
+	clients see the same body; values orjson does not encode natively are
+	delegated to Frappe's json_handler, so dates and times keep their format.
+	
+	Args:
+		payload: Response dictionary (e.g. the result of success())
+		
+	Returns:
+		werkzeug Response with an application/json body
+	"""
+	body = {"message": payload}
+	if orjson:
+		# Dataclass rows (e.g. availability SlotRow) are serialized natively.
+		data = orjson.dumps(
+			body,
+			default=json_handler,
+			option=orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS,
+		)
+	else:
+		data = json.dumps(body, default=_json_default, separators=(",", ":"))
+
+	return Response(
+		data,
+		status=frappe.response.get("http_status_code") or 200,
+		mimetype="application/json",
+	)
+
+
+def parse_json(value: str) -> Any:
+	"""
+	Decode a JSON request argument, using orjson when it is installed
+
+	Raises ValueError on malformed input with either backend.
+	
+	Args:
+		value: JSON text
+		
+	Returns:
+		Decoded Python object
+	"""
+	if orjson:
+		return orjson.loads(value)
+	return json.loads(value)
+
+
+def record_exists(doctype: str, name: Any) -> bool:
+	"""
+	Check that a record exists by name with ``SELECT EXISTS(...)``
+
+	Same answer as ``frappe.db.exists(doctype, name)`` for a plain name, but
+	the database stops at the first primary-key hit and returns a single 0/1
+	instead of the row.
+	
+	Args:
+		doctype: DocType name (a literal from the caller, never user input)
+		name: Record name
+		
+	Returns:
+		True if the record exists
+	"""
+	if not name:
+		return False
+	if "`" in doctype:
+		raise ValueError(f"Invalid doctype: {doctype}")
+	return bool(
+		frappe.db.sql(f"SELECT EXISTS(SELECT 1 FROM `tab{doctype}` WHERE name=%s)", (name,))[0][0]
+	)
+
+
+# Identical failures are written to Error Log at most once per window.
+_ERROR_LOG_DEDUP_SECONDS = 300
+
+
+def log_api_error(message: str) -> None:
+	"""
+	Record an unexpected handler failure without blocking the error response
+
+	Drop-in for ``frappe.log_error(message)`` in API except blocks. The
+	traceback is captured here, while the exception is still being handled,
+	and the Error Log insert runs on the short queue. Repeats of the same
+	message within the dedup window are dropped so an incident does not flood
+	the table.
+	
+	Args:
+		message: Error summary, used as the Error Log title
+	"""
+	key = "cheese:api_error:" + hashlib.blake2b(message.encode(), digest_size=8).hexdigest()
+	try:
+		if frappe.cache.get_value(key):
+			return
+		frappe.cache.set_value(key, 1, expires_in_sec=_ERROR_LOG_DEDUP_SECONDS)
+		frappe.enqueue(
+			"frappe.log_error",
+			queue="short",
+			title=message,
+			message=frappe.get_traceback(),
+		)
+	except Exception:
+		# Redis unavailable: fall back to logging inline rather than losing it
+		frappe.log_error(message)
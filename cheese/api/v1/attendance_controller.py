@@ -3,10 +3,17 @@
 
 import frappe
 from frappe import _
+from frappe.query_builder import DocType, Order
+from frappe.query_builder import functions as fn
+from pypika import analytics as an
 from frappe.utils import now_datetime, getdate, cint, get_datetime
-from cheese.api.common.responses import success, created, error, not_found, validation_error, paginated_response
+from cheese.api.common.responses import success, created, error, not_found, validation_error, paginated_response, json_response, window_total
+from cheese.cheese.utils.capacity import parse_date
 from cheese.cheese.utils.access import assert_record_access, assert_company_value, scope_filters
 
+# Ticket statuses that may be checked in or marked as no-show.
+_CHECKIN_ALLOWED_STATUSES = frozenset({"CONFIRMED"})
+
 
 @frappe.whitelist()
 def manual_check_in(contact_id=None, ticket_id=None, reservation_code=None):
@@ -29,42 +36,32 @@ def manual_check_in(contact_id=None, ticket_id=None, reservation_code=None):
 		ticket = None
 		
 		if ticket_id:
-			if not frappe.db.exists("Cheese Ticket", ticket_id):
+			try:
+				ticket = frappe.get_doc("Cheese Ticket", ticket_id)
+			except frappe.DoesNotExistError:
 				return not_found("Ticket", ticket_id)
-			ticket = frappe.get_doc("Cheese Ticket", ticket_id)
 		elif reservation_code:
 			# Search by ticket name/code
-			ticket = frappe.db.get_value(
-				"Cheese Ticket",
-				{"name": reservation_code},
-				"*",
-				as_dict=True
-			)
-			if ticket:
-				ticket = frappe.get_doc("Cheese Ticket", ticket.name)
-			else:
+			ticket_name = frappe.db.get_value("Cheese Ticket", {"name": reservation_code}, "name")
+			if not ticket_name:
 				return not_found("Ticket", reservation_code)
+			ticket = frappe.get_doc("Cheese Ticket", ticket_name)
 		elif contact_id:
-			# Get today's tickets for this contact
+			# Get today's tickets for this contact (slot active today, joined in SQL)
 			today = getdate()
-			slots = frappe.get_all(
-				"Cheese Experience Slot",
-				filters={"date": today},
-				fields=["name"]
-			)
-			
-			if not slots:
-				return validation_error("No slots found for today")
-			
-			tickets = frappe.get_all(
-				"Cheese Ticket",
-				filters={
-					"contact": contact_id,
-					"slot": ["in", [s.name for s in slots]],
-					"status": "CONFIRMED"
-				},
-				fields=["name"],
-				limit=1
+			Ticket = DocType("Cheese Ticket")
+			Slot = DocType("Cheese Experience Slot")
+			tickets = (
+				frappe.qb.from_(Ticket)
+				.inner_join(Slot)
+				.on(Ticket.slot == Slot.name)
+				.select(Ticket.name)
+				.where(Ticket.contact == contact_id)
+				.where(Ticket.status.isin(list(_CHECKIN_ALLOWED_STATUSES)))
+				.where(Slot.date_from <= today)
+				.where(Slot.date_to >= today)
+				.limit(1)
+				.run(as_dict=True)
 			)
 			
 			if not tickets:
@@ -78,7 +75,7 @@ def manual_check_in(contact_id=None, ticket_id=None, reservation_code=None):
 		assert_record_access("Cheese Ticket", ticket.name)
 
 		# Validate ticket can be checked in
-		if ticket.status != "CONFIRMED":
+		if ticket.status not in _CHECKIN_ALLOWED_STATUSES:
 			return validation_error(
 				f"Only CONFIRMED tickets can be checked in. Current status: {ticket.status}",
 				{"current_status": ticket.status}
@@ -109,19 +106,15 @@ def manual_check_in(contact_id=None, ticket_id=None, reservation_code=None):
 		})
 		attendance.insert()
 		
-		# Mark QR as used if exists
-		qr_token = frappe.db.get_value(
+		# Mark QR as used if exists. CheeseQRToken.mark_used() only flips the
+		# status, so a single filtered UPDATE replaces the lookup + load + save.
+		frappe.db.set_value(
 			"Cheese QR Token",
 			{"ticket": ticket.name, "status": "ACTIVE"},
-			"name"
+			"status",
+			"USED"
 		)
 		
-		if qr_token:
-			qr = frappe.get_doc("Cheese QR Token", qr_token)
-			qr.mark_used()
-		
-		frappe.db.commit()
-		
 		return success(
 			"Manual check-in successful",
 			{
@@ -129,13 +122,15 @@ def manual_check_in(contact_id=None, ticket_id=None, reservation_code=None):
 				"old_status": old_status,
 				"new_status": ticket.status,
 				"attendance_id": attendance.name,
-				"checked_in_at": str(attendance.checked_in_at),
+				"checked_in_at": attendance.checked_in_at,
 				"method": "MANUAL"
 			}
 		)
 	except frappe.ValidationError as e:
+		frappe.db.rollback()
 		return validation_error(str(e))
 	except Exception as e:
+		frappe.db.rollback()
 		frappe.log_error(f"Error in manual_check_in: {str(e)}")
 		return error("Failed to perform manual check-in", "SERVER_ERROR", {"error": str(e)}, 500)
 
@@ -155,23 +150,28 @@ def get_attendance_record(attendance_id):
 		if not attendance_id:
 			return validation_error("attendance_id is required")
 		
-		if not frappe.db.exists("Cheese Attendance", attendance_id):
+		attendance = frappe.db.get_value(
+			"Cheese Attendance",
+			attendance_id,
+			["name", "ticket", "checked_in_at", "method", "status"],
+			as_dict=True
+		)
+		if not attendance:
 			return not_found("Attendance", attendance_id)
 
 		assert_record_access("Cheese Attendance", attendance_id)
 
-		attendance = frappe.get_doc("Cheese Attendance", attendance_id)
-		ticket = frappe.get_doc("Cheese Ticket", attendance.ticket)
+		ticket_status = frappe.db.get_value("Cheese Ticket", attendance.ticket, "status")
 		
 		return success(
 			"Attendance record retrieved successfully",
 			{
 				"attendance_id": attendance.name,
-				"ticket_id": ticket.name,
-				"checked_in_at": str(attendance.checked_in_at) if attendance.checked_in_at else None,
+				"ticket_id": attendance.ticket,
+				"checked_in_at": attendance.checked_in_at,
 				"method": attendance.method,
 				"status": attendance.status,
-				"ticket_status": ticket.status
+				"ticket_status": ticket_status
 			}
 		)
 	except Exception as e:
@@ -215,106 +215,73 @@ def list_attendance(
 		# Build filters. Cheese Attendance carries its own `company` column, so
 		# scope_filters enforces tenant isolation directly on the attendance query.
 		filters = scope_filters({})
-		
-		# Get tickets matching filters first
-		ticket_filters = {}
-		if company_id:
-			ticket_filters["company"] = company_id
-		elif establishment_id:
-			ticket_filters["company"] = establishment_id
+
+		# Ticket and slot filters are applied through JOINs so the matching
+		# ticket ids never round-trip through Python.
+		Attendance = DocType("Cheese Attendance")
+		Ticket = DocType("Cheese Ticket")
+		Slot = DocType("Cheese Experience Slot")
+
+		query = (
+			frappe.qb.from_(Attendance)
+			.left_join(Ticket)
+			.on(Attendance.ticket == Ticket.name)
+		)
+		for field, value in filters.items():
+			query = query.where(Attendance[field] == value)
+
+		ticket_company = company_id or establishment_id
+		if ticket_company:
+			query = query.where(Ticket.company == ticket_company)
 		if route_id:
-			ticket_filters["route"] = route_id
+			query = query.where(Ticket.route == route_id)
 		if experience_id:
-			ticket_filters["experience"] = experience_id
-		
-		ticket_ids = []
-		if ticket_filters:
-			tickets = frappe.get_all(
-				"Cheese Ticket",
-				filters=ticket_filters,
-				fields=["name"]
-			)
-			ticket_ids = [t.name for t in tickets]
-		
-		if ticket_ids:
-			filters["ticket"] = ["in", ticket_ids]
-		elif ticket_filters:
-			# No tickets match, return empty
-			return paginated_response(
-				[],
-				"No attendance records found",
-				page=page,
-				page_size=page_size,
-				total=0
-			)
-		
+			query = query.where(Ticket.experience == experience_id)
+
 		# Date filter requires checking ticket slot
 		if date:
-			date_obj = getdate(date)
-			slots = frappe.get_all(
-				"Cheese Experience Slot",
-				filters={"date": date_obj},
-				fields=["name"]
+			date_obj = parse_date(date)
+			query = (
+				query.inner_join(Slot)
+				.on(Ticket.slot == Slot.name)
+				.where(Slot.date_from <= date_obj)
+				.where(Slot.date_to >= date_obj)
 			)
-			
-			if slots:
-				slot_tickets = frappe.get_all(
-					"Cheese Ticket",
-					filters={"slot": ["in", [s.name for s in slots]]},
-					fields=["name"]
-				)
-				slot_ticket_ids = [t.name for t in slot_tickets]
-				
-				if "ticket" in filters:
-					filters["ticket"] = ["in", list(set(filters["ticket"]) & set(slot_ticket_ids))]
-				else:
-					filters["ticket"] = ["in", slot_ticket_ids]
-			else:
-				return paginated_response(
-					[],
-					"No attendance records found for this date",
-					page=page,
-					page_size=page_size,
-					total=0
-				)
-		
-		attendance_records = frappe.get_all(
-			"Cheese Attendance",
-			filters=filters,
-			fields=["name", "ticket", "checked_in_at", "method", "status", "modified"],
-			limit_start=(page - 1) * page_size,
-			limit_page_length=page_size,
-			order_by="checked_in_at desc"
+
+		attendance_records = (
+			query.select(
+				Attendance.name,
+				Attendance.ticket,
+				Attendance.checked_in_at,
+				Attendance.method,
+				Attendance.status,
+				Attendance.modified,
+				Ticket.experience.as_("experience_id"),
+				Ticket.route.as_("route_id"),
+				Ticket.company.as_("company_id"),
+				Ticket.party_size,
+				Ticket.status.as_("ticket_status"),
+				# Every row carries the full match count, so no second COUNT query.
+				an.Count(Attendance.name).over().as_("total_count"),
+			)
+			.orderby(Attendance.checked_in_at, order=Order.desc)
+			.limit(page_size)
+			.offset((page - 1) * page_size)
+			.run(as_dict=True)
 		)
+
+		total = window_total(attendance_records, page, lambda: query.select(fn.Count("*")).run()[0][0])
 		
-		# Enrich with ticket info
-		for record in attendance_records:
-			if record.ticket:
-				ticket = frappe.db.get_value(
-					"Cheese Ticket",
-					record.ticket,
-					["experience", "party_size", "status"],
-					as_dict=True
-				)
-				if ticket:
-					record["experience_id"] = ticket.experience
-					record["route_id"] = ticket.route
-					record["company_id"] = ticket.company
-					record["party_size"] = ticket.party_size
-					record["ticket_status"] = ticket.status
-		
-		total = frappe.db.count("Cheese Attendance", filters=filters)
-		
-		return paginated_response(
+		return json_response(paginated_response(
 			attendance_records,
 			"Attendance records retrieved successfully",
 			page=page,
 			page_size=page_size,
 			total=total
-		)
+		))
 	except Exception as e:
 		frappe.log_error(f"Error in list_attendance: {str(e)}")
-		return error("Failed to list attendance", "SERVER_ERROR", {"error": str(e)}, 500)
+		return json_response(error("Failed to list attendance", "SERVER_ERROR", {"error": str(e)}, 500))
 
 
 @frappe.whitelist()
@@ -333,14 +300,14 @@ def mark_no_show_manual(ticket_id, reason=None):
 		if not ticket_id:
 			return validation_error("ticket_id is required")
 		
-		if not frappe.db.exists("Cheese Ticket", ticket_id):
+		try:
+			ticket = frappe.get_doc("Cheese Ticket", ticket_id)
+		except frappe.DoesNotExistError:
 			return not_found("Ticket", ticket_id)
 
 		assert_record_access("Cheese Ticket", ticket_id)
-
-		ticket = frappe.get_doc("Cheese Ticket", ticket_id)
 		
-		if ticket.status not in ["CONFIRMED"]:
+		if ticket.status not in _CHECKIN_ALLOWED_STATUSES:
 			return validation_error(
 				f"Cannot mark no-show for ticket with status: {ticket.status}",
 				{"current_status": ticket.status}
@@ -360,8 +327,6 @@ def mark_no_show_manual(ticket_id, reason=None):
 		ticket.status = "NO_SHOW"
 		ticket.save()
 		
-		frappe.db.commit()
-		
 		return success(
 			"Ticket marked as no-show",
 			{
@@ -372,7 +337,9 @@ def mark_no_show_manual(ticket_id, reason=None):
 			}
 		)
 	except frappe.ValidationError as e:
+		frappe.db.rollback()
 		return validation_error(str(e))
 	except Exception as e:
+		frappe.db.rollback()
 		frappe.log_error(f"Error in mark_no_show_manual: {str(e)}")
 		return error("Failed to mark no-show", "SERVER_ERROR", {"error": str(e)}, 500)
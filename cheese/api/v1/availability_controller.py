@@ -1,13 +1,64 @@
 # Copyright (c) 2024
 # License: MIT
 
+from dataclasses import dataclass
+from datetime import date
+from typing import Any
+
 import frappe
 from frappe import _
-from frappe.utils import add_days, getdate, cint
-from cheese.cheese.utils.capacity import get_available_capacity, slot_calendar_days_in_range
-from cheese.api.common.responses import success, error, not_found, validation_error
+from frappe.utils import add_days, cint, today
+from frappe.utils.caching import redis_cache
+from cheese.cheese.utils.capacity import get_available_capacity_bulk, parse_date, slot_calendar_days_in_range
+from cheese.api.common.responses import success, error, not_found, validation_error, json_response
 from cheese.api.v1.user_controller import _get_current_user_company
 
+# Slot statuses listed by the availability endpoints (BLOCKED slots are hidden).
+_SLOT_VISIBLE_STATUSES = ("OPEN", "CLOSED")
+
+
+@dataclass(slots=True)
+class SlotRow:
+	"""One row of get_available_slots per slot and calendar day.
+
+	Slotted to keep per-row allocations small on wide date ranges; serialized
+	as a plain object by json_response(). Supports row["field"] reads so it
+	can be handled alongside the room-derived dict rows.
+	"""
+
+	slot_id: str
+	selected_date: date
+	calendar_date: date
+	date_from: date | None
+	date_to: date | None
+	time_from: Any
+	time_to: Any
+	max_capacity: int
+	available_capacity: int
+	available_rooms: int | None
+	room_size: int | None
+	max_guests_available: int | None
+	requested_rooms: int | None
+	requested_guests: int | None
+	experience_type: str | None
+	is_room: bool
+	slot_status: str
+	is_available: bool
+	# Backward compatibility: `date` is the occurrence day for this row
+	date: date
+	time: Any
+
+	def __getitem__(self, key):
+		return getattr(self, key)
+
+
+@dataclass(slots=True)
+class ListingSlotRow(SlotRow):
+	"""SlotRow of the multi-experience listing, which also names its experience."""
+
+	experience_id: str
+	experience_name: str
+
 
 def _hotel_nightly_availability(experience_id, date_from_obj, date_to_obj):
 	"""Room-derived availability per day for a HOTEL experience.
@@ -17,20 +68,28 @@ def _hotel_nightly_availability(experience_id, date_from_obj, date_to_obj):
 	never consulted. Returns (rows, total_active_rooms) where each row is
 	{"date": "YYYY-MM-DD", "available": int}.
 	"""
+	return _hotel_nightly_availability_many([experience_id], date_from_obj, date_to_obj)[experience_id]
+
+
+def _hotel_nightly_availability_many(experience_ids, date_from_obj, date_to_obj):
+	"""_hotel_nightly_availability for several HOTEL experiences in two queries.
+
+	Returns {experience_id: (rows, total_active_rooms)}.
+	"""
 	from cheese.cheese.utils.room_assignment import ACTIVE_STAY_STATUSES
 
 	active_rooms = frappe.get_all(
 		"Cheese Hotel Room",
-		filters={"room_type": experience_id, "status": "ACTIVE"},
-		pluck="name",
+		filters={"room_type": ["in", list(experience_ids)], "status": "ACTIVE"},
+		fields=["name", "room_type"],
 	)
-	total = len(active_rooms)
+	room_type_by_room = {r.name: r.room_type for r in active_rooms}
 	end_excl = add_days(date_to_obj, 1)
 	stays = (
 		frappe.get_all(
 			"Cheese Room Stay",
 			filters={
-				"room": ["in", active_rooms],
+				"room": ["in", list(room_type_by_room)],
 				"status": ["in", list(ACTIVE_STAY_STATUSES)],
 				"check_in": ["<", str(end_excl)],
 				"check_out": [">", str(date_from_obj)],
@@ -40,14 +99,25 @@ def _hotel_nightly_availability(experience_id, date_from_obj, date_to_obj):
 		if active_rooms
 		else []
 	)
-	rows = []
-	cal_day = date_from_obj
-	while cal_day <= date_to_obj:
-		d = str(cal_day)
-		busy = {s.room for s in stays if str(s.check_in) <= d < str(s.check_out)}
-		rows.append({"date": d, "available": max(0, total - len(busy))})
-		cal_day = add_days(cal_day, 1)
-	return rows, total
+	totals = {exp_id: 0 for exp_id in experience_ids}
+	for room_type in room_type_by_room.values():
+		totals[room_type] += 1
+	stays_by_type = {exp_id: [] for exp_id in experience_ids}
+	for stay in stays:
+		stays_by_type[room_type_by_room[stay.room]].append(stay)
+
+	result = {}
+	for exp_id in experience_ids:
+		total = totals[exp_id]
+		rows = []
+		cal_day = date_from_obj
+		while cal_day <= date_to_obj:
+			d = str(cal_day)
+			busy = {s.room for s in stays_by_type[exp_id] if str(s.check_in) <= d < str(s.check_out)}
+			rows.append({"date": d, "available": max(0, total - len(busy))})
+			cal_day = add_days(cal_day, 1)
+		result[exp_id] = (rows, total)
+	return result
 
 
 def _hotel_slot_rows(experience_doc, date_from_obj, date_to_obj, rooms_requested=1, guests=None, include_experience_cols=False):
@@ -96,8 +166,134 @@ def _hotel_slot_rows(experience_doc, date_from_obj, date_to_obj, rooms_requested
 	return rows
 
 
-@frappe.whitelist()
-def get_available_slots(experience_id=None, date=None, date_from=None, date_to=None, guests=None, rooms_requested=1):
+def _availability_version_key(experience_id):
+	"""Cache version of get_available_slots for one experience (None: the multi-experience listing)."""
+	return f"cheese:availability_version:{experience_id or 'all'}"
+
+
+@redis_cache(ttl=5)
+def _compute_slots(experience_id, date_from, date_to, user_company, guests, rooms_requested, version=0):
+	"""Slot rows for get_available_slots, cached for a few seconds.
+
+	Dates are ISO strings already clamped to today. Returns None when a
+	scoped company has no experiences. version only takes part in the cache
+	key; the ticket and slot hooks bump it (events.clear_availability_cache).
+	"""
+	date_from_obj = parse_date(date_from)
+	date_to_obj = parse_date(date_to)
+	today_obj = parse_date(today())
+	experience = frappe.get_cached_doc("Cheese Experience", experience_id) if experience_id else None
+
+	# Build filters for slots
+	# Slots have date_from and date_to fields, so we need to check for overlap
+	# A slot overlaps if: slot.date_from <= date_to AND slot.date_to >= date_from
+	slot_filters = {
+		"slot_status": ["in", _SLOT_VISIBLE_STATUSES]
+	}
+	
+	# Filter slots that overlap with the requested date range
+	# Using OR conditions to find slots that overlap
+	slot_filters["date_from"] = ["<=", date_to_obj]
+	slot_filters["date_to"] = [">=", date_from_obj]
+
+	if experience_id:
+		slot_filters["experience"] = experience_id
+	elif user_company:
+		allowed_experience_ids = frappe.get_all(
+			"Cheese Experience",
+			filters={"company": user_company},
+			pluck="name",
+		)
+		if not allowed_experience_ids:
+			return None
+		slot_filters["experience"] = ["in", allowed_experience_ids]
+
+	# Hotels never use slots: exclude their (legacy) slots from the listing;
+	# room-derived rows are appended per hotel experience further below.
+	hotel_scope_filters = {"experience_type": "HOTEL"}
+	if user_company:
+		hotel_scope_filters["company"] = user_company
+	hotel_ids = [] if experience_id else frappe.get_all(
+		"Cheese Experience", filters=hotel_scope_filters, pluck="name"
+	)
+	if hotel_ids:
+		current = slot_filters.get("experience")
+		if isinstance(current, list) and current and current[0] == "in":
+			slot_filters["experience"] = ["in", [x for x in current[1] if x not in hotel_ids] or ["__none__"]]
+		else:
+			slot_filters["experience"] = ["not in", hotel_ids]
+
+	# Get slots
+	slots = frappe.get_all(
+		"Cheese Experience Slot",
+		filters=slot_filters,
+		fields=["name", "experience", "date_from", "date_to", "time_from", "time_to", "max_capacity", "slot_status"],
+		order_by="date_from asc, time_from asc"
+	)
+	capacity = get_available_capacity_bulk([s.name for s in slots], date_from_obj, date_to_obj)
+
+	# One row per (slot × calendar day) in the overlap with the query range — capacity is per day.
+	slots_with_availability = []
+	for slot in slots:
+		slot_experience = experience or frappe.get_cached_doc("Cheese Experience", slot.experience)
+		is_hotel = slot_experience.experience_type == "HOTEL"
+		room_size = cint(getattr(slot_experience, "room_size", 0) or getattr(slot_experience, "max_occupancy_per_unit", 0) or 0)
+		days = slot_calendar_days_in_range(slot.date_from, slot.date_to, date_from_obj, date_to_obj)
+		for cal_day in days:
+			available = capacity.get((slot.name, cal_day), 0)
+			fits_guests = True
+			if is_hotel:
+				fits_guests = room_size > 0 and (guests or 1) <= room_size * rooms_requested
+			live_status = "OPEN" if available >= rooms_requested and fits_guests else "CLOSED"
+			experience_cols = {} if experience_id else {
+				"experience_id": slot.experience,
+				"experience_name": slot_experience.name,
+			}
+			slots_with_availability.append((SlotRow if experience_id else ListingSlotRow)(
+				slot_id=slot.name,
+				selected_date=cal_day,
+				calendar_date=cal_day,
+				date_from=slot.date_from,
+				date_to=slot.date_to,
+				time_from=slot.time_from,
+				time_to=slot.time_to,
+				max_capacity=slot.max_capacity,
+				available_capacity=available,
+				available_rooms=available if is_hotel else None,
+				room_size=room_size if is_hotel else None,
+				max_guests_available=available * room_size if is_hotel else None,
+				requested_rooms=rooms_requested if is_hotel else None,
+				requested_guests=guests if is_hotel else None,
+				experience_type=slot_experience.experience_type,
+				is_room=bool(getattr(slot_experience, "is_room", 0)),
+				slot_status=live_status,
+				is_available=available >= rooms_requested and fits_guests,
+				date=cal_day,
+				time=slot.time_from,
+				**experience_cols,
+			))
+
+	# Append room-derived nightly rows for the hotel experiences in scope
+	# (multi-experience listing only; single hotel returns above).
+	if not experience_id and date_to_obj >= today_obj:
+		online_hotels = frappe.get_all(
+			"Cheese Experience",
+			filters={**hotel_scope_filters, "status": "ONLINE"},
+			pluck="name",
+		)
+		for hotel_exp_id in online_hotels:
+			hotel_doc = frappe.get_cached_doc("Cheese Experience", hotel_exp_id)
+			slots_with_availability.extend(
+				_hotel_slot_rows(
+					hotel_doc, date_from_obj, date_to_obj, rooms_requested, guests,
+					include_experience_cols=True,
+				)
+			)
+
+	return slots_with_availability
+
+
+def _available_slots(experience_id=None, date=None, date_from=None, date_to=None, guests=None, rooms_requested=1):
 	"""
 	Get available slots for an experience or all experiences within a date range
 	
@@ -120,48 +316,32 @@ def get_available_slots(experience_id=None, date=None, date_from=None, date_to=N
 		if not date_from or not date_to:
 			return validation_error("date_from and date_to are required (or use date for single day)")
 		
-		date_from_obj = getdate(date_from)
-		date_to_obj = getdate(date_to)
+		date_from_obj = parse_date(date_from)
+		date_to_obj = parse_date(date_to)
 		
 		if date_from_obj > date_to_obj:
 			return validation_error("date_from must be before or equal to date_to")
 
-		from frappe.utils import today
-		today_obj = getdate(today())
+		today_obj = parse_date(today())
 		
 		# Prevent querying past dates
 		if date_to_obj < today_obj:
-			# If the whole range is in the past, return empty early
-			slots = []
-			date_from_obj = date_to_obj # Just to bypass logic, the query will return [] anyway
+			# If the whole range is in the past, the slot query will return [] anyway
+			date_from_obj = date_to_obj
 		elif date_from_obj < today_obj:
 			date_from_obj = today_obj
 
-		# Build filters for slots
-		# Slots have date_from and date_to fields, so we need to check for overlap
-		# A slot overlaps if: slot.date_from <= date_to AND slot.date_to >= date_from
-		slot_filters = {
-			"slot_status": ["in", ["OPEN", "CLOSED"]]
-		}
-		
-		# Filter slots that overlap with the requested date range
-		# Using OR conditions to find slots that overlap
-		slot_filters["date_from"] = ["<=", date_to_obj]
-		slot_filters["date_to"] = [">=", date_from_obj]
-
 		user_company = _get_current_user_company()
 
 		# If experience_id provided, validate and filter
 		experience = None
 		if experience_id:
-			if not frappe.db.exists("Cheese Experience", experience_id):
+			try:
+				experience = frappe.get_cached_doc("Cheese Experience", experience_id)
+			except frappe.DoesNotExistError:
 				return not_found("Experience", experience_id)
-			if user_company:
-				exp_company = frappe.db.get_value("Cheese Experience", experience_id, "company")
-				if exp_company != user_company:
-					return error("Unauthorized", "UNAUTHORIZED", {}, 403)
-			slot_filters["experience"] = experience_id
-			experience = frappe.get_doc("Cheese Experience", experience_id)
+			if user_company and experience.company != user_company:
+				return error("Unauthorized", "UNAUTHORIZED", {}, 403)
 			# Hotels never use slots: availability derives from physical rooms.
 			if experience.experience_type == "HOTEL":
 				hotel_rows = (
@@ -181,111 +361,29 @@ def get_available_slots(experience_id=None, date=None, date_from=None, date_to=N
 						"available_slots": len([s for s in hotel_rows if s["is_available"]]),
 					},
 				)
-		elif user_company:
-			allowed_experience_ids = frappe.get_all(
-				"Cheese Experience",
-				filters={"company": user_company},
-				pluck="name",
-			)
-			if not allowed_experience_ids:
-				return success(
-					"No slots found for this company",
-					{
-						"date_from": date_from,
-						"date_to": date_to,
-						"experiences": [],
-						"total_experiences": 0,
-						"total_slots": 0,
-						"total_available_slots": 0,
-					},
-				)
-			slot_filters["experience"] = ["in", allowed_experience_ids]
-		rooms_requested = cint(rooms_requested) or 1
-		guests = cint(guests) if guests is not None else None
 
-		# Hotels never use slots: exclude their (legacy) slots from the listing;
-		# room-derived rows are appended per hotel experience further below.
-		hotel_scope_filters = {"experience_type": "HOTEL"}
-		if user_company:
-			hotel_scope_filters["company"] = user_company
-		hotel_ids = [] if experience_id else frappe.get_all(
-			"Cheese Experience", filters=hotel_scope_filters, pluck="name"
+		# Normalized key so "2026-01-05" and "2026-1-5" share a cache entry.
+		slots_with_availability = _compute_slots(
+			experience_id,
+			date_from_obj.isoformat(),
+			date_to_obj.isoformat(),
+			user_company,
+			cint(guests) if guests is not None else None,
+			cint(rooms_requested) or 1,
+			frappe.cache.get_value(_availability_version_key(experience_id)) or 0,
 		)
-		if hotel_ids:
-			current = slot_filters.get("experience")
-			if isinstance(current, list) and current and current[0] == "in":
-				slot_filters["experience"] = ["in", [x for x in current[1] if x not in hotel_ids] or ["__none__"]]
-			else:
-				slot_filters["experience"] = ["not in", hotel_ids]
-
-		# Get slots
-		slots = frappe.get_all(
-			"Cheese Experience Slot",
-			filters=slot_filters,
-			fields=["name", "experience", "date_from", "date_to", "time_from", "time_to", "max_capacity", "slot_status"],
-			order_by="date_from asc, time_from asc"
-		)
-
-		# One row per (slot × calendar day) in the overlap with the query range — capacity is per day.
-		slots_with_availability = []
-		for slot in slots:
-			slot_experience = experience or frappe.get_doc("Cheese Experience", slot.experience)
-			is_hotel = slot_experience.experience_type == "HOTEL"
-			room_size = cint(getattr(slot_experience, "room_size", 0) or getattr(slot_experience, "max_occupancy_per_unit", 0) or 0)
-			days = slot_calendar_days_in_range(slot.date_from, slot.date_to, date_from_obj, date_to_obj)
-			for cal_day in days:
-				available = get_available_capacity(slot.name, selected_date=cal_day)
-				fits_guests = True
-				if is_hotel:
-					fits_guests = room_size > 0 and (guests or 1) <= room_size * rooms_requested
-				live_status = "OPEN" if available >= rooms_requested and fits_guests else "CLOSED"
-				slot_data = {
-					"slot_id": slot.name,
-					"selected_date": str(cal_day),
-					"calendar_date": str(cal_day),
-					"date_from": str(slot.date_from) if slot.date_from is not None else None,
-					"date_to": str(slot.date_to) if slot.date_to is not None else None,
-					"time_from": str(slot.time_from) if slot.time_from is not None else None,
-					"time_to": str(slot.time_to) if slot.time_to is not None else None,
-					"max_capacity": slot.max_capacity,
-					"available_capacity": available,
-					"available_rooms": available if is_hotel else None,
-					"room_size": room_size if is_hotel else None,
-					"max_guests_available": available * room_size if is_hotel else None,
-					"requested_rooms": rooms_requested if is_hotel else None,
-					"requested_guests": guests if is_hotel else None,
-					"experience_type": slot_experience.experience_type,
-					"is_room": bool(getattr(slot_experience, "is_room", 0)),
-					"slot_status": live_status,
-					"is_available": available >= rooms_requested and fits_guests,
-				}
-				# Backward compatibility: `date` is the occurrence day for this row
-				slot_data["date"] = str(cal_day)
-				slot_data["time"] = str(slot.time_from) if slot.time_from is not None else None
-
-				if not experience_id:
-					slot_data["experience_id"] = slot.experience
-					exp_name = frappe.db.get_value("Cheese Experience", slot.experience, "name")
-					slot_data["experience_name"] = exp_name
-
-				slots_with_availability.append(slot_data)
-
-		# Append room-derived nightly rows for the hotel experiences in scope
-		# (multi-experience listing only; single hotel returns above).
-		if not experience_id and date_to_obj >= today_obj:
-			online_hotels = frappe.get_all(
-				"Cheese Experience",
-				filters={**hotel_scope_filters, "status": "ONLINE"},
-				pluck="name",
+		if slots_with_availability is None:
+			return success(
+				"No slots found for this company",
+				{
+					"date_from": date_from,
+					"date_to": date_to,
+					"experiences": [],
+					"total_experiences": 0,
+					"total_slots": 0,
+					"total_available_slots": 0,
+				},
 			)
-			for hotel_exp_id in online_hotels:
-				hotel_doc = frappe.get_doc("Cheese Experience", hotel_exp_id)
-				slots_with_availability.extend(
-					_hotel_slot_rows(
-						hotel_doc, date_from_obj, date_to_obj, rooms_requested, guests,
-						include_experience_cols=True,
-					)
-				)
 
 		# Build response
 		if experience_id:
@@ -345,7 +443,21 @@ def get_available_slots(experience_id=None, date=None, date_from=None, date_to=N
 
 
 @frappe.whitelist()
-def get_hotel_availability(experience_id, check_in_date, check_out_date, guests=None, rooms_requested=1):
+def get_available_slots(experience_id=None, date=None, date_from=None, date_to=None, guests=None, rooms_requested=1):
+	"""get_available_slots response, serialized once by json_response() (see _available_slots)."""
+	return json_response(
+		_available_slots(
+			experience_id=experience_id,
+			date=date,
+			date_from=date_from,
+			date_to=date_to,
+			guests=guests,
+			rooms_requested=rooms_requested,
+		)
+	)
+
+
+def _hotel_availability(experience_id, check_in_date, check_out_date, guests=None, rooms_requested=1):
 	"""
 	Get bottleneck availability for a hotel experience over a date range.
 	
@@ -363,28 +475,27 @@ def get_hotel_availability(experience_id, check_in_date, check_out_date, guests=
 		if not check_in_date or not check_out_date:
 			return validation_error("check_in_date and check_out_date are required")
 			
-		check_in_obj = getdate(check_in_date)
-		check_out_obj = getdate(check_out_date)
+		check_in_obj = parse_date(check_in_date)
+		check_out_obj = parse_date(check_out_date)
 		
 		if check_in_obj >= check_out_obj:
 			return validation_error("check_in_date must be before check_out_date")
 			
 		from frappe.utils import today, add_days
-		today_obj = getdate(today())
+		today_obj = parse_date(today())
 		
 		if check_in_obj < today_obj:
 			return validation_error("check_in_date cannot be in the past")
 			
-		if not frappe.db.exists("Cheese Experience", experience_id):
+		try:
+			experience = frappe.get_doc("Cheese Experience", experience_id)
+		except frappe.DoesNotExistError:
 			return not_found("Experience", experience_id)
 
 		user_company = _get_current_user_company()
-		if user_company:
-			exp_company = frappe.db.get_value("Cheese Experience", experience_id, "company")
-			if exp_company != user_company:
-				return error("Unauthorized", "UNAUTHORIZED", {}, 403)
+		if user_company and experience.company != user_company:
+			return error("Unauthorized", "UNAUTHORIZED", {}, 403)
 			
-		experience = frappe.get_doc("Cheese Experience", experience_id)
 		if experience.experience_type != "HOTEL":
 			return validation_error("Experience is not a hotel")
 		rooms_requested = cint(rooms_requested) or 1
@@ -453,6 +564,20 @@ def get_hotel_availability(experience_id, check_in_date, check_out_date, guests=
 		return error("Failed to get hotel availability", "SERVER_ERROR", {"error": str(e)}, 500)
 
 
+@frappe.whitelist()
+def get_hotel_availability(experience_id, check_in_date, check_out_date, guests=None, rooms_requested=1):
+	"""get_hotel_availability response, serialized once by json_response() (see _hotel_availability)."""
+	return json_response(
+		_hotel_availability(
+			experience_id,
+			check_in_date,
+			check_out_date,
+			guests=guests,
+			rooms_requested=rooms_requested,
+		)
+	)
+
+
 @frappe.whitelist()
 def get_availability(experience_id=None, date=None, date_from=None, date_to=None, guests=None, rooms_requested=1):
 	"""
@@ -477,8 +602,7 @@ def get_availability(experience_id=None, date=None, date_from=None, date_to=None
 	)
 
 
-@frappe.whitelist()
-def get_route_availability(route_id, date=None, date_from=None, date_to=None, party_size=1):
+def _route_availability(route_id, date=None, date_from=None, date_to=None, party_size=1):
 	"""
 	Get availability by route - returns aggregated availability or rules to build it
 	
@@ -496,10 +620,10 @@ def get_route_availability(route_id, date=None, date_from=None, date_to=None, pa
 		if not route_id:
 			return validation_error("route_id is required")
 		
-		if not frappe.db.exists("Cheese Route", route_id):
+		try:
+			route = frappe.get_cached_doc("Cheese Route", route_id)
+		except frappe.DoesNotExistError:
 			return not_found("Route", route_id)
-		
-		route = frappe.get_doc("Cheese Route", route_id)
 		user_company = _get_current_user_company()
 		
 		if route.status != "ONLINE":
@@ -513,10 +637,20 @@ def get_route_availability(route_id, date=None, date_from=None, date_to=None, pa
 				}
 			)
 		
-		# Get route experiences
+		# Get route experiences (one query for every segment's experience)
+		exp_info = {
+			row.name: row
+			for row in frappe.get_all(
+				"Cheese Experience",
+				filters={"name": ["in", [r.experience for r in route.experiences]]},
+				fields=["name", "status", "company", "experience_type"],
+			)
+		} if route.experiences else {}
 		experiences = []
 		for exp_row in route.experiences:
-			exp_doc = frappe.get_doc("Cheese Experience", exp_row.experience)
+			exp_doc = exp_info.get(exp_row.experience)
+			if not exp_doc:
+				raise frappe.DoesNotExistError(f"Cheese Experience {exp_row.experience} not found")
 			if user_company and exp_doc.company != user_company:
 				# Hide cross-company route segments from establishment users.
 				continue
@@ -551,14 +685,14 @@ def get_route_availability(route_id, date=None, date_from=None, date_to=None, pa
 			return validation_error("party_size must be a number")
 
 		if date_from and date_to:
-			date_from_obj = getdate(date_from)
-			date_to_obj = getdate(date_to)
+			date_from_obj = parse_date(date_from)
+			date_to_obj = parse_date(date_to)
 			
 			if date_from_obj > date_to_obj:
 				return validation_error("date_from must be before or equal to date_to")
 			
 			from frappe.utils import today
-			today_obj = getdate(today())
+			today_obj = parse_date(today())
 			if date_to_obj < today_obj:
 				date_from_obj = date_to_obj  # Let it fail to find slots
 			elif date_from_obj < today_obj:
@@ -566,7 +700,36 @@ def get_route_availability(route_id, date=None, date_from=None, date_to=None, pa
 			
 			availability_by_experience = []
 			all_available = True
-			
+
+			online_ids = [exp["experience_id"] for exp in experiences if exp["status"] == "ONLINE"]
+			hotel_ids = {exp_id for exp_id in online_ids if exp_info[exp_id].experience_type == "HOTEL"}
+			hotel_nightly = (
+				_hotel_nightly_availability_many(hotel_ids, date_from_obj, date_to_obj)
+				if hotel_ids
+				else {}
+			)
+
+			# Slots of every non-hotel segment in one query; capacity for all of them in one pass.
+			# A slot overlaps if: slot.date_from <= date_to AND slot.date_to >= date_from
+			seat_ids = [exp_id for exp_id in online_ids if exp_id not in hotel_ids]
+			slots_by_experience = {}
+			if seat_ids:
+				route_slots = frappe.get_all(
+					"Cheese Experience Slot",
+					filters={
+						"experience": ["in", seat_ids],
+						"date_from": ["<=", date_to_obj],
+						"date_to": [">=", date_from_obj],
+						"slot_status": ["in", _SLOT_VISIBLE_STATUSES],
+					},
+					fields=["name", "experience", "date_from", "date_to", "time_from", "time_to", "max_capacity"]
+				)
+				for slot in route_slots:
+					slots_by_experience.setdefault(slot.experience, []).append(slot)
+				capacity = get_available_capacity_bulk(
+					[s.name for s in route_slots], date_from_obj, date_to_obj
+				)
+
 			for exp in experiences:
 				if exp["status"] != "ONLINE":
 					all_available = False
@@ -578,13 +741,8 @@ def get_route_availability(route_id, date=None, date_from=None, date_to=None, pa
 					continue
 
 				# Hotel segments derive availability from physical rooms.
-				exp_type = frappe.db.get_value(
-					"Cheese Experience", exp["experience_id"], "experience_type"
-				)
-				if exp_type == "HOTEL":
-					nightly, _total = _hotel_nightly_availability(
-						exp["experience_id"], date_from_obj, date_to_obj
-					)
+				if exp["experience_id"] in hotel_ids:
+					nightly, _total = hotel_nightly[exp["experience_id"]]
 					available_slots = [
 						{
 							"slot_id": f"NIGHT-{row['date']}",
@@ -613,41 +771,27 @@ def get_route_availability(route_id, date=None, date_from=None, date_to=None, pa
 					})
 					continue
 
-				# Get slots for this experience that overlap with the date range
-				# Slots have date_from and date_to fields, so we need to check for overlap
-				# A slot overlaps if: slot.date_from <= date_to AND slot.date_to >= date_from
-				slots = frappe.get_all(
-					"Cheese Experience Slot",
-					filters={
-						"experience": exp["experience_id"],
-						"date_from": ["<=", date_to_obj],
-						"date_to": [">=", date_from_obj],
-						"slot_status": ["in", ["OPEN", "CLOSED"]],
-					},
-					fields=["name", "date_from", "date_to", "time_from", "time_to", "max_capacity"]
-				)
-				
 				available_slots = []
-				for slot in slots:
+				for slot in slots_by_experience.get(exp["experience_id"], []):
 					days = slot_calendar_days_in_range(
 						slot.date_from, slot.date_to, date_from_obj, date_to_obj
 					)
 					for cal_day in days:
-						available = get_available_capacity(slot.name, selected_date=cal_day)
+						available = capacity.get((slot.name, cal_day), 0)
 						if available < party_size:
 							continue
 						slot_data = {
 							"slot_id": slot.name,
-							"selected_date": str(cal_day),
-							"calendar_date": str(cal_day),
-							"date_from": str(slot.date_from) if slot.date_from else None,
-							"date_to": str(slot.date_to) if slot.date_to else None,
-							"time_from": str(slot.time_from) if slot.time_from else None,
-							"time_to": str(slot.time_to) if slot.time_to else None,
+							"selected_date": cal_day,
+							"calendar_date": cal_day,
+							"date_from": slot.date_from or None,
+							"date_to": slot.date_to or None,
+							"time_from": slot.time_from or None,
+							"time_to": slot.time_to or None,
 							"available_capacity": available,
 						}
-						slot_data["date"] = str(cal_day)
-						slot_data["time"] = str(slot.time_from) if slot.time_from else None
+						slot_data["date"] = cal_day
+						slot_data["time"] = slot.time_from or None
 						available_slots.append(slot_data)
 				
 				if not available_slots:
@@ -690,3 +834,17 @@ def get_route_availability(route_id, date=None, date_from=None, date_to=None, pa
 	except Exception as e:
 		frappe.log_error(f"Error in get_route_availability: {str(e)}")
 		return error("Failed to get route availability", "SERVER_ERROR", {"error": str(e)}, 500)
+
+
+@frappe.whitelist()
+def get_route_availability(route_id, date=None, date_from=None, date_to=None, party_size=1):
+	"""get_route_availability response, serialized once by json_response() (see _route_availability)."""
+	return json_response(
+		_route_availability(
+			route_id,
+			date=date,
+			date_from=date_from,
+			date_to=date_to,
+			party_size=party_size,
+		)
+	)
@@ -3,13 +3,22 @@
 
 import frappe
 from frappe import _
-from frappe.utils import now_datetime, add_to_date, getdate
-from cheese.api.common.responses import success, created, error, not_found, validation_error
+from frappe.utils import now_datetime, add_to_date, getdate, flt
+from cheese.api.common.responses import success, created, error, not_found, validation_error, parse_json, log_api_error
 from cheese.api.v1.ticket_controller import create_pending_ticket
 from cheese.api.v1.route_booking_controller import create_route_reservation, get_route_status
 from cheese.api.v1.user_controller import _get_current_user_company
 from cheese.cheese.utils.access import assert_contact_access
-import json
+import re
+from collections import Counter
+from datetime import datetime
+from itertools import groupby
+
+# BK-{contact_id}-{YYYYmmddHHMMSS}; contact ids may themselves contain dashes.
+_BOOKING_ID_RE = re.compile(r"^BK-(?P<contact_id>.+)-(?P<timestamp>\d{14})$")
+
+# Seconds a get_booking_status result may be served from cache.
+_BOOKING_STATUS_CACHE_TTL = 5
 
 
 @frappe.whitelist()
@@ -50,7 +59,7 @@ def create_pending_booking(contact_id, items, preferred_dates=None, conversation
 		# Parse items
 		if isinstance(items, str):
 			try:
-				items = json.loads(items)
+				items = parse_json(items)
 			except Exception as e:
 				return validation_error(f"Invalid items format: {str(e)}")
 		
@@ -114,7 +123,7 @@ def create_pending_booking(contact_id, items, preferred_dates=None, conversation
 				# If still no slots, try to construct from available experience items
 				if not experiences_with_slots and available_experience_slots:
 					# Check if route requires specific experiences
-					route_doc = frappe.get_doc("Cheese Route", route_id)
+					route_doc = frappe.get_cached_doc("Cheese Route", route_id)
 					constructed_slots = []
 					for exp_row in route_doc.experiences:
 						if exp_row.experience in available_experience_slots:
@@ -153,18 +162,6 @@ def create_pending_booking(contact_id, items, preferred_dates=None, conversation
 					commit=False,
 				)
 				
-				if not route_result.get("success"):
-					# Abort atomically: also discards earlier uncommitted items.
-					frappe.db.rollback()
-					return route_result
-				
-				route_booking_id = route_result.get("data", {}).get("route_booking_id")
-				# Update experiences_with_slots with what was actually booked if we auto-selected
-				if not experiences_with_slots:
-					# We need to fetch the booked slots to correctly price manual routes if needed? 
-					# For now, route price calculation below relies on route definition, not booked slots unless route.price_mode is Sum.
-					pass
-				
 				if not route_result.get("success"):
 					# Abort atomically: also discards earlier uncommitted items.
 					frappe.db.rollback()
@@ -229,22 +226,21 @@ def create_pending_booking(contact_id, items, preferred_dates=None, conversation
 				
 				# Link to conversation if provided
 				if conversation_id:
-					ticket_doc = frappe.get_doc("Cheese Ticket", ticket_id)
-					ticket_doc.conversation = conversation_id
-					ticket_doc.save()
+					# Plain column write on a ticket created moments ago; no hooks depend on it
+					frappe.db.set_value(
+						"Cheese Ticket", ticket_id, "conversation", conversation_id, update_modified=False
+					)
 			else:
 				frappe.db.rollback()
 				return validation_error(f"Invalid item type: {item_type}. Must be 'route' or 'experience'")
 		
-		# Generate booking ID before commit
+		# Generate booking ID
 		booking_id = f"BK-{contact_id}-{now_datetime().strftime('%Y%m%d%H%M%S')}"
 		
 		# Store booking_id in conversation if available, or track via creation time
 		# Since we can't add booking_id field, we'll use creation time window
 		booking_creation_time = now_datetime()
 		
-		frappe.db.commit()
-		
 		# Determine overall status
 		overall_status = "PENDING"
 		if route_booking_id:
@@ -281,10 +277,87 @@ def create_pending_booking(contact_id, items, preferred_dates=None, conversation
 		return validation_error(str(e))
 	except Exception as e:
 		frappe.db.rollback()
-		frappe.log_error(f"Error in create_pending_booking: {str(e)}")
+		log_api_error(f"Error in create_pending_booking: {str(e)}")
 		return error("Failed to create booking", "SERVER_ERROR", {"error": str(e)}, 500)
 
 
+def _booking_status_version_key(contact_id):
+	return f"cheese:booking_status_version:{contact_id}"
+
+
+def _booking_status_cache_key(booking_id, contact_id, user_company):
+	"""Cache key for get_booking_status; bumping the contact's version invalidates it."""
+	version = frappe.cache.get_value(_booking_status_version_key(contact_id)) or 0
+	return f"cheese:booking_status:{booking_id}:{user_company or ''}:{version}"
+
+
+def _load_booking_status(booking_id, contact_id, booking_time, user_company=None):
+	"""
+	Read a booking's tickets and derive its status payload
+	
+	Args:
+		booking_id: Booking ID
+		contact_id: Contact parsed from the booking ID
+		booking_time: Booking creation time parsed from the booking ID
+		user_company: Company of a scoped user (None for unscoped users)
+		
+	Returns:
+		Booking status data dictionary
+	"""
+	# Get tickets created within 2 minutes of booking creation time
+	# This ensures we only get tickets from the same booking
+	window_start = add_to_date(booking_time, minutes=-2, as_datetime=True)
+	window_end = add_to_date(booking_time, minutes=2, as_datetime=True)
+
+	ticket_filters = [
+		["contact", "=", contact_id],
+		["creation", ">=", window_start],
+		["creation", "<=", window_end],
+		["status", "!=", "CANCELLED"]
+	]
+	# Tenant isolation: scoped users only see their own company's components.
+	if user_company:
+		ticket_filters.append(["company", "=", user_company])
+
+	tickets = frappe.get_all(
+		"Cheese Ticket",
+		filters=ticket_filters,
+		fields=["name", "status", "route", "experience", "slot", "creation"],
+		order_by="route asc, creation asc"
+	)
+	
+	# Group by route and individual (rows arrive sorted by route)
+	route_bookings = []
+	individual_reservations = []
+	
+	for route_id, route_tickets in groupby(tickets, key=lambda t: t.route):
+		if route_id:
+			route_bookings.append({"route_id": route_id, "tickets": [t.name for t in route_tickets]})
+		else:
+			individual_reservations.extend(t.name for t in route_tickets)
+	
+	# Determine overall status from a single tally of ticket statuses
+	status_counts = Counter(t.status for t in tickets)
+	overall_status = "PENDING"
+	
+	if status_counts["CONFIRMED"] == len(tickets):
+		overall_status = "CONFIRMED"
+	elif status_counts["CONFIRMED"]:
+		overall_status = "PARTIALLY_CONFIRMED"
+	elif status_counts["CANCELLED"] or status_counts["EXPIRED"]:
+		overall_status = "PARTIALLY_CANCELLED"
+	
+	return {
+		"booking_id": booking_id,
+		"status": overall_status,
+		"route_bookings": route_bookings,
+		"individual_reservations": individual_reservations,
+		"total_components": len(tickets),
+		"confirmed_count": status_counts["CONFIRMED"],
+		"pending_count": status_counts["PENDING"]
+	}
+
+
 @frappe.whitelist()
 def get_booking_status(booking_id):
 	"""
@@ -302,83 +375,33 @@ def get_booking_status(booking_id):
 		
 		# Extract contact and timestamp from booking ID
 		# Format: BK-{contact_id}-{timestamp}
-		parts = booking_id.split("-")
-		if len(parts) < 3 or parts[0] != "BK":
+		match = _BOOKING_ID_RE.match(booking_id)
+		if not match:
 			return validation_error("Invalid booking_id format")
 		
-		timestamp_str = parts[-1]
-		contact_id = "-".join(parts[1:-1])
+		contact_id = match["contact_id"]
+		timestamp_str = match["timestamp"]
 		
 		# Parse timestamp to get creation time window
-		from frappe.utils import get_datetime, add_to_date
 		try:
-			booking_time = get_datetime(f"{timestamp_str[:4]}-{timestamp_str[4:6]}-{timestamp_str[6:8]} {timestamp_str[8:10]}:{timestamp_str[10:12]}:{timestamp_str[12:14]}")
-		except:
+			booking_time = datetime.strptime(timestamp_str, "%Y%m%d%H%M%S")
+		except ValueError:
 			return validation_error("Invalid booking_id timestamp format")
 		
-		# Get tickets created within 2 minutes of booking creation time
-		# This ensures we only get tickets from the same booking
-		window_start = add_to_date(booking_time, minutes=-2, as_datetime=True)
-		window_end = add_to_date(booking_time, minutes=2, as_datetime=True)
-
-		ticket_filters = [
-			["contact", "=", contact_id],
-			["creation", ">=", window_start],
-			["creation", "<=", window_end],
-			["status", "!=", "CANCELLED"]
-		]
 		# Tenant isolation: scoped users only see their own company's components.
 		user_company = _get_current_user_company()
-		if user_company:
-			ticket_filters.append(["company", "=", user_company])
-
-		tickets = frappe.get_all(
-			"Cheese Ticket",
-			filters=ticket_filters,
-			fields=["name", "status", "route", "experience", "slot", "creation"],
-			order_by="creation asc"
-		)
-		
-		# Group by route and individual
-		route_bookings = {}
-		individual_reservations = []
-		
-		for ticket in tickets:
-			if ticket.route:
-				if ticket.route not in route_bookings:
-					route_bookings[ticket.route] = []
-				route_bookings[ticket.route].append(ticket)
-			else:
-				individual_reservations.append(ticket)
-		
-		# Determine overall status
-		all_statuses = [t.status for t in tickets]
-		overall_status = "PENDING"
-		
-		if all(s == "CONFIRMED" for s in all_statuses):
-			overall_status = "CONFIRMED"
-		elif any(s == "CONFIRMED" for s in all_statuses):
-			overall_status = "PARTIALLY_CONFIRMED"
-		elif any(s in ["CANCELLED", "EXPIRED"] for s in all_statuses):
-			overall_status = "PARTIALLY_CANCELLED"
-		
-		return success(
-			"Booking status retrieved successfully",
-			{
-				"booking_id": booking_id,
-				"status": overall_status,
-				"route_bookings": [
-					{"route_id": route_id, "tickets": [t.name for t in tickets]}
-					for route_id, tickets in route_bookings.items()
-				],
-				"individual_reservations": [t.name for t in individual_reservations],
-				"total_components": len(tickets),
-				"confirmed_count": len([t for t in tickets if t.status == "CONFIRMED"]),
-				"pending_count": len([t for t in tickets if t.status == "PENDING"])
-			}
-		)
+
+		# Status pollers hit the same booking repeatedly; serve them from a short-lived
+		# cache that ticket changes for the contact invalidate (see events.py).
+		cache_key = _booking_status_cache_key(booking_id, contact_id, user_company)
+		data = frappe.cache.get_value(cache_key)
+		if data is None:
+			data = _load_booking_status(booking_id, contact_id, booking_time, user_company)
+			frappe.cache.set_value(cache_key, data, expires_in_sec=_BOOKING_STATUS_CACHE_TTL)
+		
+		return success("Booking status retrieved successfully", data)
 	except Exception as e:
-		frappe.log_error(f"Error in get_booking_status: {str(e)}")
+		log_api_error(f"Error in get_booking_status: {str(e)}")
 		return error("Failed to get booking status", "SERVER_ERROR", {"error": str(e)}, 500)
 
 
@@ -403,7 +426,7 @@ def modify_booking_preview(booking_id, changes):
 		# Parse changes
 		if isinstance(changes, str):
 			try:
-				changes = json.loads(changes)
+				changes = parse_json(changes)
 			except Exception as e:
 				return validation_error(f"Invalid changes format: {str(e)}")
 		
@@ -422,7 +445,7 @@ def modify_booking_preview(booking_id, changes):
 			}
 		)
 	except Exception as e:
-		frappe.log_error(f"Error in modify_booking_preview: {str(e)}")
+		log_api_error(f"Error in modify_booking_preview: {str(e)}")
 		return error("Failed to preview booking modification", "SERVER_ERROR", {"error": str(e)}, 500)
 
 
@@ -447,10 +470,15 @@ def confirm_booking_modification(booking_id, changes):
 		# Parse changes
 		if isinstance(changes, str):
 			try:
-				changes = json.loads(changes)
+				changes = parse_json(changes)
 			except Exception as e:
 				return validation_error(f"Invalid changes format: {str(e)}")
 		
+		# Get booking status
+		status_result = get_booking_status(booking_id)
+		if not status_result.get("success"):
+			return status_result
+		
 		# Apply changes (simplified - would use route/ticket modification endpoints)
 		from cheese.api.v1.ticket_controller import modify_ticket
 		from cheese.api.v1.route_booking_controller import confirm_route_modification
@@ -478,21 +506,18 @@ def confirm_booking_modification(booking_id, changes):
 				else:
 					return result
 		
-		frappe.db.commit()
-		
-		# Get updated booking status
-		updated_status = get_booking_status(booking_id)
-		
+		# Modifications move slots / party sizes only: ticket statuses and booking
+		# membership are unchanged, so the status read above is still current.
 		return success(
 			"Booking modified successfully",
 			{
 				"booking_id": booking_id,
 				"modified_components": modified_components,
-				"updated_status": updated_status.get("data", {}) if updated_status.get("success") else None
+				"updated_status": status_result.get("data", {})
 			}
 		)
 	except Exception as e:
-		frappe.log_error(f"Error in confirm_booking_modification: {str(e)}")
+		log_api_error(f"Error in confirm_booking_modification: {str(e)}")
 		return error("Failed to confirm booking modification", "SERVER_ERROR", {"error": str(e)}, 500)
 
 
@@ -521,9 +546,16 @@ def cancel_booking(booking_id, reason=None):
 		route_bookings = status_data.get("route_bookings", [])
 		individual_reservations = status_data.get("individual_reservations", [])
 		
-		# Cancel route bookings
 		from cheese.api.v1.route_booking_controller import cancel_route_booking
-		
+		from cheese.api.v1.ticket_controller import _check_tickets_cancellable, cancel_tickets_bulk
+
+		# cancel_route_booking commits, so reject the request before touching any
+		# route when one of the individual reservations cannot be cancelled.
+		problem, slot_ids = _check_tickets_cancellable(individual_reservations)
+		if problem:
+			return problem
+
+		# Cancel route bookings
 		cancelled_routes = []
 		for route_booking in route_bookings:
 			route_id = route_booking.get("route_id")
@@ -535,20 +567,16 @@ def cancel_booking(booking_id, reason=None):
 				if result.get("success"):
 					cancelled_routes.append(route_booking_id)
 				else:
+					frappe.db.rollback()
 					return result
 		
-		# Cancel individual reservations
-		from cheese.api.v1.ticket_controller import cancel_ticket
-		
-		cancelled_tickets = []
-		for ticket_id in individual_reservations:
-			result = cancel_ticket(ticket_id)
-			if result.get("success"):
-				cancelled_tickets.append(ticket_id)
-			else:
-				return result
-		
-		frappe.db.commit()
+		# Cancel individual reservations (already validated above, saved without
+		# per-ticket commits); route cancellation does not touch these tickets
+		result = cancel_tickets_bulk(individual_reservations, slot_ids=slot_ids)
+		if not result.get("success"):
+			frappe.db.rollback()
+			return result
+		cancelled_tickets = result["data"]["cancelled_tickets"]
 		
 		return success(
 			"Booking cancelled successfully",
@@ -560,7 +588,8 @@ def cancel_booking(booking_id, reason=None):
 			}
 		)
 	except Exception as e:
-		frappe.log_error(f"Error in cancel_booking: {str(e)}")
+		frappe.db.rollback()
+		log_api_error(f"Error in cancel_booking: {str(e)}")
 		return error("Failed to cancel booking", "SERVER_ERROR", {"error": str(e)}, 500)
 
 
@@ -595,18 +624,23 @@ def get_payment_status_for_booking(booking_id):
 		total_paid = 0
 		deposit_statuses = []
 		
-		# Check deposits for individual reservations
-		for ticket_id in individual_reservations:
-			deposits = frappe.get_all(
+		# Check deposits for individual reservations (one query for all tickets)
+		deposits_by_ticket = {}
+		if individual_reservations:
+			for deposit_data in frappe.get_all(
 				"Cheese Deposit",
 				filters={
 					"entity_type": "Cheese Ticket",
-					"entity_id": ticket_id,
+					"entity_id": ["in", individual_reservations],
 					"status": ["not in", ["CANCELLED", "REFUNDED"]],
 				},
 				fields=["name", "entity_type", "entity_id", "amount_required", "amount_paid", "status", "due_at", "paid_at", "verification_method"],
 				order_by="creation asc",
-			)
+			):
+				deposits_by_ticket.setdefault(deposit_data.entity_id, []).append(deposit_data)
+
+		for ticket_id in individual_reservations:
+			deposits = deposits_by_ticket.get(ticket_id, [])
 			for deposit_data in deposits:
 				total_required += deposit_data.get("amount_required", 0)
 				total_paid += deposit_data.get("amount_paid", 0)
@@ -629,7 +663,7 @@ def get_payment_status_for_booking(booking_id):
 			}
 		)
 	except Exception as e:
-		frappe.log_error(f"Error in get_payment_status_for_booking: {str(e)}")
+		log_api_error(f"Error in get_payment_status_for_booking: {str(e)}")
 		return error("Failed to get payment status", "SERVER_ERROR", {"error": str(e)}, 500)
 
 
@@ -650,7 +684,8 @@ def register_payment_for_booking(booking_id, amount, verification_method="Manual
 	try:
 		if not booking_id:
 			return validation_error("booking_id is required")
-		if not amount or amount <= 0:
+		amount = flt(amount)
+		if amount <= 0:
 			return validation_error("amount must be greater than 0")
 		
 		# Get booking status
@@ -665,13 +700,24 @@ def register_payment_for_booking(booking_id, amount, verification_method="Manual
 		from cheese.api.v1.deposit_controller import record_deposit_payment
 		
 		registered_payments = []
-		amount_per_reservation = amount / len(individual_reservations) if individual_reservations else 0
+		# Split in whole cents, handing the remainder out one cent at a time, so
+		# the shares always add up to the amount received.
+		shares = []
+		if individual_reservations:
+			base_cents, remainder = divmod(round(amount * 100), len(individual_reservations))
+			shares = [
+				(base_cents + (1 if i < remainder else 0)) / 100
+				for i in range(len(individual_reservations))
+			]
 		
 		attach_receipt_to_first_only = True
-		for ticket_id in individual_reservations:
+		for ticket_id, share in zip(individual_reservations, shares, strict=True):
+			if not share:
+				# Fewer cents than reservations: nothing left for this one
+				continue
 			result = record_deposit_payment(
 				ticket_id=ticket_id,
-				amount=amount_per_reservation,
+				amount=share,
 				verification_method=verification_method,
 				ocr_payload=ocr_payload,
 				attach_receipt=attach_receipt_to_first_only,
@@ -682,8 +728,6 @@ def register_payment_for_booking(booking_id, amount, verification_method="Manual
 			else:
 				return result
 		
-		frappe.db.commit()
-		
 		return success(
 			"Payment registered for booking successfully",
 			{
@@ -694,5 +738,5 @@ def register_payment_for_booking(booking_id, amount, verification_method="Manual
 			}
 		)
 	except Exception as e:
-		frappe.log_error(f"Error in register_payment_for_booking: {str(e)}")
+		log_api_error(f"Error in register_payment_for_booking: {str(e)}")
 		return error("Failed to register payment", "SERVER_ERROR", {"error": str(e)}, 500)
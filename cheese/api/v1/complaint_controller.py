@@ -3,8 +3,11 @@
 
 import frappe
 from frappe import _
-from frappe.utils import now_datetime
-from cheese.api.common.responses import success, created, error, not_found, validation_error
+from frappe.query_builder import DocType, Order
+from frappe.query_builder import functions as fn
+from frappe.utils import cint, now_datetime
+from pypika import analytics as an
+from cheese.api.common.responses import success, created, error, not_found, validation_error, paginated_response, log_api_error, window_total
 from cheese.api.v1.user_controller import _get_current_user_company
 from cheese.cheese.utils.access import assert_record_access, assert_contact_access, assert_company_value
 
@@ -35,7 +38,16 @@ def create_complaint(contact_id, description, ticket_id=None, route_booking_id=N
 		if incident_type not in ["LOCAL", "GENERAL"]:
 			return validation_error("incident_type must be LOCAL or GENERAL")
 		
-		if not frappe.db.exists("Cheese Contact", contact_id):
+		# Contact and (optional) ticket existence in one round trip
+		contact_exists, ticket_exists = frappe.db.sql(
+			"""
+			SELECT
+				(SELECT 1 FROM `tabCheese Contact` WHERE name = %s),
+				(SELECT 1 FROM `tabCheese Ticket` WHERE name = %s)
+			""",
+			(contact_id, ticket_id or ""),
+		)[0]
+		if not contact_exists:
 			return not_found("Contact", contact_id)
 
 		try:
@@ -43,7 +55,7 @@ def create_complaint(contact_id, description, ticket_id=None, route_booking_id=N
 
 			# Validate ticket if provided
 			if ticket_id:
-				if not frappe.db.exists("Cheese Ticket", ticket_id):
+				if not ticket_exists:
 					return not_found("Ticket", ticket_id)
 				assert_record_access("Cheese Ticket", ticket_id)
 		except frappe.PermissionError:
@@ -59,7 +71,6 @@ def create_complaint(contact_id, description, ticket_id=None, route_booking_id=N
 			"status": "OPEN"
 		})
 		support_case.insert()
-		frappe.db.commit()
 		
 		return created(
 			"Complaint created successfully",
@@ -79,7 +90,7 @@ def create_complaint(contact_id, description, ticket_id=None, route_booking_id=N
 	except frappe.ValidationError as e:
 		return validation_error(str(e))
 	except Exception as e:
-		frappe.log_error(f"Error in create_complaint: {str(e)}")
+		log_api_error(f"Error in create_complaint: {str(e)}")
 		return error("Failed to create complaint", "SERVER_ERROR", {"error": str(e)}, 500)
 
 
@@ -106,7 +117,10 @@ def update_support_case_status(support_case_id, status, notes=None, assigned_to=
 		if status not in ["OPEN", "IN_PROGRESS", "RESOLVED", "CLOSED"]:
 			return validation_error(f"Invalid status: {status}")
 		
-		if not frappe.db.exists("Cheese Support Case", support_case_id):
+		current = frappe.db.get_value(
+			"Cheese Support Case", support_case_id, ["status", "assigned_to"], as_dict=True
+		)
+		if not current:
 			return not_found("Support Case", support_case_id)
 
 		try:
@@ -114,37 +128,52 @@ def update_support_case_status(support_case_id, status, notes=None, assigned_to=
 		except frappe.PermissionError:
 			return error("Unauthorized", "UNAUTHORIZED", {}, 403)
 
-		support_case = frappe.get_doc("Cheese Support Case", support_case_id)
-		old_status = support_case.status
-		
-		support_case.status = status
+		# Only plain columns change here (on_update routing keys off incident_type),
+		# so write them in one UPDATE instead of a full get_doc + save.
+		updates = {"status": status}
 		if assigned_to:
 			if frappe.db.exists("User", assigned_to):
-				support_case.assigned_to = assigned_to
+				updates["assigned_to"] = assigned_to
 			else:
 				return not_found("User", assigned_to)
 		
-		# Add notes to description if provided
-		if notes:
-			support_case.description = f"{support_case.description}\n\n--- Update ---\n{notes}"
+		updated_at = now_datetime()
+		frappe.db.set_value("Cheese Support Case", support_case_id, updates)
 		
-		support_case.save()
-		frappe.db.commit()
+		# Append notes as their own row instead of rewriting the description.
+		# The UPDATE above holds the case's row lock until commit, so concurrent
+		# updates of the same case read MAX(idx) one after another.
+		if notes:
+			next_idx = frappe.db.sql(
+				"""SELECT IFNULL(MAX(idx), 0) + 1 FROM `tabCheese Support Case Note`
+				WHERE parent = %s AND parenttype = 'Cheese Support Case' AND parentfield = 'notes'""",
+				support_case_id,
+			)[0][0]
+			frappe.get_doc({
+				"doctype": "Cheese Support Case Note",
+				"parent": support_case_id,
+				"parenttype": "Cheese Support Case",
+				"parentfield": "notes",
+				"idx": next_idx,
+				"note": notes,
+				"author": frappe.session.user,
+				"noted_at": updated_at,
+			}).db_insert()
 		
 		return success(
 			"Support case updated successfully",
 			{
-				"support_case_id": support_case.name,
-				"old_status": old_status,
-				"new_status": support_case.status,
-				"assigned_to": support_case.assigned_to,
-				"updated_at": str(support_case.modified)
+				"support_case_id": support_case_id,
+				"old_status": current.status,
+				"new_status": status,
+				"assigned_to": updates.get("assigned_to", current.assigned_to),
+				"updated_at": str(updated_at)
 			}
 		)
 	except frappe.ValidationError as e:
 		return validation_error(str(e))
 	except Exception as e:
-		frappe.log_error(f"Error in update_support_case_status: {str(e)}")
+		log_api_error(f"Error in update_support_case_status: {str(e)}")
 		return error("Failed to update support case", "SERVER_ERROR", {"error": str(e)}, 500)
 
 
@@ -173,38 +202,54 @@ def list_support_cases(status=None, contact_id=None, assigned_to=None, route_id=
 		if user_company:
 			company_id = user_company
 
-		filters = {}
+		page = cint(page) or 1
+		page_size = cint(page_size) or 20
+
+		SupportCase = DocType("Cheese Support Case")
+		query = frappe.qb.from_(SupportCase)
 		if status:
-			filters["status"] = status
+			query = query.where(SupportCase.status == status)
 		if contact_id:
-			filters["contact"] = contact_id
+			query = query.where(SupportCase.contact == contact_id)
 		if assigned_to:
-			filters["assigned_to"] = assigned_to
+			query = query.where(SupportCase.assigned_to == assigned_to)
 
 		# Cheese Support Case carries its own `company` column; filter on it
 		# directly so ticketless (GENERAL) cases are scoped too.
 		if company_id:
-			filters["company"] = company_id
+			query = query.where(SupportCase.company == company_id)
 
 		if route_id:
-			ticket_ids = frappe.get_all("Cheese Ticket", filters={"route": route_id}, pluck="name")
-			if not ticket_ids:
-				from cheese.api.common.responses import paginated_response
-				return paginated_response([], "Support cases retrieved successfully", page=page, page_size=page_size, total=0)
-			filters["ticket"] = ["in", ticket_ids]
+			Ticket = DocType("Cheese Ticket")
+			query = (
+				query.inner_join(Ticket)
+				.on(SupportCase.ticket == Ticket.name)
+				.where(Ticket.route == route_id)
+			)
 		
-		support_cases = frappe.get_all(
-			"Cheese Support Case",
-			filters=filters,
-			fields=["name", "contact", "ticket", "route", "company", "status", "priority", "assigned_to", "creation", "modified"],
-			limit_start=(page - 1) * page_size,
-			limit_page_length=page_size,
-			order_by="modified desc"
+		support_cases = (
+			query.select(
+				SupportCase.name,
+				SupportCase.contact,
+				SupportCase.ticket,
+				SupportCase.route,
+				SupportCase.company,
+				SupportCase.status,
+				SupportCase.priority,
+				SupportCase.assigned_to,
+				SupportCase.creation,
+				SupportCase.modified,
+				# Every row carries the full match count, so no second COUNT query.
+				an.Count(SupportCase.name).over().as_("total_count"),
+			)
+			.orderby(SupportCase.modified, order=Order.desc)
+			.limit(page_size)
+			.offset((page - 1) * page_size)
+			.run(as_dict=True)
 		)
 		
-		total = frappe.db.count("Cheese Support Case", filters=filters)
+		total = window_total(support_cases, page, lambda: query.select(fn.Count("*")).run()[0][0])
 		
-		from cheese.api.common.responses import paginated_response
 		return paginated_response(
 			support_cases,
 			"Support cases retrieved successfully",
@@ -213,5 +258,5 @@ def list_support_cases(status=None, contact_id=None, assigned_to=None, route_id=
 			total=total
 		)
 	except Exception as e:
-		frappe.log_error(f"Error in list_support_cases: {str(e)}")
+		log_api_error(f"Error in list_support_cases: {str(e)}")
 		return error("Failed to list support cases", "SERVER_ERROR", {"error": str(e)}, 500)
@@ -2,10 +2,14 @@
 # License: MIT
 
 import frappe
-import json
 from frappe import _
-from cheese.api.common.responses import success, created, validation_error, error, not_found
+from frappe.query_builder import DocType, Order
+from frappe.query_builder import functions as fn
+from pypika import analytics as an
+from cheese.api.common.responses import success, created, validation_error, error, not_found, log_api_error, record_exists, window_total
+from cheese.cheese.doctype.cheese_contact.cheese_contact import contact_exists
 from cheese.cheese.utils.access import assert_contact_access, assert_company_value, scope_filters
+from cheese.cheese.utils.events import enqueue_system_event
 
 
 @frappe.whitelist()
@@ -33,24 +37,21 @@ def find_or_create_contact(phone=None, email=None, name=None, **_ignored):
 		if not phone:
 			return validation_error("phone is required")
 
-		# Search for existing contacts by both identifiers.
-		contact_by_phone = frappe.get_all(
+		# Search for existing contacts by both identifiers in one query.
+		lookup = {"phone": phone}
+		if email:
+			lookup["email"] = email
+		matches = frappe.get_all(
 			"Cheese Contact",
-			filters={"phone": phone},
+			or_filters=lookup,
 			fields=["name", "full_name", "phone", "email"],
-			limit=1,
 		)
-		contact_by_email = []
-		if email:
-			contact_by_email = frappe.get_all(
-				"Cheese Contact",
-				filters={"email": email},
-				fields=["name", "full_name", "phone", "email"],
-				limit=1,
-			)
 
-		by_phone = contact_by_phone[0] if contact_by_phone else None
-		by_email = contact_by_email[0] if contact_by_email else None
+		# The DB collation matches case-insensitively; mirror that for email.
+		by_phone = next((c for c in matches if c.phone == phone), None)
+		by_email = next(
+			(c for c in matches if email and (c.email or "").lower() == email.lower()), None
+		)
 
 		# If phone and email match different contacts, stop to avoid accidental merge.
 		if by_phone and by_email and by_phone.name != by_email.name:
@@ -61,20 +62,23 @@ def find_or_create_contact(phone=None, email=None, name=None, **_ignored):
 
 		existing_contact = by_phone or by_email
 		if existing_contact:
-			contact_doc = frappe.get_doc("Cheese Contact", existing_contact.name)
 			updated_fields = []
 
 			# Story requirement: update missing fields without losing history.
-			if name and not (contact_doc.full_name or "").strip():
-				contact_doc.full_name = name
+			# The row already read above is enough unless something must change.
+			if name and not (existing_contact.full_name or "").strip():
 				updated_fields.append("full_name")
-			if email and not (contact_doc.email or "").strip():
-				contact_doc.email = email
+			if email and not (existing_contact.email or "").strip():
 				updated_fields.append("email")
 
+			contact_doc = existing_contact
 			if updated_fields:
+				contact_doc = frappe.get_doc("Cheese Contact", existing_contact.name)
+				if "full_name" in updated_fields:
+					contact_doc.full_name = name
+				if "email" in updated_fields:
+					contact_doc.email = email
 				contact_doc.save()
-				frappe.db.commit()
 
 			return success(
 				"Contact found and updated" if updated_fields else "Contact found",
@@ -100,8 +104,30 @@ def find_or_create_contact(phone=None, email=None, name=None, **_ignored):
 			contact_data["full_name"] = name
 		
 		contact = frappe.get_doc(contact_data)
-		contact.insert()
-		frappe.db.commit()
+		savepoint = "cheese_contact_create"
+		frappe.db.savepoint(savepoint)
+		try:
+			contact.insert()
+		except frappe.DuplicateEntryError:
+			# Race condition: a concurrent request inserted this phone (the primary
+			# key) between our lookup and insert. Return the winner instead.
+			frappe.db.rollback(save_point=savepoint)
+			winner = frappe.db.get_value(
+				"Cheese Contact", phone, ["name", "full_name", "phone", "email"], as_dict=True
+			)
+			if not winner:
+				raise
+			return success(
+				"Contact found",
+				{
+					"contact_id": winner.name,
+					"full_name": winner.full_name,
+					"phone": winner.phone,
+					"email": winner.email,
+					"is_new": False,
+					"updated_fields": [],
+				}
+			)
 
 		return created(
 			"Contact created successfully",
@@ -116,7 +142,7 @@ def find_or_create_contact(phone=None, email=None, name=None, **_ignored):
 	except frappe.ValidationError as e:
 		return validation_error(str(e))
 	except Exception as e:
-		frappe.log_error(f"Error in find_or_create_contact: {str(e)}")
+		log_api_error(f"Error in find_or_create_contact: {str(e)}")
 		return error("Failed to create contact", "SERVER_ERROR", {"error": str(e)}, 500)
 
 
@@ -158,9 +184,9 @@ def append_company_to_contact(contact_id=None, company_id=None, notes=None):
 		if not company_id:
 			return validation_error("company_id is required")
 
-		if not frappe.db.exists("Cheese Contact", contact_id):
+		if not contact_exists(contact_id):
 			return not_found("Contact", contact_id)
-		if not frappe.db.exists("Company", company_id):
+		if not record_exists("Company", company_id):
 			return not_found("Company", company_id)
 
 		# Tenant isolation: scoped users may only act on their own contacts and
@@ -205,6 +231,18 @@ def append_company_to_contact(contact_id=None, company_id=None, notes=None):
 		return error("Failed to append company to contact", "SERVER_ERROR", {"error": str(e)}, 500)
 
 
+# Contact fields update_contact may write, in the order of its keyword
+# arguments (name, phone, email, preferred_language, notes, preferred_channel).
+_UPDATE_FIELDS = (
+	"full_name",
+	"phone",
+	"email",
+	"preferred_language",
+	"privacy_notes",
+	"preferred_channel",
+)
+
+
 @frappe.whitelist()
 def update_contact(contact_id, name=None, phone=None, email=None, preferred_language=None, notes=None, preferred_channel=None, idempotency_key=None):
 	"""
@@ -229,64 +267,31 @@ def update_contact(contact_id, name=None, phone=None, email=None, preferred_lang
 		if not contact_id:
 			return validation_error("contact_id is required")
 		
-		if not frappe.db.exists("Cheese Contact", contact_id):
+		# Fields to update; an empty request is rejected before the contact is loaded.
+		# Allow name to be set to empty string (None check allows empty strings)
+		provided = (name, phone, email, preferred_language, notes, preferred_channel)
+		updates = {
+			fieldname: value for fieldname, value in zip(_UPDATE_FIELDS, provided, strict=True) if value is not None
+		}
+		if not updates:
+			return validation_error("No fields to update provided")
+		
+		try:
+			contact = frappe.get_doc("Cheese Contact", contact_id)
+		except frappe.DoesNotExistError:
 			return not_found("Contact", contact_id)
 
 		assert_contact_access(contact_id)
-
-		contact = frappe.get_doc("Cheese Contact", contact_id)
 		
 		# Track changed fields
-		changed_fields = []
-		old_values = {}
-		
-		# Whitelist of allowed fields
-		allowed_fields = {
-			"name": "full_name",
-			"phone": "phone",
-			"email": "email",
-			"preferred_language": "preferred_language",
-			"notes": "privacy_notes",
-			"preferred_channel": "preferred_channel"
-		}
-		
-		# Update fields if provided
-		# Allow name to be set to empty string (None check allows empty strings)
-		new_phone = None
-		if name is not None:
-			old_values["full_name"] = contact.full_name
-			contact.full_name = name if name else ""  # Ensure empty string if name is empty
-			changed_fields.append("full_name")
-		if phone is not None:
-			old_values["phone"] = contact.phone
-			new_phone = phone
-			contact.phone = new_phone
-			changed_fields.append("phone")
-		if email is not None:
-			old_values["email"] = contact.email
-			contact.email = email
-			changed_fields.append("email")
-		if preferred_language is not None:
-			old_values["preferred_language"] = contact.preferred_language
-			contact.preferred_language = preferred_language
-			changed_fields.append("preferred_language")
-		if notes is not None:
-			old_values["privacy_notes"] = contact.privacy_notes
-			contact.privacy_notes = notes
-			changed_fields.append("privacy_notes")
-		if preferred_channel is not None:
-			old_values["preferred_channel"] = contact.preferred_channel
-			contact.preferred_channel = preferred_channel
-			changed_fields.append("preferred_channel")
-		
-		if not changed_fields:
-			return validation_error("No fields to update provided")
+		changed_fields = list(updates)
+		old_values = {fieldname: contact.get(fieldname) for fieldname in updates}
+		contact.update(updates)
+		new_phone = phone
 		
-		# Create audit event
+		# Queue audit event; the row is written by a worker after commit
 		audit_event_id = None
 		try:
-			# Log change event
-			from frappe.utils import now_datetime
 			# Combine audit data into payload_json
 			payload = {
 				"changed_fields": changed_fields,
@@ -295,17 +300,9 @@ def update_contact(contact_id, name=None, phone=None, email=None, preferred_lang
 			if idempotency_key:
 				payload["idempotency_key"] = idempotency_key
 			
-			audit_data = {
-				"doctype": "Cheese System Event",
-				"event_type": "CONTACT_UPDATED",
-				"entity_type": "Cheese Contact",
-				"entity_id": contact_id,
-				"payload_json": json.dumps(payload),
-				"created_at": now_datetime()
-			}
-			audit_event = frappe.get_doc(audit_data)
-			audit_event.insert(ignore_permissions=True)
-			audit_event_id = audit_event.name
+			audit_event_id = enqueue_system_event(
+				"Cheese Contact", contact_id, "CONTACT_UPDATED", payload
+			)
 		except Exception as audit_error:
 			frappe.log_error(f"Failed to create audit event: {str(audit_error)}")
 		
@@ -326,16 +323,17 @@ def update_contact(contact_id, name=None, phone=None, email=None, preferred_lang
 			if existing_by_phone:
 				return validation_error(f"Contact with phone number {new_phone} already exists: {existing_by_phone[0].name}")
 		
-		# Save triggers CheeseContact.on_update to sync document name with phone only (not full_name).
+		# Save (not set_value): validate normalizes preferences and rejects
+		# duplicates, and CheeseContact.on_update syncs the document name with
+		# phone only (not full_name). The in-memory doc already holds every field
+		# the response needs, so it is not reloaded.
 		# Preserve original contact_id — it must stay immutable unless phone is explicitly changed.
 		original_contact_id = contact_id
 		contact.save()
-		frappe.db.commit()
-		contact.reload()
 
 		# contact_id only changes when phone changes (name is keyed to phone).
 		# Name-only updates keep the same id.
-		final_contact_id = contact.name if new_phone else original_contact_id
+		final_contact_id = str(contact.phone).strip() if new_phone else original_contact_id
 		
 		return success(
 			"Contact updated successfully",
@@ -359,6 +357,118 @@ def update_contact(contact_id, name=None, phone=None, email=None, preferred_lang
 		return error("Failed to update contact", "SERVER_ERROR", {"error": str(e)}, 500)
 
 
+# Seconds get_contact_profile's related lists may be served from cache.
+_CONTACT_PROFILE_CACHE_TTL = 30
+
+
+def _contact_profile_version_key(contact_id):
+	return f"cheese:contact_profile_version:{contact_id}"
+
+
+def _contact_profile_cache_key(contact_id, user_company):
+	"""Cache key for get_contact_profile lists; bumping the contact's version invalidates it."""
+	version = frappe.cache.get_value(_contact_profile_version_key(contact_id)) or 0
+	return f"cheese:contact_profile:{contact_id}:{user_company or ''}:{version}"
+
+
+def _load_contact_profile_lists(contact_id):
+	"""
+	Read the leads, conversations, reservations and quotations shown on a profile
+	
+	Args:
+		contact_id: Contact ID
+		
+	Returns:
+		Dict of the four lists, each scoped to the user's company
+	"""
+	# Get leads (scoped to the user's company) together with their quotations:
+	# the 10 most recent leads as a derived table, left-joined to quotations.
+	Lead = DocType("Cheese Lead")
+	Quotation = DocType("Cheese Quotation")
+	recent_leads = frappe.qb.from_(Lead).select(
+		Lead.name, Lead.status, Lead.interest_type, Lead.last_interaction_at, Lead.lost_reason, Lead.modified
+	)
+	for field, value in scope_filters({"contact": contact_id}).items():
+		recent_leads = recent_leads.where(Lead[field] == value)
+	recent_leads = recent_leads.orderby(Lead.modified, order=Order.desc).limit(10).as_("recent_leads")
+	rows = (
+		frappe.qb.from_(recent_leads)
+		.left_join(Quotation)
+		.on(Quotation.lead == recent_leads.field("name"))
+		.select(
+			recent_leads.field("name"),
+			recent_leads.field("status"),
+			recent_leads.field("interest_type"),
+			recent_leads.field("last_interaction_at"),
+			recent_leads.field("lost_reason"),
+			Quotation.name.as_("quotation"),
+			Quotation.status.as_("quotation_status"),
+			Quotation.total_price,
+			Quotation.deposit_amount,
+			Quotation.valid_until,
+			Quotation.modified.as_("quotation_modified"),
+		)
+		.orderby(recent_leads.field("modified"), order=Order.desc)
+		.run(as_dict=True)
+	)
+	
+	leads = []
+	seen_leads = set()
+	lead_quotations = []
+	for row in rows:
+		if row.name not in seen_leads:
+			seen_leads.add(row.name)
+			leads.append(
+				frappe._dict(
+					name=row.name,
+					status=row.status,
+					interest_type=row.interest_type,
+					last_interaction_at=row.last_interaction_at,
+					lost_reason=row.lost_reason,
+				)
+			)
+		if row.quotation:
+			lead_quotations.append(row)
+	
+	# Most recent quotations across those leads
+	lead_quotations.sort(key=lambda row: row.quotation_modified, reverse=True)
+	quotations = [
+		frappe._dict(
+			name=row.quotation,
+			status=row.quotation_status,
+			total_price=row.total_price,
+			deposit_amount=row.deposit_amount,
+			valid_until=row.valid_until,
+		)
+		for row in lead_quotations[:5]
+	]
+	
+	# Get conversations (scoped to the user's company)
+	conversations = frappe.get_all(
+		"Conversation",
+		filters=scope_filters({"contact": contact_id}),
+		fields=["name", "channel", "status", "summary", "modified"],
+		order_by="modified desc",
+		limit=10
+	)
+	
+	# Get reservations/tickets (scoped to the user's company)
+	reservations = frappe.get_all(
+		"Cheese Ticket",
+		filters=scope_filters({"contact": contact_id}),
+		fields=["name", "status", "experience", "slot", "party_size", "created", "modified"],
+		order_by="modified desc",
+		limit=10
+	)
+	
+	return {
+		"leads": leads,
+		"conversations": conversations,
+		"reservations": reservations,
+		"quotations": quotations,
+	}
+
+
 @frappe.whitelist()
 def get_contact_profile(contact_id):
 	"""
@@ -374,48 +484,39 @@ def get_contact_profile(contact_id):
 		if not contact_id:
 			return validation_error("contact_id is required")
 		
-		if not frappe.db.exists("Cheese Contact", contact_id):
+		# One narrow read both proves the contact exists and supplies the header
+		# fields; the full document (child tables included) is never needed here.
+		contact = frappe.db.get_value(
+			"Cheese Contact",
+			contact_id,
+			[
+				"name",
+				"full_name",
+				"phone",
+				"email",
+				"preferred_language",
+				"preferred_channel",
+				"opt_in_status",
+				"do_not_contact",
+			],
+			as_dict=True,
+		)
+		if not contact:
 			return not_found("Contact", contact_id)
 
 		assert_contact_access(contact_id)
-
-		contact = frappe.get_doc("Cheese Contact", contact_id)
-		
-		# Get leads (scoped to the user's company)
-		leads = frappe.get_all(
-			"Cheese Lead",
-			filters=scope_filters({"contact": contact_id}),
-			fields=["name", "status", "interest_type", "last_interaction_at", "lost_reason"],
-			order_by="modified desc",
-			limit=10
-		)
 		
-		# Get conversations (scoped to the user's company)
-		conversations = frappe.get_all(
-			"Conversation",
-			filters=scope_filters({"contact": contact_id}),
-			fields=["name", "channel", "status", "summary", "modified"],
-			order_by="modified desc",
-			limit=10
-		)
-		
-		# Get reservations/tickets (scoped to the user's company)
-		reservations = frappe.get_all(
-			"Cheese Ticket",
-			filters=scope_filters({"contact": contact_id}),
-			fields=["name", "status", "experience", "slot", "party_size", "created", "modified"],
-			order_by="modified desc",
-			limit=10
-		)
-		
-		# Get quotations (constrained to the scoped leads above)
-		quotations = frappe.get_all(
-			"Cheese Quotation",
-			filters={"lead": ["in", [lead.name for lead in leads] or [""]]},
-			fields=["name", "status", "total_price", "deposit_amount", "valid_until"],
-			order_by="modified desc",
-			limit=5
-		)
+		# The four lists only change on writes to those records, which bump the
+		# contact's cache version (see events.clear_contact_profile_cache).
+		cache_key = _contact_profile_cache_key(contact_id, scope_filters().get("company"))
+		lists = frappe.cache.get_value(cache_key)
+		if lists is None:
+			lists = _load_contact_profile_lists(contact_id)
+			frappe.cache.set_value(cache_key, lists, expires_in_sec=_CONTACT_PROFILE_CACHE_TTL)
+		leads = lists["leads"]
+		conversations = lists["conversations"]
+		reservations = lists["reservations"]
+		quotations = lists["quotations"]
 		
 		return success(
 			"Contact profile retrieved successfully",
@@ -443,6 +544,38 @@ def get_contact_profile(contact_id):
 		return error("Failed to get contact profile", "SERVER_ERROR", {"error": str(e)}, 500)
 
 
+def _contact_list_page(doctype, filters, fields, page, page_size):
+	"""
+	One page of a contact list, newest first, with the total from the same query
+
+	COUNT(*) OVER() is evaluated before LIMIT, so every row carries the total.
+	
+	Args:
+		doctype: Listed DocType
+		filters: Equality filters (field -> value) of the list
+		fields: Columns to select
+		page: Current page number
+		page_size: Items per page
+		
+	Returns:
+		(rows of the page, total number of matching rows)
+	"""
+	table = DocType(doctype)
+	query = frappe.qb.from_(table)
+	for field, value in filters.items():
+		query = query.where(table[field] == value)
+
+	rows = (
+		query.select(*(table[field] for field in fields), an.Count("*").over().as_("total_count"))
+		.orderby(table.modified, order=Order.desc)
+		.limit(page_size)
+		.offset((page - 1) * page_size)
+		.run(as_dict=True)
+	)
+	total = window_total(rows, page, lambda: query.select(fn.Count("*")).run()[0][0])
+	return rows, total
+
+
 @frappe.whitelist()
 def get_contact_leads(contact_id, page=1, page_size=20):
 	"""
@@ -463,25 +596,28 @@ def get_contact_leads(contact_id, page=1, page_size=20):
 		if not contact_id:
 			return validation_error("contact_id is required")
 		
-		if not frappe.db.exists("Cheese Contact", contact_id):
-			return not_found("Contact", contact_id)
-
-		assert_contact_access(contact_id)
+		try:
+			assert_contact_access(contact_id)
+		except frappe.PermissionError:
+			if not contact_exists(contact_id):
+				return not_found("Contact", contact_id)
+			raise
 
 		page = cint(page) or 1
 		page_size = cint(page_size) or 20
 
 		lead_filters = scope_filters({"contact": contact_id})
-		leads = frappe.get_all(
+		leads, total = _contact_list_page(
 			"Cheese Lead",
-			filters=lead_filters,
-			fields=["name", "status", "interest_type", "last_interaction_at", "lost_reason", "conversation", "modified"],
-			limit_start=(page - 1) * page_size,
-			limit_page_length=page_size,
-			order_by="modified desc"
+			lead_filters,
+			["name", "status", "interest_type", "last_interaction_at", "lost_reason", "conversation", "modified"],
+			page,
+			page_size,
 		)
 		
-		total = frappe.db.count("Cheese Lead", lead_filters)
+		# Existence is only in doubt when nothing matched
+		if not total and not contact_exists(contact_id):
+			return not_found("Contact", contact_id)
 		
 		return paginated_response(
 			leads,
@@ -515,25 +651,28 @@ def get_contact_conversations(contact_id, page=1, page_size=20):
 		if not contact_id:
 			return validation_error("contact_id is required")
 		
-		if not frappe.db.exists("Cheese Contact", contact_id):
-			return not_found("Contact", contact_id)
-
-		assert_contact_access(contact_id)
+		try:
+			assert_contact_access(contact_id)
+		except frappe.PermissionError:
+			if not contact_exists(contact_id):
+				return not_found("Contact", contact_id)
+			raise
 
 		page = cint(page) or 1
 		page_size = cint(page_size) or 20
 
 		conv_filters = scope_filters({"contact": contact_id})
-		conversations = frappe.get_all(
+		conversations, total = _contact_list_page(
 			"Conversation",
-			filters=conv_filters,
-			fields=["name", "channel", "status", "summary", "lead", "ticket", "route_booking", "modified"],
-			limit_start=(page - 1) * page_size,
-			limit_page_length=page_size,
-			order_by="modified desc"
+			conv_filters,
+			["name", "channel", "status", "summary", "lead", "ticket", "route_booking", "modified"],
+			page,
+			page_size,
 		)
 		
-		total = frappe.db.count("Conversation", conv_filters)
+		# Existence is only in doubt when nothing matched
+		if not total and not contact_exists(contact_id):
+			return not_found("Contact", contact_id)
 		
 		return paginated_response(
 			conversations,
@@ -567,31 +706,43 @@ def get_contact_reservations(contact_id, page=1, page_size=20):
 		if not contact_id:
 			return validation_error("contact_id is required")
 		
-		if not frappe.db.exists("Cheese Contact", contact_id):
-			return not_found("Contact", contact_id)
-
-		assert_contact_access(contact_id)
+		try:
+			assert_contact_access(contact_id)
+		except frappe.PermissionError:
+			if not contact_exists(contact_id):
+				return not_found("Contact", contact_id)
+			raise
 
 		page = cint(page) or 1
 		page_size = cint(page_size) or 20
 
 		ticket_filters = scope_filters({"contact": contact_id})
-		reservations = frappe.get_all(
+		reservations, total = _contact_list_page(
 			"Cheese Ticket",
-			filters=ticket_filters,
-			fields=["name", "status", "experience", "slot", "party_size", "company", "route", "created", "modified"],
-			limit_start=(page - 1) * page_size,
-			limit_page_length=page_size,
-			order_by="modified desc"
+			ticket_filters,
+			["name", "status", "experience", "slot", "party_size", "company", "route", "created", "modified"],
+			page,
+			page_size,
 		)
 		
-		# Enrich with experience names
+		# Enrich with experience names (one lookup for the whole page)
+		experience_ids = {r.experience for r in reservations if r.experience}
+		existing_experiences = set(
+			frappe.get_all(
+				"Cheese Experience",
+				filters={"name": ["in", list(experience_ids)]},
+				pluck="name",
+			)
+		) if experience_ids else set()
 		for reservation in reservations:
 			if reservation.experience:
-				exp = frappe.db.get_value("Cheese Experience", reservation.experience, "name", as_dict=True)
-				reservation["experience_name"] = exp.name if exp else None
+				reservation["experience_name"] = (
+					reservation.experience if reservation.experience in existing_experiences else None
+				)
 		
-		total = frappe.db.count("Cheese Ticket", ticket_filters)
+		# Existence is only in doubt when nothing matched
+		if not total and not contact_exists(contact_id):
+			return not_found("Contact", contact_id)
 		
 		return paginated_response(
 			reservations,
@@ -1,14 +1,48 @@
 # Copyright (c) 2024
 # License: MIT
 
+from functools import lru_cache
+
 import frappe
 from frappe import _
-from frappe.utils import now_datetime, cint, add_to_date
-from cheese.api.common.responses import success, created, error, not_found, validation_error, paginated_response
+from frappe.utils import now_datetime, cint
+from cheese.api.common.responses import success, created, error, not_found, validation_error, paginated_response, record_exists
+from cheese.cheese.doctype.cheese_contact.cheese_contact import contact_exists
 from cheese.cheese.utils.access import assert_record_access
+from cheese.cheese.utils.events import clear_contact_profile_cache, enqueue_system_event
 import json
 
 
+# Channels a conversation can be opened on.
+_ALLOWED_CHANNELS = frozenset(("WhatsApp", "Telegram", "Instagram", "Web", "Agent"))
+
+# Fixed statement text for the resume lookup; served by the
+# (contact, channel, status, modified) index.
+_ACTIVE_CONVERSATION_SQL = """
+	SELECT name, channel, status
+	FROM `tabConversation`
+	WHERE contact = %s AND channel = %s AND status = 'ACTIVE'
+	ORDER BY modified DESC
+	LIMIT 1
+"""
+
+
+def _find_active_conversation(contact_id, channel):
+	"""Most recently touched ACTIVE conversation for a contact + channel, or None."""
+	rows = frappe.db.sql(_ACTIVE_CONVERSATION_SQL, (contact_id, channel), as_dict=True)
+	return rows[0] if rows else None
+
+
+@lru_cache(maxsize=256)
+def _parse_highlights(highlights_json):
+	"""json.loads for stored highlights, memoized for the life of the worker.
+
+	Keyed on the stored text itself, so any write to a conversation's
+	highlights is a new key. The result is shared: do not mutate it.
+	"""
+	return json.loads(highlights_json)
+
+
 @frappe.whitelist()
 def open_or_resume_conversation(contact_id, channel, status="ACTIVE"):
 	"""
@@ -33,66 +67,50 @@ def open_or_resume_conversation(contact_id, channel, status="ACTIVE"):
 		if not channel:
 			return validation_error("channel is required")
 		
-		if channel not in ["WhatsApp", "Telegram", "Instagram", "Web", "Agent"]:
+		if channel not in _ALLOWED_CHANNELS:
 			return validation_error(f"Invalid channel: {channel}")
 		
-		if not frappe.db.exists("Cheese Contact", contact_id):
-			return not_found("Contact", contact_id)
-		
-		existing_filters = {
-			"contact": contact_id,
-			"channel": channel,
-			"status": "ACTIVE",
-		}
-
-		existing = frappe.db.get_value(
-			"Conversation",
-			existing_filters,
-			"name",
-			order_by="modified desc"
-		)
+		existing = _find_active_conversation(contact_id, channel)
 		
 		if existing:
 			# Resume existing conversation
-			conversation = frappe.get_doc("Conversation", existing)
 			return success(
 				"Conversation resumed",
 				{
-					"conversation_id": conversation.name,
+					"conversation_id": existing.name,
 					"contact_id": contact_id,
-					"channel": conversation.channel,
-					"status": conversation.status,
+					"channel": existing.channel,
+					"status": existing.status,
 					"is_new": False
 				}
 			)
 		
+		# An existing conversation already proves the contact exists; only a new
+		# one needs the check.
+		if not contact_exists(contact_id):
+			return not_found("Contact", contact_id)
+		
 		conversation = frappe.get_doc({
 			"doctype": "Conversation",
 			"contact": contact_id,
 			"channel": channel,
 			"status": status,
 		})
+		frappe.db.savepoint("cheese_conversation_create")
 		try:
 			conversation.insert()
-			frappe.db.commit()
 		except frappe.DuplicateEntryError:
 			# Race condition: another request created the conversation first
-			frappe.db.rollback()
-			existing = frappe.db.get_value(
-				"Conversation",
-				existing_filters,
-				"name",
-				order_by="modified desc"
-			)
+			frappe.db.rollback(save_point="cheese_conversation_create")
+			existing = _find_active_conversation(contact_id, channel)
 			if existing:
-				conversation = frappe.get_doc("Conversation", existing)
 				return success(
 					"Conversation resumed",
 					{
-						"conversation_id": conversation.name,
+						"conversation_id": existing.name,
 						"contact_id": contact_id,
-						"channel": conversation.channel,
-						"status": conversation.status,
+						"channel": existing.channel,
+						"status": existing.status,
 						"is_new": False
 					}
 				)
@@ -131,72 +149,6 @@ def create_conversation(contact_id, channel, status="ACTIVE"):
 		Success response with conversation data
 	"""
 	return open_or_resume_conversation(contact_id, channel, status)
-	try:
-		if not contact_id:
-			return validation_error("contact_id is required")
-		if not channel:
-			return validation_error("channel is required")
-		
-		if channel not in ["WhatsApp", "Telegram", "Instagram", "Web", "Agent"]:
-			return validation_error(f"Invalid channel: {channel}")
-		
-		if not frappe.db.exists("Cheese Contact", contact_id):
-			return not_found("Contact", contact_id)
-		
-		# Check for existing active conversation within time window (e.g., last 24 hours)
-		time_window = add_to_date(now_datetime(), hours=-24, as_string=False)
-		
-		existing = frappe.db.get_value(
-			"Conversation",
-			{
-				"contact": contact_id,
-				"channel": channel,
-				"status": "ACTIVE",
-				"modified": [">", time_window]
-			},
-			"name",
-			order_by="modified desc"
-		)
-		
-		if existing:
-			# Reuse existing conversation
-			conversation = frappe.get_doc("Conversation", existing)
-			return success(
-				"Existing conversation reused",
-				{
-					"conversation_id": conversation.name,
-					"contact_id": contact_id,
-					"channel": conversation.channel,
-					"status": conversation.status,
-					"is_new": False
-				}
-			)
-		
-		# Create new conversation
-		conversation = frappe.get_doc({
-			"doctype": "Conversation",
-			"contact": contact_id,
-			"channel": channel,
-			"status": status
-		})
-		conversation.insert()
-		frappe.db.commit()
-		
-		return created(
-			"Conversation created successfully",
-			{
-				"conversation_id": conversation.name,
-				"contact_id": contact_id,
-				"channel": conversation.channel,
-				"status": conversation.status,
-				"is_new": True
-			}
-		)
-	except frappe.ValidationError as e:
-		return validation_error(str(e))
-	except Exception as e:
-		frappe.log_error(f"Error in create_conversation: {str(e)}")
-		return error("Failed to create conversation", "SERVER_ERROR", {"error": str(e)}, 500)
 
 
 @frappe.whitelist()
@@ -218,36 +170,48 @@ def update_conversation_summary(conversation_id, summary=None, highlights_json=N
 		if not conversation_id:
 			return validation_error("conversation_id is required")
 		
-		if not frappe.db.exists("Conversation", conversation_id):
+		conversation = frappe.db.get_value(
+			"Conversation",
+			conversation_id,
+			["name", "contact", "summary", "transcript_url", "transcript_reference"],
+			as_dict=True,
+		)
+		if not conversation:
 			return not_found("Conversation", conversation_id)
 
 		try:
 			assert_record_access("Conversation", conversation_id)
 		except frappe.PermissionError:
 			return error("Unauthorized", "UNAUTHORIZED", {}, 403)
-
-		conversation = frappe.get_doc("Conversation", conversation_id)
 		
+		# None of these fields take part in Conversation.validate, so they are
+		# written with one UPDATE instead of a full load + save.
+		updates = {}
 		if summary is not None:
-			conversation.summary = summary
+			updates["summary"] = summary
 		
 		if highlights_json is not None:
-			# Validate JSON if string
+			# Validate JSON if string, then store it in compact canonical form
 			if isinstance(highlights_json, str):
 				try:
-					json.loads(highlights_json)
+					highlights = json.loads(highlights_json)
 				except Exception as e:
 					return validation_error(f"Invalid highlights_json format: {str(e)}")
-			conversation.highlights_json = highlights_json
+			else:
+				highlights = highlights_json
+			updates["highlights_json"] = json.dumps(highlights, separators=(",", ":"))
 		
 		if transcript_url is not None:
-			conversation.transcript_url = transcript_url
+			updates["transcript_url"] = transcript_url
 		
 		if transcript_reference is not None:
-			conversation.transcript_reference = transcript_reference
+			updates["transcript_reference"] = transcript_reference
 		
-		conversation.save()
-		frappe.db.commit()
+		if updates:
+			frappe.db.set_value("Conversation", conversation_id, updates)
+			conversation.update(updates)
+			# set_value skips doc_events; the contact profile lists the summary
+			clear_contact_profile_cache(conversation)
 		
 		return success(
 			"Conversation summary updated successfully",
@@ -280,37 +244,44 @@ def get_conversation_details(conversation_id):
 		if not conversation_id:
 			return validation_error("conversation_id is required")
 		
-		if not frappe.db.exists("Conversation", conversation_id):
+		try:
+			conversation = frappe.get_doc("Conversation", conversation_id)
+		except frappe.DoesNotExistError:
 			return not_found("Conversation", conversation_id)
 
 		try:
 			assert_record_access("Conversation", conversation_id)
 		except frappe.PermissionError:
 			return error("Unauthorized", "UNAUTHORIZED", {}, 403)
-
-		conversation = frappe.get_doc("Conversation", conversation_id)
 		
+		# Linked records: only a few scalar columns are shown, so read just those
 		# Get contact details
 		contact = None
 		if conversation.contact:
-			contact = frappe.get_doc("Cheese Contact", conversation.contact)
+			contact = frappe.db.get_value(
+				"Cheese Contact", conversation.contact, ["name", "full_name", "phone", "email"], as_dict=True
+			)
 		
 		# Get linked lead
 		lead = None
 		if conversation.lead:
-			lead = frappe.get_doc("Cheese Lead", conversation.lead)
+			lead = frappe.db.get_value(
+				"Cheese Lead", conversation.lead, ["name", "status", "interest_type"], as_dict=True
+			)
 		
 		# Get linked ticket
 		ticket = None
 		if conversation.ticket:
-			ticket = frappe.get_doc("Cheese Ticket", conversation.ticket)
+			ticket = frappe.db.get_value(
+				"Cheese Ticket", conversation.ticket, ["name", "status", "experience"], as_dict=True
+			)
 		
 		# Parse highlights
 		highlights = None
 		if conversation.highlights_json:
 			try:
 				if isinstance(conversation.highlights_json, str):
-					highlights = json.loads(conversation.highlights_json)
+					highlights = _parse_highlights(conversation.highlights_json)
 				else:
 					highlights = conversation.highlights_json
 			except Exception:
@@ -391,19 +362,30 @@ def list_conversations(page=1, page_size=20, contact_id=None, channel=None, stat
 			order_by="modified desc",
 		)
 		
-		# Enrich with contact names
+		# Enrich with contact names (one lookup for the whole page). Kept as a
+		# separate IN query rather than a JOIN so get_list's permission
+		# conditions still apply to the conversation rows unchanged.
+		contact_ids = {conv.contact for conv in conversations if conv.contact}
+		contact_names = dict(
+			frappe.get_all(
+				"Cheese Contact",
+				filters={"name": ["in", list(contact_ids)]},
+				fields=["name", "full_name"],
+				as_list=True,
+			)
+		) if contact_ids else {}
 		for conv in conversations:
 			if conv.contact:
-				contact = frappe.db.get_value("Cheese Contact", conv.contact, "full_name", as_dict=True)
-				conv["contact_name"] = contact.full_name if contact else None
+				conv["contact_name"] = contact_names.get(conv.contact)
 
-		# Use get_list with `as_list=True` so the permission_query_conditions
-		# (multi-tenant scoping) is honoured in the total count too.
+		# Use get_list so the permission_query_conditions (multi-tenant
+		# scoping) is honoured in the total count too; pluck keeps the rows
+		# as bare names instead of one dict each.
 		total = len(
 			frappe.get_list(
 				"Conversation",
 				filters=filters,
-				fields=["name"],
+				pluck="name",
 				limit_page_length=0,  # no limit, return all matching names
 			)
 		)
@@ -444,7 +426,7 @@ def link_conversation_entity(conversation_id, entity_type, entity_id):
 		if entity_type not in ["lead", "ticket", "route_booking"]:
 			return validation_error(f"Invalid entity_type: {entity_type}. Must be lead, ticket, or route_booking")
 		
-		if not frappe.db.exists("Conversation", conversation_id):
+		if not record_exists("Conversation", conversation_id):
 			return not_found("Conversation", conversation_id)
 
 		try:
@@ -452,37 +434,44 @@ def link_conversation_entity(conversation_id, entity_type, entity_id):
 		except frappe.PermissionError:
 			return error("Unauthorized", "UNAUTHORIZED", {}, 403)
 
-		conversation = frappe.get_doc("Conversation", conversation_id)
-		
 		# Validate entity exists and belongs to the user's company
 		try:
 			if entity_type == "lead":
-				if not frappe.db.exists("Cheese Lead", entity_id):
+				if not record_exists("Cheese Lead", entity_id):
 					return not_found("Lead", entity_id)
 				from cheese.cheese.utils.access import assert_lead_access
 
 				assert_lead_access(entity_id)
-				conversation.lead = entity_id
+				fieldname = "lead"
 			elif entity_type == "ticket":
-				if not frappe.db.exists("Cheese Ticket", entity_id):
+				if not record_exists("Cheese Ticket", entity_id):
 					return not_found("Ticket", entity_id)
 				assert_record_access("Cheese Ticket", entity_id)
-				conversation.ticket = entity_id
+				fieldname = "ticket"
 			elif entity_type == "route_booking":
-				if frappe.db.exists("Cheese Route Booking", entity_id):
+				if record_exists("Cheese Route Booking", entity_id):
 					assert_record_access("Cheese Route Booking", entity_id)
 				# Route booking would be a string reference
-				conversation.route_booking = entity_id
+				fieldname = "route_booking"
 		except frappe.PermissionError:
 			return error("Unauthorized", "UNAUTHORIZED", {}, 403)
 		
-		conversation.save()
-		frappe.db.commit()
+		frappe.db.set_value("Conversation", conversation_id, fieldname, entity_id)
+		
+		if fieldname == "lead":
+			# set_value skips doc_events; keep the OPEN -> IN_PROGRESS lead automation
+			from cheese.cheese.utils.lead_automation import on_conversation_update
+
+			on_conversation_update(
+				frappe.db.get_value(
+					"Conversation", conversation_id, ["name", "lead", "contact", "company"], as_dict=True
+				)
+			)
 		
 		return success(
 			"Conversation linked successfully",
 			{
-				"conversation_id": conversation.name,
+				"conversation_id": conversation_id,
 				"entity_type": entity_type,
 				"entity_id": entity_id
 			}
@@ -515,7 +504,7 @@ def append_conversation_event(conversation_id, event_type, event_data=None, meta
 		if not event_type:
 			return validation_error("event_type is required")
 		
-		if not frappe.db.exists("Conversation", conversation_id):
+		if not record_exists("Conversation", conversation_id):
 			return not_found("Conversation", conversation_id)
 
 		try:
@@ -544,26 +533,23 @@ def append_conversation_event(conversation_id, event_type, event_data=None, meta
 		if metadata:
 			payload["metadata"] = metadata
 		
-		event_doc = {
-			"doctype": "Cheese System Event",
-			"event_type": f"CONVERSATION_{event_type.upper()}",
-			"entity_type": "Conversation",
-			"entity_id": conversation_id,
-			"payload_json": json.dumps(payload) if payload else None,
-			"created_at": now_datetime()
-		}
-		
-		event = frappe.get_doc(event_doc)
-		event.insert(ignore_permissions=True)
-		frappe.db.commit()
+		# Written by a worker after commit; the name is resolved up front
+		created_at = now_datetime()
+		event_id = enqueue_system_event(
+			"Conversation",
+			conversation_id,
+			f"CONVERSATION_{event_type.upper()}",
+			payload,
+			created_at=created_at,
+		)
 		
 		return created(
 			"Conversation event logged successfully",
 			{
-				"event_id": event.name,
+				"event_id": event_id,
 				"conversation_id": conversation_id,
 				"event_type": event_type,
-				"created_at": str(event.created_at) if event.created_at else None
+				"created_at": str(created_at)
 			}
 		)
 	except frappe.ValidationError as e:
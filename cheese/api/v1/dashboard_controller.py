@@ -1,10 +1,13 @@
 # Copyright (c) 2024
 # License: MIT
 
+from collections import Counter
+from itertools import groupby
+
 import frappe
 from frappe import _
-from frappe.utils import getdate, today, add_days, cint, now_datetime
-from cheese.api.common.responses import success, error, validation_error
+from frappe.utils import getdate, today, add_days, cint, flt, now_datetime
+from cheese.api.common.responses import success, error, validation_error, log_api_error
 from cheese.api.v1.user_controller import _get_current_user_company
 from cheese.cheese.utils.permissions import _is_super_admin, get_user_companies, _quote_list
 
@@ -60,6 +63,65 @@ def _dashboard_company_scope(user=None):
 	return _get_current_user_company()
 
 
+# Seconds a dashboard payload is reused; periods that ended before today no
+# longer change, so they are kept for longer.
+_DASHBOARD_CACHE_TTL = 30
+_DASHBOARD_HISTORICAL_CACHE_TTL = 3600
+
+
+def _dashboard_cache_key(endpoint, company, period, date_from, date_to, user=None):
+	"""
+	Cache key for a dashboard payload
+
+	Without a company the payload depends on who is asking: super admins see
+	all companies, other users their own lead scope.
+	"""
+	user = user or frappe.session.user
+	scope = company or ("all" if _is_super_admin(user) else user)
+	return f"cheese:dashboard:{endpoint}:{scope}:{period}:{date_from}:{date_to}"
+
+
+def _dashboard_cache_ttl(date_to):
+	"""Cache TTL for a dashboard payload ending on date_to."""
+	if getdate(date_to) < getdate(today()):
+		return _DASHBOARD_HISTORICAL_CACHE_TTL
+	return _DASHBOARD_CACHE_TTL
+
+
+# Day offsets from today of each named period's (start, end), both inclusive.
+_PERIOD_OFFSETS = {
+	"today": (0, 0),
+	"yesterday": (-1, -1),
+	"7": (-6, 0),
+	"30": (-29, 0),
+}
+
+
+def _resolve_period(period, date_from=None, date_to=None):
+	"""
+	Date range of a dashboard period
+	
+	Args:
+		period: Period (today/yesterday/7/30/range)
+		date_from: Start date (if period is range)
+		date_to: End date (if period is range)
+		
+	Returns:
+		(date_from, date_to) as dates, or None for an unknown period or a range
+		missing either date
+	"""
+	if period == "range":
+		if not date_from or not date_to:
+			return None
+		return getdate(date_from), getdate(date_to)
+
+	offsets = _PERIOD_OFFSETS.get(period)
+	if not offsets:
+		return None
+	current_date = getdate(today())
+	return add_days(current_date, offsets[0]), add_days(current_date, offsets[1])
+
+
 def _lead_status_counts_in_period(start_date, end_date, company=None, user=None):
 	"""Count leads by status for a period using DATE(creation)."""
 	user = user or frappe.session.user
@@ -107,31 +169,85 @@ def _leads_for_dashboard(start_date, end_date, company=None, user=None):
 	return counts, sum(counts.values())
 
 
+# Ticket-in-period match: booking date OR creation date falls in the period.
+# Booking date is COALESCE(ticket.selected_date, slot.date_from), so queries
+# using it LEFT JOIN the slot as `s`. {start}/{end} name the query params.
+_TICKET_IN_PERIOD_SQL = """(
+	(
+		COALESCE(t.selected_date, s.date_from) >= %({start})s
+		AND COALESCE(t.selected_date, s.date_from) <= %({end})s
+	)
+	OR (
+		DATE(t.creation) >= %({start})s
+		AND DATE(t.creation) <= %({end})s
+	)
+)"""
+
+
+def _ticket_period_conditions(start_date, end_date, company=None):
+	"""WHERE conditions and params for tickets in a period, optionally for one company."""
+	conditions = [_TICKET_IN_PERIOD_SQL.format(start="start_date", end="end_date")]
+	params = {"start_date": start_date, "end_date": end_date}
+	if company:
+		conditions.append("t.company = %(company)s")
+		params["company"] = company
+	return conditions, params
+
+
 def _ticket_status_counts_with_effective_date(start_date, end_date, company=None):
 	"""
 	Count ticket statuses for period using booking date OR creation date.
 	Booking date is COALESCE(ticket.selected_date, slot.date_from).
 	"""
-	conditions = [
-		"""(
-			(
-				COALESCE(t.selected_date, s.date_from) >= %(start_date)s
-				AND COALESCE(t.selected_date, s.date_from) <= %(end_date)s
-			)
-			OR (
-				DATE(t.creation) >= %(start_date)s
-				AND DATE(t.creation) <= %(end_date)s
-			)
-		)""",
-	]
-	params = {"start_date": start_date, "end_date": end_date}
+	conditions, params = _ticket_period_conditions(start_date, end_date, company)
+	rows = frappe.db.sql(
+		f"""
+		SELECT t.status AS status, COUNT(*) AS count
+		FROM `tabCheese Ticket` t
+		LEFT JOIN `tabCheese Experience Slot` s ON s.name = t.slot
+		WHERE {" AND ".join(conditions)}
+		GROUP BY t.status
+		""",
+		params,
+		as_dict=True,
+	)
+	return {r.status: cint(r.count) for r in rows}
+
+
+def _ticket_status_counts_for_periods(current, previous, company=None):
+	"""
+	Ticket status counts for a period and its comparison period in one scan
+	
+	Same matching as _ticket_status_counts_with_effective_date, applied to
+	both periods with conditional aggregation.
+	
+	Args:
+		current: (start_date, end_date) of the current period
+		previous: (start_date, end_date) of the comparison period
+		company: Optional company filter
+		
+	Returns:
+		(current_counts, previous_counts), each a dict of status -> count
+	"""
+	in_current = _TICKET_IN_PERIOD_SQL.format(start="current_start", end="current_end")
+	in_previous = _TICKET_IN_PERIOD_SQL.format(start="previous_start", end="previous_end")
+	conditions = [f"({in_current} OR {in_previous})"]
+	params = {
+		"current_start": current[0],
+		"current_end": current[1],
+		"previous_start": previous[0],
+		"previous_end": previous[1],
+	}
 	if company:
 		conditions.append("t.company = %(company)s")
 		params["company"] = company
 
 	rows = frappe.db.sql(
 		f"""
-		SELECT t.status AS status, COUNT(*) AS count
+		SELECT
+			t.status AS status,
+			SUM(CASE WHEN {in_current} THEN 1 ELSE 0 END) AS current_count,
+			SUM(CASE WHEN {in_previous} THEN 1 ELSE 0 END) AS previous_count
 		FROM `tabCheese Ticket` t
 		LEFT JOIN `tabCheese Experience Slot` s ON s.name = t.slot
 		WHERE {" AND ".join(conditions)}
@@ -140,22 +256,217 @@ def _ticket_status_counts_with_effective_date(start_date, end_date, company=None
 		params,
 		as_dict=True,
 	)
-	return {r.status: cint(r.count) for r in rows}
+	current_counts = {r.status: cint(r.current_count) for r in rows if cint(r.current_count)}
+	previous_counts = {r.status: cint(r.previous_count) for r in rows if cint(r.previous_count)}
+	return current_counts, previous_counts
+
+
+def _ticket_status_counts_with_comparison(current, previous, company=None):
+	"""
+	Ticket status counts for a period and its comparison period
+	
+	A comparison period that ended before today is cached for
+	_DASHBOARD_HISTORICAL_CACHE_TTL, so only the current period is counted
+	while it is warm.
+	
+	Args:
+		current: (start_date, end_date) of the current period
+		previous: (start_date, end_date) of the comparison period
+		company: Optional company filter
+		
+	Returns:
+		(current_counts, previous_counts), each a dict of status -> count
+	"""
+	if getdate(previous[1]) >= getdate(today()):
+		return _ticket_status_counts_for_periods(current, previous, company)
+
+	previous_key = f"cheese:dashboard:ticket_status:{company or 'all'}:{previous[0]}:{previous[1]}"
+	previous_counts = frappe.cache.get_value(previous_key)
+	if previous_counts is not None:
+		return _ticket_status_counts_with_effective_date(current[0], current[1], company), previous_counts
+
+	current_counts, previous_counts = _ticket_status_counts_for_periods(current, previous, company)
+	frappe.cache.set_value(previous_key, previous_counts, expires_in_sec=_DASHBOARD_HISTORICAL_CACHE_TTL)
+	return current_counts, previous_counts
+
+
+def _tickets_with_effective_date(start_date, end_date, company=None, fields=("name", "status")):
+	"""
+	Tickets in a period using booking date OR creation date, most recently modified first.
+
+	One Ticket/Slot join, matching exactly the tickets that
+	_ticket_status_counts_with_effective_date counts.
+	"""
+	conditions, params = _ticket_period_conditions(start_date, end_date, company)
+	columns = ", ".join(f"t.`{field}`" for field in fields)
+	return frappe.db.sql(
+		f"""
+		SELECT {columns}
+		FROM `tabCheese Ticket` t
+		LEFT JOIN `tabCheese Experience Slot` s ON s.name = t.slot
+		WHERE {" AND ".join(conditions)}
+		ORDER BY t.modified DESC
+		""",
+		params,
+		as_dict=True,
+	)
+
+
+def _pending_confirmation_conditions(start_date, end_date, company, now_dt):
+	"""WHERE conditions and params for period tickets still awaiting confirmation (PENDING, not TTL-expired)."""
+	conditions, params = _ticket_period_conditions(start_date, end_date, company)
+	conditions.append("t.status = 'PENDING'")
+	conditions.append("(t.expires_at IS NULL OR t.expires_at >= %(now)s)")
+	params["now"] = now_dt
+	return conditions, params
+
+
+def _count_pending_confirmations(start_date, end_date, company, now_dt):
+	"""Count period tickets still awaiting confirmation without fetching them."""
+	conditions, params = _pending_confirmation_conditions(start_date, end_date, company, now_dt)
+	result = frappe.db.sql(
+		f"""
+		SELECT COUNT(*)
+		FROM `tabCheese Ticket` t
+		LEFT JOIN `tabCheese Experience Slot` s ON s.name = t.slot
+		WHERE {" AND ".join(conditions)}
+		""",
+		params,
+	)
+	return cint(result[0][0]) if result else 0
+
+
+def _pending_confirmations_preview(start_date, end_date, company, now_dt, limit=10):
+	"""First period tickets still awaiting confirmation, most recently modified first."""
+	conditions, params = _pending_confirmation_conditions(start_date, end_date, company, now_dt)
+	params["limit"] = cint(limit)
+	return frappe.db.sql(
+		f"""
+		SELECT t.name, t.status, t.party_size, t.slot, t.selected_date, t.creation
+		FROM `tabCheese Ticket` t
+		LEFT JOIN `tabCheese Experience Slot` s ON s.name = t.slot
+		WHERE {" AND ".join(conditions)}
+		ORDER BY t.modified DESC
+		LIMIT %(limit)s
+		""",
+		params,
+		as_dict=True,
+	)
+
+
+# Confirmed/checked-in tickets booked for today make up an establishment's agenda.
+_TODAY_AGENDA_STATUSES = ("CONFIRMED", "CHECKED_IN")
+_TODAY_AGENDA_FIELDS = ("name", "status", "party_size", "slot")
+
+
+def _establishment_tickets(start_date, end_date, company, today_date, fields):
+	"""
+	Period tickets and today's agenda for an establishment in one round trip
+	
+	When the period covers today every agenda ticket is also a period ticket,
+	so the agenda is picked from the period rows. Otherwise both sets come from
+	one UNION ALL, split on its src column.
+	
+	Args:
+		start_date: Start of the period (inclusive)
+		end_date: End of the period (inclusive)
+		company: Establishment (company) ID
+		today_date: Today's date
+		fields: Cheese Ticket fields to select for the period tickets; must
+			include the agenda fields (name, status, party_size, slot)
+		
+	Returns:
+		(period tickets most recently modified first, today's agenda ordered by slot)
+	"""
+	if start_date <= today_date <= end_date:
+		tickets = _tickets_with_effective_date(start_date, end_date, company, fields=fields)
+		today_tickets = sorted(
+			(
+				frappe._dict({field: t[field] for field in _TODAY_AGENDA_FIELDS})
+				for t in tickets
+				if t.status in _TODAY_AGENDA_STATUSES
+				and t.selected_date
+				and getdate(t.selected_date) == today_date
+			),
+			key=lambda t: t.slot or "",
+		)
+		return tickets, today_tickets
+
+	conditions, params = _ticket_period_conditions(start_date, end_date, company)
+	params["today"] = today_date
+	period_columns = ", ".join(f"t.`{field}`" for field in fields)
+	today_columns = ", ".join(
+		f"t.`{field}`" if field in _TODAY_AGENDA_FIELDS else "NULL" for field in fields
+	)
+	statuses = ", ".join(frappe.db.escape(status) for status in _TODAY_AGENDA_STATUSES)
+	rows = frappe.db.sql(
+		f"""
+		SELECT 'period' AS src, {period_columns}, t.modified AS sort_modified
+		FROM `tabCheese Ticket` t
+		LEFT JOIN `tabCheese Experience Slot` s ON s.name = t.slot
+		WHERE {" AND ".join(conditions)}
+		UNION ALL
+		SELECT 'today' AS src, {today_columns}, NULL AS sort_modified
+		FROM `tabCheese Ticket` t
+		WHERE t.company = %(company)s
+			AND t.selected_date = %(today)s
+			AND t.status IN ({statuses})
+		ORDER BY src, sort_modified DESC, slot
+		""",
+		params,
+		as_dict=True,
+	)
 
+	tickets, today_tickets = [], []
+	for row in rows:
+		if row.src == "period":
+			tickets.append(frappe._dict({field: row[field] for field in fields}))
+		else:
+			today_tickets.append(frappe._dict({field: row[field] for field in _TODAY_AGENDA_FIELDS}))
+	return tickets, today_tickets
 
-def _ticket_in_period(ticket, start_date, end_date):
-	"""Match ticket when booking date OR creation date falls in period."""
-	creation_date = getdate(ticket.creation) if getattr(ticket, "creation", None) else None
-	if creation_date and start_date <= creation_date <= end_date:
-		return True
 
-	booking_date = getdate(ticket.selected_date) if getattr(ticket, "selected_date", None) else None
-	if not booking_date and getattr(ticket, "slot", None):
-		slot_date = frappe.db.get_value("Cheese Experience Slot", ticket.slot, "date_from")
-		if slot_date:
-			booking_date = getdate(slot_date)
+def _deposit_status_totals(start_date, end_date, entity_type=None, entity_sql=None, params=None):
+	"""
+	Deposit count and amounts by status for deposits created in a period
+	
+	Args:
+		start_date: Start of the period (inclusive)
+		end_date: End of the period (inclusive)
+		entity_type: Optional entity_type the deposits must have
+		entity_sql: Optional subquery selecting the entity_ids deposits must belong to
+		params: Query params used by entity_sql
+		
+	Returns:
+		Dict of status -> row with count, amount_required and amount_paid
+	"""
+	conditions = ["d.creation BETWEEN %(deposit_from)s AND %(deposit_to)s"]
+	params = {
+		**(params or {}),
+		"deposit_from": f"{start_date} 00:00:00",
+		"deposit_to": f"{end_date} 23:59:59",
+	}
+	if entity_type:
+		conditions.append("d.entity_type = %(deposit_entity_type)s")
+		params["deposit_entity_type"] = entity_type
+	if entity_sql:
+		conditions.append(f"d.entity_id IN ({entity_sql})")
 
-	return bool(booking_date and start_date <= booking_date <= end_date)
+	rows = frappe.db.sql(
+		f"""
+		SELECT
+			d.status AS status,
+			COUNT(*) AS count,
+			SUM(d.amount_required) AS amount_required,
+			SUM(d.amount_paid) AS amount_paid
+		FROM `tabCheese Deposit` d
+		WHERE {" AND ".join(conditions)}
+		GROUP BY d.status
+		""",
+		params,
+		as_dict=True,
+	)
+	return {r.status: r for r in rows}
 
 
 @frappe.whitelist()
@@ -174,36 +485,26 @@ def get_central_dashboard(period="today", date_from=None, date_to=None):
 	try:
 		scope_company = _dashboard_company_scope()
 		# Calculate date range
-		if period == "today":
-			date_from = today()
-			date_to = today()
-		elif period == "yesterday":
-			date_from = add_days(today(), -1)
-			date_to = add_days(today(), -1)
-		elif period == "7":
-			date_from = add_days(today(), -6)
-			date_to = today()
-		elif period == "30":
-			date_from = add_days(today(), -29)
-			date_to = today()
-		elif period == "range":
-			if not date_from or not date_to:
-				return validation_error("date_from and date_to are required for range period")
-			date_from = getdate(date_from)
-			date_to = getdate(date_to)
-		else:
+		if period == "range" and (not date_from or not date_to):
+			return validation_error("date_from and date_to are required for range period")
+		period_range = _resolve_period(period, date_from, date_to)
+		if not period_range:
 			return validation_error(f"Invalid period: {period}")
+		date_from_obj, date_to_obj = period_range
 		
-		date_from_obj = getdate(date_from)
-		date_to_obj = getdate(date_to)
+		cache_key = _dashboard_cache_key("central", scope_company, period, date_from_obj, date_to_obj)
+		data = frappe.cache.get_value(cache_key)
+		if data is not None:
+			return success("Central dashboard retrieved successfully", data)
 		
 		# Get previous period for comparison
 		days_diff = (date_to_obj - date_from_obj).days + 1
 		prev_date_from = add_days(date_from_obj, -days_diff)
 		prev_date_to = add_days(date_from_obj, -1)
 		
-		current_counts = _ticket_status_counts_with_effective_date(date_from_obj, date_to_obj, scope_company)
-		previous_counts = _ticket_status_counts_with_effective_date(prev_date_from, prev_date_to, scope_company)
+		current_counts, previous_counts = _ticket_status_counts_with_comparison(
+			(date_from_obj, date_to_obj), (prev_date_from, prev_date_to), scope_company
+		)
 		
 		# Calculate KPIs
 		confirmed = current_counts.get("CONFIRMED", 0)
@@ -224,58 +525,48 @@ def get_central_dashboard(period="today", date_from=None, date_to=None):
 			company=scope_company,
 		)
 		
-		# Get deposits
-		deposit_filters = {"creation": ["between", [f"{date_from_obj} 00:00:00", f"{date_to_obj} 23:59:59"]]}
+		# Get deposits; to filter by company, match entity_id against the company's tickets
 		if scope_company:
-			# To filter deposits by company, we filter by entity_id if they are ticket deposits
-			ticket_ids = frappe.get_all("Cheese Ticket", filters={"company": scope_company}, pluck="name")
-			if ticket_ids:
-				deposit_filters["entity_id"] = ["in", ticket_ids]
-			else:
-				deposit_filters["name"] = "not_found"
-
-		deposits = frappe.get_all(
-			"Cheese Deposit",
-			filters=deposit_filters,
-			fields=["status"]
-		)
-		
-		deposit_counts = {}
-		for deposit in deposits:
-			status = deposit.status
-			deposit_counts[status] = deposit_counts.get(status, 0) + 1
-		
-		return success(
-			"Central dashboard retrieved successfully",
-			{
-				"period": period,
-				"date_from": str(date_from_obj),
-				"date_to": str(date_to_obj),
-				"tickets": {
-					"confirmed": confirmed,
-					"checked_in": checked_in,
-					"completed": completed,
-					"cancelled": cancelled,
-					"pending": pending,
-					"total": sum(current_counts.values())
-				},
-				"tickets_by_status": current_counts,
-				"comparison": {
-					"confirmed_change": confirmed - prev_confirmed,
-					"checked_in_change": checked_in - prev_checked_in,
-					"completed_change": completed - prev_completed
-				},
-				"leads": lead_counts,
-				"total_leads": total_leads,
-				"deposits": {
-					"pending": deposit_counts.get("PENDING", 0),
-					"paid": deposit_counts.get("PAID", 0),
-					"overdue": deposit_counts.get("OVERDUE", 0)
-				}
+			deposit_totals = _deposit_status_totals(
+				date_from_obj,
+				date_to_obj,
+				entity_sql="SELECT name FROM `tabCheese Ticket` WHERE company = %(company)s",
+				params={"company": scope_company},
+			)
+		else:
+			deposit_totals = _deposit_status_totals(date_from_obj, date_to_obj)
+		deposit_counts = {status: cint(row.count) for status, row in deposit_totals.items()}
+		
+		data = {
+			"period": period,
+			"date_from": str(date_from_obj),
+			"date_to": str(date_to_obj),
+			"tickets": {
+				"confirmed": confirmed,
+				"checked_in": checked_in,
+				"completed": completed,
+				"cancelled": cancelled,
+				"pending": pending,
+				"total": sum(current_counts.values())
+			},
+			"tickets_by_status": current_counts,
+			"comparison": {
+				"confirmed_change": confirmed - prev_confirmed,
+				"checked_in_change": checked_in - prev_checked_in,
+				"completed_change": completed - prev_completed
+			},
+			"leads": lead_counts,
+			"total_leads": total_leads,
+			"deposits": {
+				"pending": deposit_counts.get("PENDING", 0),
+				"paid": deposit_counts.get("PAID", 0),
+				"overdue": deposit_counts.get("OVERDUE", 0)
 			}
-		)
+		}
+		frappe.cache.set_value(cache_key, data, expires_in_sec=_dashboard_cache_ttl(date_to_obj))
+		return success("Central dashboard retrieved successfully", data)
 	except Exception as e:
-		frappe.log_error(f"Error in get_central_dashboard: {str(e)}")
+		log_api_error(f"Error in get_central_dashboard: {str(e)}")
 		return error("Failed to get central dashboard", "SERVER_ERROR", {"error": str(e)}, 500)
 
 
@@ -303,80 +594,63 @@ def get_establishment_dashboard(establishment_id, period="today", date_from=None
 		if not establishment_id:
 			return validation_error("establishment_id is required")
 		
-		if not frappe.db.exists("Company", establishment_id):
-			return error("Establishment not found", "NOT_FOUND", {}, 404)
-		
 		# Calculate date range (same logic as central dashboard)
-		if period == "today":
-			date_from = today()
-			date_to = today()
-		elif period == "yesterday":
-			date_from = add_days(today(), -1)
-			date_to = add_days(today(), -1)
-		elif period == "7":
-			date_from = add_days(today(), -6)
-			date_to = today()
-		elif period == "30":
-			date_from = add_days(today(), -29)
-			date_to = today()
-		elif period == "range":
-			if not date_from or not date_to:
-				return validation_error("date_from and date_to are required for range period")
-			date_from = getdate(date_from)
-			date_to = getdate(date_to)
-		
-		date_from_obj = getdate(date_from)
-		date_to_obj = getdate(date_to)
-
-		status_counts = _ticket_status_counts_with_effective_date(date_from_obj, date_to_obj, establishment_id)
-		tickets = frappe.get_all(
-			"Cheese Ticket",
-			filters={"company": establishment_id},
-			fields=["name", "status", "party_size", "slot", "selected_date", "creation"],
+		if period == "range" and (not date_from or not date_to):
+			return validation_error("date_from and date_to are required for range period")
+		date_from_obj, date_to_obj = _resolve_period(period, date_from, date_to) or (
+			getdate(date_from),
+			getdate(date_to),
+		)
+
+		# Always the short TTL: today's agenda and pending confirmations are
+		# live even when the selected period is in the past.
+		cache_key = _dashboard_cache_key(
+			"establishment", establishment_id, period, date_from_obj, date_to_obj
+		)
+		data = frappe.cache.get_value(cache_key)
+		if data is not None:
+			return success("Establishment dashboard retrieved successfully", data)
+
+		# Period tickets plus today's agenda (confirmed/checked-in tickets
+		# booked for today at this establishment).
+		tickets, today_tickets = _establishment_tickets(
+			date_from_obj,
+			date_to_obj,
+			establishment_id,
+			getdate(today()),
+			fields=("name", "status", "party_size", "slot", "selected_date"),
 		)
-		tickets = [t for t in tickets if _ticket_in_period(t, date_from_obj, date_to_obj)]
+		# Only an empty result can mean an unknown establishment; skip the
+		# existence check whenever tickets were found.
+		if not tickets and not today_tickets and not frappe.db.exists("Company", establishment_id):
+			return error("Establishment not found", "NOT_FOUND", {}, 404)
+
+		# Same tickets _ticket_status_counts_with_effective_date would count.
+		status_counts = dict(Counter(t.status for t in tickets))
 		
-		# Get pending confirmations, excluding TTL-expired pending tickets.
+		# Pending confirmations, excluding TTL-expired pending tickets.
 		now_dt = now_datetime()
-		pending_confirmations = []
-		for t in tickets:
-			if t.status != "PENDING":
-				continue
-			ticket_doc = frappe.db.get_value("Cheese Ticket", t.name, ["expires_at"], as_dict=True)
-			if ticket_doc and ticket_doc.expires_at and ticket_doc.expires_at < now_dt:
-				continue
-			pending_confirmations.append(t)
-		
-		# Get today's agenda — confirmed/checked-in tickets booked for today
-		# at this establishment.
-		today_date = today()
-		today_tickets = frappe.get_all(
-			"Cheese Ticket",
-			filters={
-				"company": establishment_id,
-				"selected_date": today_date,
-				"status": ["in", ["CONFIRMED", "CHECKED_IN"]],
-			},
-			fields=["name", "status", "party_size", "slot"],
-			order_by="slot",
+		pending_confirmations = _pending_confirmations_preview(
+			date_from_obj, date_to_obj, establishment_id, now_dt
 		)
 		
-		return success(
-			"Establishment dashboard retrieved successfully",
-			{
-				"establishment_id": establishment_id,
-				"period": period,
-				"date_from": str(date_from_obj),
-				"date_to": str(date_to_obj),
-				"tickets_by_status": status_counts,
-				"pending_confirmations": len(pending_confirmations),
-				"pending_confirmations_list": pending_confirmations[:10],  # Limit to 10
-				"today_agenda": today_tickets,
-				"today_count": len(today_tickets)
-			}
-		)
+		data = {
+			"establishment_id": establishment_id,
+			"period": period,
+			"date_from": str(date_from_obj),
+			"date_to": str(date_to_obj),
+			"tickets_by_status": status_counts,
+			"pending_confirmations": _count_pending_confirmations(
+				date_from_obj, date_to_obj, establishment_id, now_dt
+			),
+			"pending_confirmations_list": pending_confirmations,  # Limit to 10
+			"today_agenda": today_tickets,
+			"today_count": len(today_tickets)
+		}
+		frappe.cache.set_value(cache_key, data, expires_in_sec=_DASHBOARD_CACHE_TTL)
+		return success("Establishment dashboard retrieved successfully", data)
 	except Exception as e:
-		frappe.log_error(f"Error in get_establishment_dashboard: {str(e)}")
+		log_api_error(f"Error in get_establishment_dashboard: {str(e)}")
 		return error("Failed to get establishment dashboard", "SERVER_ERROR", {"error": str(e)}, 500)
 
 
@@ -393,40 +667,20 @@ def get_dashboard_kpis(establishment_id=None, period="today"):
 		Success response with KPI data
 	"""
 	try:
-		from frappe.utils import today, add_days, getdate
-		
-		# Calculate date range
-		if period == "today":
-			date_from = today()
-			date_to = today()
-		elif period == "yesterday":
-			date_from = add_days(today(), -1)
-			date_to = add_days(today(), -1)
-		elif period == "7":
-			date_from = add_days(today(), -6)
-			date_to = today()
-		elif period == "30":
-			date_from = add_days(today(), -29)
-			date_to = today()
-		else:
-			date_from = today()
-			date_to = today()
-		
-		date_from_obj = getdate(date_from)
-		date_to_obj = getdate(date_to)
+		# Calculate date range; unknown periods fall back to today
+		date_from_obj, date_to_obj = _resolve_period(period) or _resolve_period("today")
 		
 		# Resolve effective establishment scope (tenant users only)
 		scope_company = _dashboard_company_scope()
 		if scope_company:
 			establishment_id = scope_company
 
-		ticket_filters = {"company": establishment_id} if establishment_id else {}
-		tickets = frappe.get_all(
-			"Cheese Ticket",
-			filters=ticket_filters,
-			fields=["name", "status", "experience", "slot", "selected_date", "creation"],
-		)
-		tickets = [t for t in tickets if _ticket_in_period(t, date_from_obj, date_to_obj)]
+		cache_key = _dashboard_cache_key("kpis", establishment_id, period, date_from_obj, date_to_obj)
+		data = frappe.cache.get_value(cache_key)
+		if data is not None:
+			return success("KPIs retrieved successfully", data)
+
+		ticket_counts = _ticket_status_counts_with_effective_date(date_from_obj, date_to_obj, establishment_id)
 		
 		# Calculate conversion rates (leads → tickets → confirmed)
 		lead_counts, total_leads = _leads_for_dashboard(
@@ -437,94 +691,152 @@ def get_dashboard_kpis(establishment_id=None, period="today"):
 		converted_leads = lead_counts.get("CONVERTED", 0)
 		lead_conversion_rate = (converted_leads / total_leads * 100) if total_leads > 0 else 0
 		
-		total_tickets = len(tickets)
-		confirmed_tickets = len([t for t in tickets if t.status == "CONFIRMED"])
+		total_tickets = sum(ticket_counts.values())
+		confirmed_tickets = ticket_counts.get("CONFIRMED", 0)
 		ticket_conversion_rate = (confirmed_tickets / total_tickets * 100) if total_tickets > 0 else 0
 		
 		# Calculate attendance rates
-		checked_in = len([t for t in tickets if t.status == "CHECKED_IN"])
-		completed = len([t for t in tickets if t.status == "COMPLETED"])
+		checked_in = ticket_counts.get("CHECKED_IN", 0)
+		completed = ticket_counts.get("COMPLETED", 0)
 		attendance_rate = (checked_in / confirmed_tickets * 100) if confirmed_tickets > 0 else 0
 		
 		# Calculate no-show rates
-		no_shows = len([t for t in tickets if t.status == "NO_SHOW"])
+		no_shows = ticket_counts.get("NO_SHOW", 0)
 		no_show_rate = (no_shows / confirmed_tickets * 100) if confirmed_tickets > 0 else 0
 		
 		# Calculate deposit collection rates (scoped to establishment tickets when filtered)
-		deposit_filters = {"creation": ["between", [f"{date_from_obj} 00:00:00", f"{date_to_obj} 23:59:59"]]}
 		if establishment_id:
-			ticket_ids = [t.name for t in tickets] if tickets else []
-			if ticket_ids:
-				deposit_filters["entity_type"] = "Cheese Ticket"
-				deposit_filters["entity_id"] = ["in", ticket_ids]
-			else:
-				deposit_filters["name"] = "__no_deposits__"
-
-		deposits = frappe.get_all(
-			"Cheese Deposit",
-			filters=deposit_filters,
-			fields=["name", "status", "amount_required", "amount_paid"]
-		)
+			ticket_conditions, ticket_params = _ticket_period_conditions(
+				date_from_obj, date_to_obj, establishment_id
+			)
+			deposit_totals = _deposit_status_totals(
+				date_from_obj,
+				date_to_obj,
+				entity_type="Cheese Ticket",
+				entity_sql=(
+					"SELECT t.name FROM `tabCheese Ticket` t"
+					" LEFT JOIN `tabCheese Experience Slot` s ON s.name = t.slot"
+					f" WHERE {' AND '.join(ticket_conditions)}"
+				),
+				params=ticket_params,
+			)
+		else:
+			deposit_totals = _deposit_status_totals(date_from_obj, date_to_obj)
 		
-		total_deposits = len(deposits)
-		paid_deposits = len([d for d in deposits if d.status == "PAID"])
+		total_deposits = sum(cint(row.count) for row in deposit_totals.values())
+		paid_deposits = cint(deposit_totals["PAID"].count) if "PAID" in deposit_totals else 0
 		deposit_collection_rate = (paid_deposits / total_deposits * 100) if total_deposits > 0 else 0
 		
-		total_deposit_amount = sum([d.amount_required for d in deposits])
-		collected_deposit_amount = sum([d.amount_paid or 0 for d in deposits])
+		total_deposit_amount = sum(flt(row.amount_required) for row in deposit_totals.values())
+		collected_deposit_amount = sum(flt(row.amount_paid) for row in deposit_totals.values())
 		
 		# Calculate average satisfaction rating
-		surveys = frappe.get_all(
-			"Cheese Survey Response",
-			filters={"creation": ["between", [f"{date_from_obj} 00:00:00", f"{date_to_obj} 23:59:59"]]},
-			fields=["rating"]
-		)
-		
-		if surveys:
-			average_satisfaction = sum([s.rating for s in surveys]) / len(surveys)
-		else:
-			average_satisfaction = 0
-		
-		return success(
-			"KPIs retrieved successfully",
-			{
-				"establishment_id": establishment_id,
-				"period": period,
-				"date_from": str(date_from_obj),
-				"date_to": str(date_to_obj),
-				"conversion_rates": {
-					"lead_to_converted": lead_conversion_rate,
-					"ticket_to_confirmed": ticket_conversion_rate,
-					"total_leads": total_leads,
-					"converted_leads": converted_leads,
-					"total_tickets": total_tickets,
-					"confirmed_tickets": confirmed_tickets
-				},
-				"attendance_rates": {
-					"checked_in_rate": attendance_rate,
-					"checked_in_count": checked_in,
-					"completed_count": completed
-				},
-				"no_show_rates": {
-					"no_show_rate": no_show_rate,
-					"no_show_count": no_shows
-				},
-				"deposit_collection_rates": {
-					"collection_rate": deposit_collection_rate,
-					"total_deposits": total_deposits,
-					"paid_deposits": paid_deposits,
-					"total_amount_required": total_deposit_amount,
-					"collected_amount": collected_deposit_amount
-				},
-				"average_satisfaction": round(average_satisfaction, 2),
-				"total_surveys": len(surveys)
-			}
-		)
+		surveys = frappe.db.sql(
+			"""
+			SELECT COUNT(*) AS total, AVG(rating) AS average
+			FROM `tabCheese Survey Response`
+			WHERE creation BETWEEN %(survey_from)s AND %(survey_to)s
+			""",
+			{"survey_from": f"{date_from_obj} 00:00:00", "survey_to": f"{date_to_obj} 23:59:59"},
+			as_dict=True,
+		)[0]
+		total_surveys = cint(surveys.total)
+		average_satisfaction = flt(surveys.average) if total_surveys else 0
+		
+		data = {
+			"establishment_id": establishment_id,
+			"period": period,
+			"date_from": str(date_from_obj),
+			"date_to": str(date_to_obj),
+			"conversion_rates": {
+				"lead_to_converted": lead_conversion_rate,
+				"ticket_to_confirmed": ticket_conversion_rate,
+				"total_leads": total_leads,
+				"converted_leads": converted_leads,
+				"total_tickets": total_tickets,
+				"confirmed_tickets": confirmed_tickets
+			},
+			"attendance_rates": {
+				"checked_in_rate": attendance_rate,
+				"checked_in_count": checked_in,
+				"completed_count": completed
+			},
+			"no_show_rates": {
+				"no_show_rate": no_show_rate,
+				"no_show_count": no_shows
+			},
+			"deposit_collection_rates": {
+				"collection_rate": deposit_collection_rate,
+				"total_deposits": total_deposits,
+				"paid_deposits": paid_deposits,
+				"total_amount_required": total_deposit_amount,
+				"collected_amount": collected_deposit_amount
+			},
+			"average_satisfaction": round(average_satisfaction, 2),
+			"total_surveys": total_surveys
+		}
+		frappe.cache.set_value(cache_key, data, expires_in_sec=_dashboard_cache_ttl(date_to_obj))
+		return success("KPIs retrieved successfully", data)
 	except Exception as e:
-		frappe.log_error(f"Error in get_dashboard_kpis: {str(e)}")
+		log_api_error(f"Error in get_dashboard_kpis: {str(e)}")
 		return error("Failed to get KPIs", "SERVER_ERROR", {"error": str(e)}, 500)
 
 
+def _pending_tickets_for_actions(company, date_from, date_to, now_dt, limit=20):
+	"""
+	Oldest PENDING, non-expired tickets with their slot's date and start time
+	
+	Args:
+		company: Optional establishment filter (via the slot's experience)
+		date_from: Optional lower bound on the slot's date_from
+		date_to: Optional upper bound on the slot's date_from
+		now_dt: Tickets with expires_at before this are skipped
+		limit: Maximum number of tickets
+		
+	Returns:
+		(tickets oldest first, total number of matching tickets)
+	"""
+	joins = ""
+	conditions = [
+		"t.status = 'PENDING'",
+		"(t.expires_at IS NULL OR t.expires_at >= %(now)s)",
+	]
+	params = {"now": now_dt, "limit": cint(limit)}
+	if company:
+		joins = "INNER JOIN `tabCheese Experience` e ON e.name = s.experience"
+		conditions.append("e.company = %(company)s")
+		params["company"] = company
+	if date_from:
+		conditions.append("s.date_from >= %(date_from)s")
+		params["date_from"] = date_from
+	if date_to:
+		conditions.append("s.date_from <= %(date_to)s")
+		params["date_to"] = date_to
+
+	# COUNT(*) OVER() is evaluated before LIMIT, so every row carries the full total.
+	tickets = frappe.db.sql(
+		f"""
+		SELECT
+			t.name, t.contact, t.experience, t.route, t.slot, t.party_size,
+			t.selected_date, t.expires_at, t.creation,
+			s.date_from AS slot_date_from, s.time_from AS slot_time_from,
+			COUNT(*) OVER() AS total_count
+		FROM `tabCheese Ticket` t
+		INNER JOIN `tabCheese Experience Slot` s ON s.name = t.slot
+		{joins}
+		WHERE {" AND ".join(conditions)}
+		ORDER BY t.creation ASC
+		LIMIT %(limit)s
+		""",
+		params,
+		as_dict=True,
+	)
+	total = cint(tickets[0].total_count) if tickets else 0
+	for t in tickets:
+		t.pop("total_count")
+	return tickets, total
+
+
 @frappe.whitelist()
 def get_pending_actions(establishment_id=None, date_from=None, date_to=None):
 	"""
@@ -539,86 +851,25 @@ def get_pending_actions(establishment_id=None, date_from=None, date_to=None):
 		Success response with pending actions
 	"""
 	try:
-		from frappe.utils import getdate, now_datetime
-
-		# Get experiences to build relevant slots.
 		# Super admins without establishment_id see all companies.
 		if not establishment_id:
 			scope_company = _dashboard_company_scope()
 			if scope_company:
 				establishment_id = scope_company
 
-		experience_filters = {}
-		if establishment_id:
-			experience_filters = {"company": establishment_id}
-
-		experiences = frappe.get_all(
-			"Cheese Experience",
-			filters=experience_filters,
-			fields=["name"],
-		)
-		exp_ids = [e.name for e in experiences]
-
-		if not exp_ids:
-			return success(
-				"Pending actions retrieved successfully",
-				{
-					"establishment_id": establishment_id,
-					"pending_confirmations": [],
-					"pending_confirmations_count": 0,
-					"pending_deposits": [],
-					"pending_deposits_count": 0,
-				},
-			)
-
-		# Pull candidate slots then filter by date_from in Python (Cheese Experience Slot uses `date_from`).
-		all_slots = frappe.get_all(
-			"Cheese Experience Slot",
-			filters={"experience": ["in", exp_ids]},
-			fields=["name", "date_from", "time_from"],
-		)
-
 		date_from_obj = getdate(date_from) if date_from else None
 		date_to_obj = getdate(date_to) if date_to else None
 		if date_from_obj and date_to_obj and date_from_obj > date_to_obj:
 			return validation_error("date_from must be before or equal to date_to")
 
-		filtered_slots = []
-		for s in all_slots:
-			slot_date = getdate(s.date_from)
-			if date_from_obj and slot_date < date_from_obj:
-				continue
-			if date_to_obj and slot_date > date_to_obj:
-				continue
-			filtered_slots.append(s)
-
-		slot_ids = [s.name for s in filtered_slots]
-		slot_details_by_id = {s.name: s for s in filtered_slots}
-		
-		pending_tickets = []
-		if slot_ids:
-			pending_tickets = frappe.get_all(
-				"Cheese Ticket",
-				filters={
-					"slot": ["in", slot_ids],
-					"status": "PENDING"
-				},
-				fields=["name", "contact", "experience", "route", "slot", "party_size", "selected_date", "expires_at", "creation"],
-				order_by="creation asc",
-				limit=20
-			)
-
-			now_dt = now_datetime()
-			pending_tickets = [
-				t for t in pending_tickets
-				if (not t.expires_at) or t.expires_at >= now_dt
-			]
+		pending_tickets, pending_tickets_count = _pending_tickets_for_actions(
+			establishment_id, date_from_obj, date_to_obj, now_datetime()
+		)
 
-			# Attach slot date/time for UI convenience.
-			for t in pending_tickets:
-				slot_detail = slot_details_by_id.get(t.slot)
-				t["slot_date_from"] = str(slot_detail.date_from) if slot_detail else None
-				t["slot_time_from"] = str(slot_detail.time_from) if slot_detail and slot_detail.time_from else None
+		# Attach slot date/time for UI convenience.
+		for t in pending_tickets:
+			t["slot_date_from"] = str(t.slot_date_from) if t.slot_date_from else None
+			t["slot_time_from"] = str(t.slot_time_from) if t.slot_time_from else None
 		
 		# Get pending deposits
 		ticket_ids = [t.name for t in pending_tickets]
@@ -639,13 +890,13 @@ def get_pending_actions(establishment_id=None, date_from=None, date_to=None):
 			{
 				"establishment_id": establishment_id,
 				"pending_confirmations": pending_tickets,
-				"pending_confirmations_count": len(pending_tickets),
+				"pending_confirmations_count": pending_tickets_count,
 				"pending_deposits": pending_deposits,
 				"pending_deposits_count": len(pending_deposits)
 			}
 		)
 	except Exception as e:
-		frappe.log_error(f"Error in get_pending_actions: {str(e)}")
+		log_api_error(f"Error in get_pending_actions: {str(e)}")
 		return error("Failed to get pending actions", "SERVER_ERROR", {"error": str(e)}, 500)
 
 
@@ -674,42 +925,49 @@ def get_day_agenda(establishment_id, date=None):
 		target_date = getdate(date) if date else today()
 		
 		# Get experiences
-		experiences = frappe.get_all(
+		exp_ids = frappe.get_all(
 			"Cheese Experience",
 			filters={"company": establishment_id},
-			fields=["name"]
+			pluck="name"
 		)
-		exp_ids = [e.name for e in experiences]
 		
-		# Get slots for the date
+		# Get slots active on the date (slots span date_from..date_to inclusive)
 		slots = frappe.get_all(
 			"Cheese Experience Slot",
-			filters={
-				"date": target_date,
-				"experience": ["in", exp_ids]
-			},
-			fields=["name", "time", "experience"],
-			order_by="time asc"
+			filters=[
+				["date_from", "<=", target_date],
+				["date_to", ">=", target_date],
+				["experience", "in", exp_ids],
+			],
+			fields=["name", "time_from", "experience"],
+			order_by="time_from asc"
 		)
 		
 		slot_ids = [s.name for s in slots]
 		
-		# Get tickets
+		# Get tickets booked for the date; multi-day slots carry the day in
+		# selected_date, tickets without one belong to their single-day slot.
 		tickets = []
 		if slot_ids:
 			tickets = frappe.get_all(
 				"Cheese Ticket",
 				filters={"slot": ["in", slot_ids]},
-				fields=["name", "status", "party_size", "slot", "contact"]
+				or_filters=[
+					["selected_date", "=", target_date],
+					["selected_date", "is", "not set"],
+				],
+				fields=["name", "status", "party_size", "slot", "contact"],
+				order_by="slot asc, modified desc"
 			)
 		
-		# Group by slot
+		# Group by slot; tickets come sorted by slot, so each slot is one run
+		tickets_by_slot = {slot: list(run) for slot, run in groupby(tickets, key=lambda t: t.slot)}
 		agenda = []
 		for slot in slots:
-			slot_tickets = [t for t in tickets if t.slot == slot.name]
+			slot_tickets = tickets_by_slot.get(slot.name, [])
 			agenda.append({
 				"slot_id": slot.name,
-				"time": str(slot.time),
+				"time": str(slot.time_from) if slot.time_from else None,
 				"experience_id": slot.experience,
 				"tickets": slot_tickets,
 				"tickets_count": len(slot_tickets)
@@ -725,5 +983,5 @@ def get_day_agenda(establishment_id, date=None):
 			}
 		)
 	except Exception as e:
-		frappe.log_error(f"Error in get_day_agenda: {str(e)}")
+		log_api_error(f"Error in get_day_agenda: {str(e)}")
 		return error("Failed to get day agenda", "SERVER_ERROR", {"error": str(e)}, 500)
@@ -3,7 +3,7 @@
 
 import frappe
 from frappe import _
-from frappe.utils import add_to_date, flt, now_datetime
+from frappe.utils import add_to_date, flt, get_datetime, now_datetime
 
 from cheese.api.common.responses import created, error, not_found, success, validation_error
 from cheese.api.v1.bank_account_controller import get_active_company_bank_accounts_list
@@ -14,34 +14,73 @@ OPEN_DEPOSIT_STATUSES = ("PENDING", "OVERDUE")
 RECEIVED_DEPOSIT_STATUSES = ("PAID", "REVIEW", "ADJUSTED")
 IGNORED_DEPOSIT_STATUSES = ("CANCELLED", "REFUNDED")
 
-
-def _deposit_names_for_company(company):
-	"""Deposit names whose entity resolves to ``company``.
-
-	Mirrors ``permissions.cheese_deposit_query`` so the custom ``list_deposits``
-	endpoint (which uses ``frappe.get_all`` and therefore bypasses the
-	doctype permission hooks) scopes at the DB layer:
-	  * entity_type = Cheese Ticket        -> ticket.company
-	  * entity_type = Cheese Route Booking -> child ticket.company
-	"""
-	rows = frappe.db.sql(
-		"""
-		SELECT d.name FROM `tabCheese Deposit` d
-		WHERE (
-			d.entity_type = 'Cheese Ticket'
-			AND d.entity_id IN (SELECT name FROM `tabCheese Ticket` WHERE company = %(c)s)
-		) OR (
-			d.entity_type = 'Cheese Route Booking'
-			AND d.entity_id IN (
-				SELECT rbt.parent FROM `tabCheese Route Booking Ticket` rbt
-				INNER JOIN `tabCheese Ticket` t ON t.name = rbt.ticket
-				WHERE t.company = %(c)s
-			)
+# Seconds a get_deposit_status payload is reused. Keys carry the deposit's
+# modified timestamp, so any save of the deposit starts a fresh entry.
+_DEPOSIT_STATUS_CACHE_TTL = 300
+
+# Fields the read-only deposit endpoints use; loaded with frappe.db.get_value
+# instead of building the full document.
+_DEPOSIT_READ_FIELDS = [
+	"name",
+	"entity_type",
+	"entity_id",
+	"amount_required",
+	"amount_paid",
+	"status",
+	"due_at",
+	"paid_at",
+	"verification_method",
+]
+
+
+# list_deposits row: the deposit plus what the UI filters and displays it by.
+# Relations resolve per entity_type: Cheese Ticket -> the ticket; Cheese Route
+# Booking -> the booking, with company and linked ticket taken from its first
+# ticket (by idx). payment_type is "Deposit" for the entity's first deposit
+# (by creation) and "Balance" otherwise.
+_LIST_DEPOSITS_COLUMNS = """
+	d.name, d.entity_type, d.entity_id, d.amount_required, d.amount_paid, d.status,
+	d.due_at, d.paid_at, d.modified, d.bank_account,
+	CASE
+		WHEN d.status IN ('CANCELLED', 'REFUNDED') THEN 0
+		ELSE GREATEST(0, IFNULL(d.amount_required, 0) - IFNULL(d.amount_paid, 0))
+	END AS amount_remaining,
+	CASE
+		WHEN d.name = (
+			SELECT first_dep.name FROM `tabCheese Deposit` first_dep
+			WHERE first_dep.entity_type = d.entity_type AND first_dep.entity_id = d.entity_id
+			ORDER BY first_dep.creation ASC
+			LIMIT 1
+		) THEN 'Deposit'
+		ELSE 'Balance'
+	END AS payment_type,
+	COALESCE(t.contact, rb.contact) AS contact,
+	c.full_name AS contact_name,
+	COALESCE(t.route, rb.route) AS route,
+	COALESCE(t.company, rbt_ticket.company) AS company,
+	COALESCE(t.name, rbt.ticket) AS linked_ticket_id,
+	CASE WHEN d.bank_account IS NOT NULL AND d.bank_account != ''
+		THEN COALESCE(ba.title, d.bank_account)
+	END AS bank_account_title
+"""
+
+_LIST_DEPOSITS_FROM = """
+	FROM `tabCheese Deposit` d
+	LEFT JOIN `tabCheese Ticket` t
+		ON d.entity_type = 'Cheese Ticket' AND t.name = d.entity_id
+	LEFT JOIN `tabCheese Route Booking` rb
+		ON d.entity_type = 'Cheese Route Booking' AND rb.name = d.entity_id
+	LEFT JOIN `tabCheese Route Booking Ticket` rbt
+		ON rbt.name = (
+			SELECT first_rbt.name FROM `tabCheese Route Booking Ticket` first_rbt
+			WHERE first_rbt.parent = rb.name
+			ORDER BY first_rbt.idx ASC
+			LIMIT 1
 		)
-		""",
-		{"c": company},
-	)
-	return [r[0] for r in rows]
+	LEFT JOIN `tabCheese Ticket` rbt_ticket ON rbt_ticket.name = rbt.ticket
+	LEFT JOIN `tabCheese Contact` c ON c.name = COALESCE(t.contact, rb.contact)
+	LEFT JOIN `tabCheese Bank Account` ba ON ba.name = d.bank_account
+"""
 
 
 def _describe_payment_method(ba):
@@ -121,11 +160,18 @@ def _get_deposits_for_entity(entity_type, entity_id):
 	)
 
 
+def _get_deposit_row(deposit_name):
+	"""Read-only view of a deposit (_DEPOSIT_READ_FIELDS), or None if it does not exist."""
+	return frappe.db.get_value("Cheese Deposit", deposit_name, _DEPOSIT_READ_FIELDS, as_dict=True)
+
+
 def _get_deposit_phase(deposit_name, deposits=None):
 	deposits = deposits or []
 	if not deposits:
-		deposit = frappe.get_doc("Cheese Deposit", deposit_name)
-		deposits = _get_deposits_for_entity(deposit.entity_type, deposit.entity_id)
+		entity_type, entity_id = frappe.db.get_value(
+			"Cheese Deposit", deposit_name, ["entity_type", "entity_id"]
+		) or (None, None)
+		deposits = _get_deposits_for_entity(entity_type, entity_id)
 	if not deposits:
 		return "Deposit"
 	return "Deposit" if deposits[0].name == deposit_name else "Balance"
@@ -212,7 +258,6 @@ def _reconcile_balance_deposit(entity_type: str, entity_id: str) -> None:
 				dep_row.name,
 				{"status": "PAID", "paid_at": paid_at},
 			)
-	frappe.db.commit()
 
 
 def _get_received_deposits_for_entity(entity_type, entity_id):
@@ -253,7 +298,7 @@ def _create_balance_deposit(entity_type, entity_doc, due_at=None):
 	if due_at is None:
 		ttl = 24
 		if entity_type == "Cheese Ticket" and getattr(entity_doc, "experience", None):
-			ttl = frappe.db.get_value("Cheese Experience", entity_doc.experience, "deposit_ttl_hours") or 24
+			ttl = frappe.get_cached_value("Cheese Experience", entity_doc.experience, "deposit_ttl_hours") or 24
 		due_at = add_to_date(now_datetime(), hours=ttl, as_string=False)
 
 	new_deposit = frappe.get_doc(
@@ -271,9 +316,12 @@ def _create_balance_deposit(entity_type, entity_doc, due_at=None):
 	return new_deposit
 
 
-def _select_open_deposit(entity_type, entity_id, payment_type=None):
-	"""Pick the best active deposit for the requested payment phase."""
-	all_deposits = _get_deposits_for_entity(entity_type, entity_id)
+def _select_open_deposit(entity_type, entity_id, payment_type=None, deposits=None):
+	"""Pick the best active deposit for the requested payment phase.
+
+	deposits: the entity's deposits ordered by creation, when the caller has them.
+	"""
+	all_deposits = deposits if deposits is not None else _get_deposits_for_entity(entity_type, entity_id)
 	open_deposits = [d for d in all_deposits if d.status in OPEN_DEPOSIT_STATUSES]
 
 	if not open_deposits:
@@ -364,13 +412,13 @@ def get_payment_link_or_instructions(ticket_id=None, deposit_id=None, payment_ty
 		deposit_doc = None
 
 		if deposit_id:
-			if not frappe.db.exists("Cheese Deposit", deposit_id):
+			deposit_doc = _get_deposit_row(deposit_id)
+			if not deposit_doc:
 				return not_found("Deposit", deposit_id)
 			try:
 				assert_record_access("Cheese Deposit", deposit_id)
 			except frappe.PermissionError:
 				return error("Unauthorized", "UNAUTHORIZED", {}, 403)
-			deposit_doc = frappe.get_doc("Cheese Deposit", deposit_id)
 			ticket_id = deposit_doc.entity_id if deposit_doc.entity_type == "Cheese Ticket" else None
 		else:
 			if not frappe.db.exists("Cheese Ticket", ticket_id):
@@ -399,7 +447,7 @@ def get_payment_link_or_instructions(ticket_id=None, deposit_id=None, payment_ty
 			deposit_name = _select_open_deposit("Cheese Ticket", ticket_id, payment_type=payment_type)
 
 			if deposit_name:
-				deposit_doc = frappe.get_doc("Cheese Deposit", deposit_name)
+				deposit_doc = _get_deposit_row(deposit_name)
 			else:
 				# _select_open_deposit returned None: the relevant deposit is already in a
 				# terminal/received state or doesn't exist yet.  Resolve it before falling
@@ -409,10 +457,10 @@ def get_payment_link_or_instructions(ticket_id=None, deposit_id=None, payment_ty
 				if payment_type == "Balance":
 					balance_candidates = all_existing[1:] if len(all_existing) > 1 else []
 					if balance_candidates:
-						deposit_doc = frappe.get_doc("Cheese Deposit", balance_candidates[-1].name)
+						deposit_doc = _get_deposit_row(balance_candidates[-1].name)
 				elif all_existing:
 					# Deposit phase (or unspecified): use the first deposit whatever its status
-					deposit_doc = frappe.get_doc("Cheese Deposit", all_existing[0].name)
+					deposit_doc = _get_deposit_row(all_existing[0].name)
 
 				if not deposit_doc:
 					# Still not resolved — need to create via get_deposit_instructions
@@ -422,7 +470,7 @@ def get_payment_link_or_instructions(ticket_id=None, deposit_id=None, payment_ty
 
 					deposit_id_from_result = instructions_result.get("data", {}).get("deposit_id")
 					if deposit_id_from_result:
-						deposit_doc = frappe.get_doc("Cheese Deposit", deposit_id_from_result)
+						deposit_doc = _get_deposit_row(deposit_id_from_result)
 					else:
 						# No deposit needed (e.g. deposit_required=False and payment_type=Deposit)
 						return instructions_result
@@ -452,7 +500,7 @@ def get_payment_link_or_instructions(ticket_id=None, deposit_id=None, payment_ty
 			# Auto-reconcile: mark all open Balance deposits as PAID if the balance is fully covered
 			if amount_remaining <= 0:
 				_reconcile_balance_deposit("Cheese Ticket", ticket_id)
-				deposit_doc = frappe.get_doc("Cheese Deposit", deposit_doc.name)  # reload status
+				deposit_doc = _get_deposit_row(deposit_doc.name)  # reload status
 		else:
 			amount_required = flt(deposit_doc.amount_required or 0)
 			amount_paid = flt(deposit_doc.amount_paid or 0)
@@ -510,7 +558,9 @@ def get_deposit_instructions(ticket_id, payment_type=None):
 		if not ticket_id:
 			return validation_error("ticket_id is required")
 
-		if not frappe.db.exists("Cheese Ticket", ticket_id):
+		try:
+			ticket = frappe.get_doc("Cheese Ticket", ticket_id)
+		except frappe.DoesNotExistError:
 			return not_found("Ticket", ticket_id)
 
 		try:
@@ -518,7 +568,6 @@ def get_deposit_instructions(ticket_id, payment_type=None):
 		except frappe.PermissionError:
 			return error("Unauthorized", "UNAUTHORIZED", {}, 403)
 
-		ticket = frappe.get_doc("Cheese Ticket", ticket_id)
 		bank_account = _bank_accounts_for_ticket(ticket)
 
 		# For Balance, always proceed even when deposit_required is False,
@@ -534,6 +583,10 @@ def get_deposit_instructions(ticket_id, payment_type=None):
 				},
 			)
 
+		# Lock the ticket row so concurrent calls serialize here instead of each
+		# seeing no deposit and creating one; the lock is released at request commit.
+		frappe.db.get_value("Cheese Ticket", ticket_id, "name", for_update=True)
+
 		# Fetch existing deposits to determine state before selecting or creating
 		existing_deps = frappe.get_all(
 			"Cheese Deposit",
@@ -542,13 +595,16 @@ def get_deposit_instructions(ticket_id, payment_type=None):
 			order_by="creation asc",
 		)
 		first_dep = existing_deps[0] if existing_deps else None
+		deposit_created = False
 
 		# When payment_type == "Deposit", if the seña is already paid do not create a new one
 		if payment_type == "Deposit" and first_dep and first_dep.status in RECEIVED_DEPOSIT_STATUSES:
-			deposit_doc = frappe.get_doc("Cheese Deposit", first_dep.name)
+			deposit_doc = _get_deposit_row(first_dep.name)
 			deposit = first_dep.name
 		else:
-			deposit = _select_open_deposit("Cheese Ticket", ticket_id, payment_type=payment_type)
+			deposit = _select_open_deposit(
+				"Cheese Ticket", ticket_id, payment_type=payment_type, deposits=existing_deps
+			)
 
 			if not deposit:
 				# Create deposit based on payment_type
@@ -564,7 +620,7 @@ def get_deposit_instructions(ticket_id, payment_type=None):
 						if d.status not in IGNORED_DEPOSIT_STATUSES
 					]
 					if existing_balance:
-						deposit_doc = frappe.get_doc("Cheese Deposit", existing_balance[-1].name)
+						deposit_doc = _get_deposit_row(existing_balance[-1].name)
 						deposit = deposit_doc.name
 					else:
 						advance_required = flt(ticket.deposit_amount or 0) if ticket.deposit_required else 0
@@ -578,12 +634,10 @@ def get_deposit_instructions(ticket_id, payment_type=None):
 							)
 						deposit_doc = _create_balance_deposit("Cheese Ticket", ticket)
 						deposit = deposit_doc.name
-						frappe.db.commit()
+						deposit_created = True
 				else:
-					experience = frappe.get_doc("Cheese Experience", ticket.experience)
-					due_at = add_to_date(
-						now_datetime(), hours=experience.deposit_ttl_hours or 24, as_string=False
-					)
+					ttl = frappe.get_cached_value("Cheese Experience", ticket.experience, "deposit_ttl_hours")
+					due_at = add_to_date(now_datetime(), hours=ttl or 24, as_string=False)
 
 					deposit_doc = frappe.get_doc(
 						{
@@ -597,17 +651,19 @@ def get_deposit_instructions(ticket_id, payment_type=None):
 					)
 					deposit_doc.insert()
 					deposit = deposit_doc.name
-					frappe.db.commit()
+					deposit_created = True
 			else:
-				deposit_doc = frappe.get_doc("Cheese Deposit", deposit)
+				deposit_doc = _get_deposit_row(deposit)
 
-		# Re-fetch after potential creation of a new deposit
-		all_deps = frappe.get_all(
-			"Cheese Deposit",
-			filters={"entity_type": "Cheese Ticket", "entity_id": ticket_id},
-			fields=["name", "status", "amount_required", "amount_paid"],
-			order_by="creation asc",
-		)
+		# Re-fetch only when a new deposit was created above
+		all_deps = existing_deps
+		if deposit_created:
+			all_deps = frappe.get_all(
+				"Cheese Deposit",
+				filters={"entity_type": "Cheese Ticket", "entity_id": ticket_id},
+				fields=["name", "status", "amount_required", "amount_paid"],
+				order_by="creation asc",
+			)
 
 		inferred_payment_type = payment_type or (
 			"Balance" if all_deps and all_deps[0].name != deposit_doc.name else "Deposit"
@@ -647,11 +703,13 @@ def get_deposit_instructions(ticket_id, payment_type=None):
 
 		# deposit_required is False when the seña deposit is already completed
 		deposit_is_complete = deposit_doc.status in RECEIVED_DEPOSIT_STATUSES
+		amount_remaining = _amount_remaining_for_deposit(deposit_doc)
+		due_at = deposit_doc.due_at
 
 		instructions = (
 			_("Your deposit payment has been completed")
 			if deposit_is_complete
-			else _instructions_for_deposit(_amount_remaining_for_deposit(deposit_doc), bank_account)
+			else _instructions_for_deposit(amount_remaining, bank_account)
 		)
 
 		return success(
@@ -663,8 +721,8 @@ def get_deposit_instructions(ticket_id, payment_type=None):
 				"payment_type": inferred_payment_type,
 				"amount_required": deposit_doc.amount_required,
 				"amount_paid": deposit_doc.amount_paid or 0,
-				"amount_remaining": _amount_remaining_for_deposit(deposit_doc),
-				"due_at": str(deposit_doc.due_at) if deposit_doc.due_at else None,
+				"amount_remaining": amount_remaining,
+				"due_at": str(due_at) if due_at else None,
 				"status": deposit_doc.status,
 				"bank_account": bank_account,
 					"accepted_currencies": _accepted_currencies_for_ticket(ticket),
@@ -767,19 +825,23 @@ def record_deposit_payment(
 
 		# Resolve deposit directly by deposit_id if provided
 		if deposit_id:
-			if not frappe.db.exists("Cheese Deposit", deposit_id):
+			try:
+				deposit = frappe.get_doc("Cheese Deposit", deposit_id)
+			except frappe.DoesNotExistError:
 				return not_found("Deposit", deposit_id)
 			try:
 				assert_record_access("Cheese Deposit", deposit_id)
 			except frappe.PermissionError:
 				return error("Unauthorized", "UNAUTHORIZED", {}, 403)
-			deposit = frappe.get_doc("Cheese Deposit", deposit_id)
 			ticket_id = ticket_id or (deposit.entity_id if deposit.entity_type == "Cheese Ticket" else None)
 		else:
 			entity_type = "Cheese Ticket"
 			if frappe.db.exists("Cheese Route Booking", ticket_id):
 				entity_type = "Cheese Route Booking"
-			elif not frappe.db.exists("Cheese Ticket", ticket_id):
+
+			try:
+				ticket_doc = frappe.get_doc(entity_type, ticket_id)
+			except frappe.DoesNotExistError:
 				return not_found("Ticket or Route Booking", ticket_id)
 
 			try:
@@ -788,7 +850,6 @@ def record_deposit_payment(
 				return error("Unauthorized", "UNAUTHORIZED", {}, 403)
 
 			# Get or auto-create deposit for this ticket
-			ticket_doc = frappe.get_doc(entity_type, ticket_id)
 			deposit_name = None
 
 			deposit_name = _select_open_deposit(entity_type, ticket_id, payment_type=payment_type)
@@ -815,7 +876,6 @@ def record_deposit_payment(
 						)
 					# Advance is PAID or explicitly requested Balance — create remaining balance deposit
 					new_deposit = _create_balance_deposit(entity_type, ticket_doc)
-					frappe.db.commit()
 					deposit_name = new_deposit.name
 				else:
 					# No deposit at all — auto-create the advance deposit
@@ -825,8 +885,10 @@ def record_deposit_payment(
 
 					ttl = 24
 					if entity_type == "Cheese Ticket" and ticket_doc.get("experience"):
-						exp = frappe.get_doc("Cheese Experience", ticket_doc.experience)
-						ttl = exp.deposit_ttl_hours or 24
+						ttl = (
+							frappe.get_cached_value("Cheese Experience", ticket_doc.experience, "deposit_ttl_hours")
+							or 24
+						)
 
 					due_at = add_to_date(now_datetime(), hours=ttl, as_string=False)
 
@@ -841,7 +903,6 @@ def record_deposit_payment(
 						}
 					)
 					new_deposit.insert()
-					frappe.db.commit()
 					deposit_name = new_deposit.name
 
 			deposit = frappe.get_doc("Cheese Deposit", deposit_name)
@@ -919,8 +980,6 @@ def record_deposit_payment(
 				receipt_file_id = file_doc.name
 				receipt_file_url = file_doc.file_url
 
-		frappe.db.commit()
-
 		# Reconcile balance deposit in case this payment covered the remaining balance
 		# (e.g. overpayment on the seña that exceeds the balance required).
 		if deposit.entity_type == "Cheese Ticket" and ticket_id:
@@ -1001,7 +1060,9 @@ def verify_deposit(deposit_id):
 		if not deposit_id:
 			return validation_error("deposit_id is required")
 
-		if not frappe.db.exists("Cheese Deposit", deposit_id):
+		try:
+			deposit = frappe.get_doc("Cheese Deposit", deposit_id)
+		except frappe.DoesNotExistError:
 			return not_found("Deposit", deposit_id)
 
 		try:
@@ -1009,7 +1070,6 @@ def verify_deposit(deposit_id):
 		except frappe.PermissionError:
 			return error("Unauthorized", "UNAUTHORIZED", {}, 403)
 
-		deposit = frappe.get_doc("Cheese Deposit", deposit_id)
 		old_status = deposit.status
 
 		if deposit.status in ["PAID", "REFUNDED"]:
@@ -1029,7 +1089,6 @@ def verify_deposit(deposit_id):
 		deposit.status = "PAID"
 		deposit.paid_at = now_datetime()
 		deposit.save()
-		frappe.db.commit()
 
 		return success(
 			"Deposit verified successfully",
@@ -1063,7 +1122,8 @@ def get_deposit_status(deposit_id):
 		if not deposit_id:
 			return validation_error("deposit_id is required")
 
-		if not frappe.db.exists("Cheese Deposit", deposit_id):
+		modified = frappe.db.get_value("Cheese Deposit", deposit_id, "modified")
+		if not modified:
 			return not_found("Deposit", deposit_id)
 
 		try:
@@ -1071,11 +1131,12 @@ def get_deposit_status(deposit_id):
 		except frappe.PermissionError:
 			return error("Unauthorized", "UNAUTHORIZED", {}, 403)
 
-		deposit = frappe.get_doc("Cheese Deposit", deposit_id)
-
-		return success(
-			"Deposit status retrieved successfully",
-			{
+		cache_key = f"cheese:deposit_status:{deposit_id}:{modified}"
+		data = frappe.cache.get_value(cache_key)
+		if data is None:
+			deposit = _get_deposit_row(deposit_id)
+			due_at, paid_at = deposit.due_at, deposit.paid_at
+			data = {
 				"deposit_id": deposit.name,
 				"entity_type": deposit.entity_type,
 				"entity_id": deposit.entity_id,
@@ -1084,16 +1145,20 @@ def get_deposit_status(deposit_id):
 				"amount_remaining": _amount_remaining_for_deposit(deposit),
 				"status": deposit.status,
 				"payment_type": _get_deposit_phase(deposit.name),
-				"due_at": str(deposit.due_at) if deposit.due_at else None,
-				"paid_at": str(deposit.paid_at) if deposit.paid_at else None,
+				"due_at": str(due_at) if due_at else None,
+				"paid_at": str(paid_at) if paid_at else None,
 				"verification_method": deposit.verification_method,
-				"is_overdue": deposit.due_at
-				and deposit.due_at < now_datetime()
-				and deposit.status == "PENDING"
-				if deposit.due_at
-				else False,
-			},
+			}
+			frappe.cache.set_value(cache_key, data, expires_in_sec=_DEPOSIT_STATUS_CACHE_TTL)
+
+		# is_overdue depends on the current time, so it is never cached. Only
+		# PENDING deposits can be overdue; check that before parsing due_at.
+		data["is_overdue"] = bool(
+			data["status"] == "PENDING"
+			and data["due_at"]
+			and get_datetime(data["due_at"]) < now_datetime()
 		)
+		return success("Deposit status retrieved successfully", data)
 	except Exception as e:
 		frappe.log_error(f"Error in get_deposit_status: {e!s}")
 		return error("Failed to get deposit status", "SERVER_ERROR", {"error": str(e)}, 500)
@@ -1105,13 +1170,14 @@ def get_deposit(deposit_id):
 	try:
 		if not deposit_id:
 			return validation_error("deposit_id is required")
-		if not frappe.db.exists("Cheese Deposit", deposit_id):
+		try:
+			deposit = frappe.get_doc("Cheese Deposit", deposit_id)
+		except frappe.DoesNotExistError:
 			return not_found("Deposit", deposit_id)
 		try:
 			assert_record_access("Cheese Deposit", deposit_id)
 		except frappe.PermissionError:
 			return error("Unauthorized", "UNAUTHORIZED", {}, 403)
-		deposit = frappe.get_doc("Cheese Deposit", deposit_id)
 		return success("Deposit retrieved successfully", _build_deposit_payload(deposit))
 	except Exception as e:
 		frappe.log_error(f"Error in get_deposit: {e!s}")
@@ -1133,7 +1199,9 @@ def mark_deposit_overdue(deposit_id):
 		if not deposit_id:
 			return validation_error("deposit_id is required")
 
-		if not frappe.db.exists("Cheese Deposit", deposit_id):
+		try:
+			deposit = frappe.get_doc("Cheese Deposit", deposit_id)
+		except frappe.DoesNotExistError:
 			return not_found("Deposit", deposit_id)
 
 		try:
@@ -1141,8 +1209,6 @@ def mark_deposit_overdue(deposit_id):
 		except frappe.PermissionError:
 			return error("Unauthorized", "UNAUTHORIZED", {}, 403)
 
-		deposit = frappe.get_doc("Cheese Deposit", deposit_id)
-
 		if deposit.status != "PENDING":
 			return validation_error(
 				f"Only PENDING deposits can be marked as overdue. Current status: {deposit.status}",
@@ -1159,20 +1225,20 @@ def mark_deposit_overdue(deposit_id):
 		deposit.status = "OVERDUE"
 		deposit.save()
 
-		# Cancel associated ticket/route booking for non-payment
+		# Cancel associated ticket/route booking for non-payment. Read the
+		# status first so tickets that cannot be cancelled are never loaded.
 		if deposit.entity_type == "Cheese Ticket" and deposit.entity_id:
-			if frappe.db.exists("Cheese Ticket", deposit.entity_id):
+			ticket_status = frappe.db.get_value("Cheese Ticket", deposit.entity_id, "status")
+			if ticket_status in ["PENDING", "CONFIRMED"]:
 				ticket = frappe.get_doc("Cheese Ticket", deposit.entity_id)
-				if ticket.status in ["PENDING", "CONFIRMED"]:
-					ticket.status = "CANCELLED"
-					ticket.save()
+				ticket.status = "CANCELLED"
+				ticket.save()
 
-					# Release capacity
-					from cheese.cheese.utils.capacity import update_slot_capacity
+				# Release capacity (the ticket's own recompute runs in validate,
+				# before its new status is written)
+				from cheese.cheese.utils.capacity import update_slot_capacity
 
-					update_slot_capacity(ticket.slot)
-
-		frappe.db.commit()
+				update_slot_capacity(ticket.slot)
 
 		return success(
 			"Deposit marked as overdue",
@@ -1204,7 +1270,9 @@ def adjust_deposit(deposit_id, adjustment_reason, refund_amount=None):
 		if not adjustment_reason:
 			return validation_error("adjustment_reason is required")
 
-		if not frappe.db.exists("Cheese Deposit", deposit_id):
+		try:
+			deposit = frappe.get_doc("Cheese Deposit", deposit_id)
+		except frappe.DoesNotExistError:
 			return not_found("Deposit", deposit_id)
 
 		try:
@@ -1212,8 +1280,6 @@ def adjust_deposit(deposit_id, adjustment_reason, refund_amount=None):
 		except frappe.PermissionError:
 			return error("Unauthorized", "UNAUTHORIZED", {}, 403)
 
-		deposit = frappe.get_doc("Cheese Deposit", deposit_id)
-
 		if deposit.status not in ["PAID", "OVERDUE"]:
 			return validation_error(
 				f"Cannot adjust deposit with status: {deposit.status}", {"current_status": deposit.status}
@@ -1239,7 +1305,6 @@ def adjust_deposit(deposit_id, adjustment_reason, refund_amount=None):
 			deposit.amount_paid = 0
 
 		deposit.save()
-		frappe.db.commit()
 
 		return success(
 			"Deposit adjusted successfully",
@@ -1279,129 +1344,67 @@ def list_deposits(
 	try:
 		from frappe.utils import cint
 
-		from cheese.api.common.responses import paginated_response
+		from cheese.api.common.responses import paginated_response, window_total
 
 		page = cint(page) or 1
 		page_size = cint(page_size) or 20
 
 		user_company = _get_current_user_company()
 
-		filters = {}
-		if status:
-			filters["status"] = status
-		if entity_type:
-			filters["entity_type"] = entity_type
-		if entity_id:
-			filters["entity_id"] = entity_id
-
-		# Tenant isolation: establishment users (and any scoped user without a
-		# company -> impossible sentinel) only ever see their own deposits.
-		# Applied at the DB layer because frappe.get_all bypasses the
-		# permission_query_conditions hook. Super admins (user_company is None)
-		# are unrestricted.
+		# Tenant isolation: establishment users only ever see deposits whose
+		# entity resolves to their company. Applied in SQL because this query
+		# bypasses the permission_query_conditions hook. Super admins
+		# (user_company is None) are unrestricted.
 		if user_company:
 			company_id = user_company
-			allowed_deposit_names = _deposit_names_for_company(user_company)
-			if not allowed_deposit_names:
-				return paginated_response(
-					[], "Deposits retrieved successfully", page=page, page_size=page_size, total=0
-				)
-			filters["name"] = ["in", allowed_deposit_names]
 
-		deposits = frappe.get_all(
-			"Cheese Deposit",
-			filters=filters,
-			fields=[
-				"name",
-				"entity_type",
-				"entity_id",
-				"amount_required",
-				"amount_paid",
-				"status",
-				"due_at",
-				"paid_at",
-				"modified",
-				"bank_account",
-			],
-			order_by="modified desc",
+		conditions = []
+		params = {"limit": page_size, "offset": (page - 1) * page_size}
+		if status:
+			conditions.append("d.status = %(status)s")
+			params["status"] = status
+		if entity_type:
+			conditions.append("d.entity_type = %(entity_type)s")
+			params["entity_type"] = entity_type
+		if entity_id:
+			conditions.append("d.entity_id = %(entity_id)s")
+			params["entity_id"] = entity_id
+		if route_id:
+			conditions.append("COALESCE(t.route, rb.route) = %(route)s")
+			params["route"] = route_id
+		if company_id:
+			conditions.append("COALESCE(t.company, rbt_ticket.company) = %(company)s")
+			params["company"] = company_id
+
+		# COUNT(*) OVER() is evaluated before LIMIT, so every row carries the total.
+		deposits = frappe.db.sql(
+			f"""
+			SELECT
+				{_LIST_DEPOSITS_COLUMNS},
+				COUNT(*) OVER() AS total_count
+			{_LIST_DEPOSITS_FROM}
+			{"WHERE " + " AND ".join(conditions) if conditions else ""}
+			ORDER BY d.modified DESC
+			LIMIT %(limit)s OFFSET %(offset)s
+			""",
+			params,
+			as_dict=True,
+		)
+		total = window_total(
+			deposits,
+			page,
+			lambda: frappe.db.sql(
+				f"""
+				SELECT COUNT(*)
+				{_LIST_DEPOSITS_FROM}
+				{"WHERE " + " AND ".join(conditions) if conditions else ""}
+				""",
+				params,
+			)[0][0],
 		)
-
-		# Enrich with contact and relation info for UI filtering and display.
-		enriched = []
-		for deposit in deposits:
-			deposit["amount_remaining"] = _amount_remaining_for_deposit(deposit)
-			deposit["payment_type"] = _get_deposit_phase(deposit.name)
-			deposit["contact"] = None
-			deposit["contact_name"] = None
-			deposit["route"] = None
-			deposit["company"] = None
-			deposit["linked_ticket_id"] = None
-
-			if deposit.entity_type == "Cheese Ticket":
-				ticket = frappe.db.get_value(
-					"Cheese Ticket",
-					deposit.entity_id,
-					["name", "contact", "route", "company"],
-					as_dict=True,
-				)
-				if ticket:
-					deposit["contact"] = ticket.contact
-					deposit["route"] = ticket.route
-					deposit["company"] = ticket.company
-					deposit["linked_ticket_id"] = ticket.name
-			elif deposit.entity_type == "Cheese Route Booking":
-				booking = frappe.db.get_value(
-					"Cheese Route Booking",
-					deposit.entity_id,
-					["contact", "route"],
-					as_dict=True,
-				)
-				if booking:
-					deposit["contact"] = booking.contact
-					deposit["route"] = booking.route
-					# Route doctype has no direct company field; derive establishment from linked tickets.
-					first_ticket_id = frappe.db.get_value(
-						"Cheese Route Booking Ticket",
-						{"parent": deposit.entity_id},
-						"ticket",
-						order_by="idx asc",
-					)
-					if first_ticket_id:
-						deposit["company"] = frappe.db.get_value("Cheese Ticket", first_ticket_id, "company")
-					deposit["linked_ticket_id"] = frappe.db.get_value(
-						"Cheese Route Booking Ticket",
-						{"parent": deposit.entity_id},
-						"ticket",
-						order_by="idx asc",
-					)
-
-			if deposit.get("contact"):
-				deposit["contact_name"] = frappe.db.get_value(
-					"Cheese Contact", deposit["contact"], "full_name"
-				)
-
-			# Resolve bank account human-readable title
-			if deposit.get("bank_account"):
-				deposit["bank_account_title"] = (
-					frappe.db.get_value("Cheese Bank Account", deposit["bank_account"], "title")
-					or deposit["bank_account"]
-				)
-			else:
-				deposit["bank_account_title"] = None
-
-			if route_id and deposit.get("route") != route_id:
-				continue
-			if company_id and deposit.get("company") != company_id:
-				continue
-			enriched.append(deposit)
-
-		total = len(enriched)
-		start = (page - 1) * page_size
-		end = start + page_size
-		deposits_page = enriched[start:end]
 
 		return paginated_response(
-			deposits_page, "Deposits retrieved successfully", page=page, page_size=page_size, total=total
+			deposits, "Deposits retrieved successfully", page=page, page_size=page_size, total=total
 		)
 	except Exception as e:
 		frappe.log_error(f"Error in list_deposits: {e!s}")
@@ -1498,7 +1501,9 @@ def reconcile_deposit(deposit_id, bank_account_number=None):
 		if not deposit_id:
 			return validation_error("deposit_id is required")
 
-		if not frappe.db.exists("Cheese Deposit", deposit_id):
+		try:
+			deposit = frappe.get_doc("Cheese Deposit", deposit_id)
+		except frappe.DoesNotExistError:
 			return not_found("Deposit", deposit_id)
 
 		try:
@@ -1506,13 +1511,9 @@ def reconcile_deposit(deposit_id, bank_account_number=None):
 		except frappe.PermissionError:
 			return error("Unauthorized", "UNAUTHORIZED", {}, 403)
 
-		deposit = frappe.get_doc("Cheese Deposit", deposit_id)
-
 		# Use reconcile_ocr_payment method
 		reconciliation_result = deposit.reconcile_ocr_payment(bank_account_number)
 
-		frappe.db.commit()
-
 		return success(
 			"Deposit reconciled successfully",
 			{
@@ -1611,8 +1612,6 @@ def create_remaining_balance_deposit(ticket_id=None, route_booking_id=None):
 
 		new_deposit = _create_balance_deposit(entity_type, entity_doc)
 
-		frappe.db.commit()
-
 		bank_accounts = []
 		if entity_type == "Cheese Ticket":
 			bank_accounts = _bank_accounts_for_ticket(entity_doc)
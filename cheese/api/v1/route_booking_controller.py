@@ -9,7 +9,15 @@ import frappe
 from frappe import _
 from frappe.utils import add_to_date, get_datetime, getdate, now_datetime
 
-from cheese.api.common.responses import created, error, not_found, paginated_response, success, validation_error
+from cheese.api.common.responses import (
+	created,
+	error,
+	not_found,
+	paginated_response,
+	parse_json,
+	success,
+	validation_error,
+)
 from cheese.api.v1.ticket_controller import create_pending_ticket
 from cheese.api.v1.user_controller import _get_current_user_company
 from cheese.cheese.utils.access import assert_route_access, assert_record_access
@@ -321,7 +329,7 @@ def get_route_combinations(route_id, date=None, date_from=None, date_to=None, pa
 		except frappe.PermissionError:
 			return _permission_denied("Not permitted to access this route")
 
-		route = frappe.get_doc("Cheese Route", route_id)
+		route = frappe.get_cached_doc("Cheese Route", route_id)
 
 		if route.status != "ONLINE":
 			return success(
@@ -486,7 +494,7 @@ def create_route_reservation(
 		except frappe.PermissionError:
 			return _permission_denied("Not permitted to access this route")
 
-		route = frappe.get_doc("Cheese Route", route_id)
+		route = frappe.get_cached_doc("Cheese Route", route_id)
 
 		if route.status != "ONLINE":
 			return validation_error(f"Route {route_id} is not ONLINE. Current status: {route.status}")
@@ -591,13 +599,28 @@ def create_route_reservation(
 		# Parse experiences_with_slots
 		if isinstance(experiences_with_slots, str):
 			try:
-				experiences_with_slots = json.loads(experiences_with_slots)
+				experiences_with_slots = parse_json(experiences_with_slots)
 			except Exception as e:
 				return validation_error(f"Invalid experiences_with_slots format: {e!s}")
 
 		if not isinstance(experiences_with_slots, list):
 			return validation_error("experiences_with_slots must be an array")
 
+		# Every experience this reservation touches (route rows + requested items),
+		# fetched once instead of per-row get_doc/get_value lookups below.
+		involved_exp_ids = {row.experience for row in route.experiences}
+		involved_exp_ids.update(
+			item.get("experience_id") for item in experiences_with_slots if item.get("experience_id")
+		)
+		exp_info = {
+			row.name: row
+			for row in frappe.get_all(
+				"Cheese Experience",
+				filters={"name": ["in", list(involved_exp_ids)]},
+				fields=["name", "experience_type", "status", "deposit_ttl_hours"],
+			)
+		} if involved_exp_ids else {}
+
 		# Validate all experiences and slots
 		slot_map = {}
 		selected_date_map = {}
@@ -612,10 +635,9 @@ def create_route_reservation(
 			)
 			if not exp_id:
 				return validation_error("Each item must have 'experience_id'")
-			if not frappe.db.exists("Cheese Experience", exp_id):
+			if exp_id not in exp_info:
 				return not_found("Experience", exp_id)
-			exp_type = frappe.db.get_value("Cheese Experience", exp_id, "experience_type")
-			is_hotel_item = exp_type == "HOTEL"
+			is_hotel_item = exp_info[exp_id].experience_type == "HOTEL"
 			if not is_hotel_item:
 				# Non-hotel experiences require an explicit slot_id
 				if not slot_id:
@@ -644,8 +666,7 @@ def create_route_reservation(
 		non_hotel_items = [
 			item
 			for item in experiences_with_slots
-			if frappe.db.get_value("Cheese Experience", item.get("experience_id"), "experience_type")
-			!= "HOTEL"
+			if exp_info[item.get("experience_id")].experience_type != "HOTEL"
 		]
 		if len(slot_map) < len(non_hotel_items):
 			return validation_error(
@@ -673,7 +694,7 @@ def create_route_reservation(
 			item.get("experience_id") for item in experiences_with_slots if item.get("experience_id")
 		]
 		for exp_id in all_exp_ids:
-			exp_status = frappe.db.get_value("Cheese Experience", exp_id, "status")
+			exp_status = exp_info[exp_id].status
 			if exp_status != "ONLINE":
 				return validation_error(f"Experience {exp_id} is not ONLINE (status: {exp_status})")
 
@@ -733,7 +754,7 @@ def create_route_reservation(
 		# If the route includes hotel experiences, date_to must be after date_from (minimum 1 night)
 		if start_date and end_date and end_date <= start_date:
 			route_has_hotel = any(
-				frappe.db.get_value("Cheese Experience", exp_row.experience, "experience_type") == "HOTEL"
+				exp_info[exp_row.experience].experience_type == "HOTEL"
 				for exp_row in route.experiences
 			)
 			if route_has_hotel:
@@ -774,8 +795,7 @@ def create_route_reservation(
 			experience_id = exp_row.experience
 			ticket_selected_date = selected_date_map.get(experience_id)
 
-			experience_doc = frappe.get_doc("Cheese Experience", experience_id)
-			is_hotel = experience_doc.experience_type == "HOTEL"
+			is_hotel = exp_info[experience_id].experience_type == "HOTEL"
 			check_in = str(start_date) if is_hotel and start_date else None
 			check_out = str(end_date) if is_hotel and end_date else None
 			rooms = party_size if is_hotel else None
@@ -851,8 +871,7 @@ def create_route_reservation(
 			ticket_doc = frappe.get_doc("Cheese Ticket", ticket_id)
 			deposit_amount += ticket_doc.deposit_amount or 0
 			if ticket_doc.deposit_required and (ticket_doc.deposit_amount or 0) > 0:
-				exp_doc = frappe.get_doc("Cheese Experience", ticket_doc.experience)
-				hours = exp_doc.deposit_ttl_hours or 24
+				hours = exp_info[ticket_doc.experience].deposit_ttl_hours or 24
 				deposit_due_candidates.append(add_to_date(reservation_now, hours=hours, as_string=False))
 
 		deposit_required = deposit_amount > 0
@@ -1068,7 +1087,7 @@ def get_route_summary(route_booking_id):
 			return _permission_denied("Not permitted to access this route booking")
 		if not _has_route_booking_company_access(route_booking):
 			return _permission_denied("Not permitted to access this route booking")
-		route = frappe.get_doc("Cheese Route", route_booking.route)
+		route = frappe.get_cached_doc("Cheese Route", route_booking.route)
 
 		# Build itinerary from tickets with financial data
 		itinerary = []
@@ -1324,7 +1343,7 @@ def modify_route_booking_preview(route_booking_id, changes):
 		# Parse changes
 		if isinstance(changes, str):
 			try:
-				changes = json.loads(changes)
+				changes = parse_json(changes)
 			except Exception as e:
 				return validation_error(f"Invalid changes format: {e!s}")
 
@@ -1395,7 +1414,7 @@ def confirm_route_modification(route_booking_id, changes):
 		# Parse changes
 		if isinstance(changes, str):
 			try:
-				changes = json.loads(changes)
+				changes = parse_json(changes)
 			except Exception as e:
 				return validation_error(f"Invalid changes format: {e!s}")
 
@@ -1479,7 +1498,7 @@ def add_activities_to_route_preview(route_booking_id, activities):
 		# Parse activities
 		if isinstance(activities, str):
 			try:
-				activities = json.loads(activities)
+				activities = parse_json(activities)
 			except Exception as e:
 				return validation_error(f"Invalid activities format: {e!s}")
 
@@ -1578,7 +1597,7 @@ def confirm_add_activities_to_route(route_booking_id, activities):
 		# Parse activities
 		if isinstance(activities, str):
 			try:
-				activities = json.loads(activities)
+				activities = parse_json(activities)
 			except Exception as e:
 				return validation_error(f"Invalid activities format: {e!s}")
 
@@ -1793,7 +1812,7 @@ def get_available_slots_for_route(route_id, selected_date=None, date_from=None,
 		except frappe.PermissionError:
 			return _permission_denied("Not permitted to access this route")
 
-		route = frappe.get_doc("Cheese Route", route_id)
+		route = frappe.get_cached_doc("Cheese Route", route_id)
 		if route.status != "ONLINE":
 			return validation_error(f"Route {route_id} is not ONLINE. Current status: {route.status}")
 
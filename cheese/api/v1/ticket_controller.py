@@ -704,34 +704,11 @@ def cancel_ticket(ticket_id):
 		if not ticket_id:
 			return validation_error("ticket_id is required")
 
-		if not frappe.db.exists("Cheese Ticket", ticket_id):
-			return not_found("Ticket", ticket_id)
-
-		try:
-			assert_record_access("Cheese Ticket", ticket_id)
-		except frappe.PermissionError:
-			return error("Unauthorized", "UNAUTHORIZED", {}, 403)
+		problem, _slot_ids = _check_tickets_cancellable([ticket_id])
+		if problem:
+			return problem
 
 		ticket = frappe.get_doc("Cheese Ticket", ticket_id)
-		
-		if ticket.status not in ["PENDING", "CONFIRMED"]:
-			return validation_error(
-				f"Only PENDING or CONFIRMED tickets can be cancelled. Current status: {ticket.status}",
-				{"current_status": ticket.status, "allowed_statuses": ["PENDING", "CONFIRMED"]}
-			)
-
-		if ticket.status == "CONFIRMED":
-			# Validate cancellation policy (hotel tickets carry no slot: the
-			# stay's check-in date anchors the policy window)
-			try:
-				if ticket.slot:
-					slot = frappe.get_doc("Cheese Experience Slot", ticket.slot)
-					slot_datetime = get_datetime(f"{slot.date_from} {slot.time_from}")
-				else:
-					slot_datetime = get_datetime(f"{ticket.check_in_date} 00:00:00")
-				validate_booking_policy(ticket.experience, slot_datetime, action="cancel")
-			except frappe.ValidationError as e:
-				return validation_error(str(e))
 
 		slot_id = ticket.slot
 		old_status = ticket.status
@@ -759,6 +736,116 @@ def cancel_ticket(ticket_id):
 		return error("Failed to cancel ticket", "SERVER_ERROR", {"error": str(e)}, 500)
 
 
+def _check_tickets_cancellable(ticket_ids):
+	"""
+	Check that tickets can be cancelled, without changing them
+
+	Holds the rules shared by cancel_ticket and cancel_tickets_bulk: access,
+	PENDING/CONFIRMED status and, for CONFIRMED tickets, the booking policy.
+
+	Ticket and slot rows are read with one query each.
+
+	Args:
+		ticket_ids: List of ticket IDs
+
+	Returns:
+		(first error response or None, set of slot IDs the tickets occupy)
+	"""
+	if not ticket_ids:
+		return None, set()
+
+	tickets = {
+		row.name: row
+		for row in frappe.get_all(
+			"Cheese Ticket",
+			filters={"name": ["in", list(ticket_ids)]},
+			fields=["name", "status", "slot", "experience", "check_in_date"],
+		)
+	}
+	slot_ids = {row.slot for row in tickets.values() if row.slot}
+	slots = {
+		row.name: row
+		for row in frappe.get_all(
+			"Cheese Experience Slot",
+			filters={"name": ["in", list(slot_ids)]},
+			fields=["name", "date_from", "time_from"],
+		)
+	} if slot_ids else {}
+
+	for ticket_id in ticket_ids:
+		ticket = tickets.get(ticket_id)
+		if not ticket:
+			return not_found("Ticket", ticket_id), slot_ids
+
+		try:
+			assert_record_access("Cheese Ticket", ticket_id)
+		except frappe.PermissionError:
+			return error("Unauthorized", "UNAUTHORIZED", {}, 403), slot_ids
+
+		if ticket.status not in ["PENDING", "CONFIRMED"]:
+			return validation_error(
+				f"Only PENDING or CONFIRMED tickets can be cancelled. Current status: {ticket.status}",
+				{"ticket_id": ticket_id, "current_status": ticket.status, "allowed_statuses": ["PENDING", "CONFIRMED"]}
+			), slot_ids
+
+		if ticket.status == "CONFIRMED":
+			# Validate cancellation policy (hotel tickets carry no slot: the
+			# stay's check-in date anchors the policy window)
+			try:
+				if ticket.slot:
+					slot = slots.get(ticket.slot)
+					if not slot:
+						return not_found("Slot", ticket.slot), slot_ids
+					slot_datetime = get_datetime(f"{slot.date_from} {slot.time_from}")
+				else:
+					slot_datetime = get_datetime(f"{ticket.check_in_date} 00:00:00")
+				validate_booking_policy(ticket.experience, slot_datetime, action="cancel")
+			except frappe.ValidationError as e:
+				return validation_error(str(e)), slot_ids
+
+	return None, slot_ids
+
+
+def cancel_tickets_bulk(ticket_ids, slot_ids=None):
+	"""
+	Cancel several tickets at once (used by booking-level cancellation)
+
+	Applies the same rules as cancel_ticket, but every ticket is validated
+	before any is cancelled (_check_tickets_cancellable), and slot capacity is
+	recomputed once per distinct slot. Each ticket is still saved individually
+	so status events, room release and webhooks fire. Committing is left to
+	the caller, as is rolling back tickets saved before an error response.
+
+	Args:
+		ticket_ids: List of ticket IDs
+		slot_ids: Slot IDs from a _check_tickets_cancellable call the caller
+			already made for these tickets; the check is skipped when given
+
+	Returns:
+		Success response with cancelled ticket IDs, or the first error response
+	"""
+	if not ticket_ids:
+		return success("Tickets cancelled successfully", {"cancelled_tickets": []})
+
+	if slot_ids is None:
+		problem, slot_ids = _check_tickets_cancellable(ticket_ids)
+		if problem:
+			return problem
+
+	for ticket_id in ticket_ids:
+		ticket = frappe.get_doc("Cheese Ticket", ticket_id)
+		ticket.status = "CANCELLED"
+		try:
+			ticket.save()
+		except frappe.ValidationError as e:
+			return validation_error(str(e), {"ticket_id": ticket_id})
+
+	for slot_id in slot_ids:
+		update_slot_capacity(slot_id)
+
+	return success("Tickets cancelled successfully", {"cancelled_tickets": list(ticket_ids)})
+
+
 @frappe.whitelist()
 def get_ticket_summary(ticket_id):
 	"""
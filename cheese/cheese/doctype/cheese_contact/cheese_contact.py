@@ -32,6 +32,30 @@ LEGACY_CHANNEL_CODE_MAP = {
 	"WEB": "Web",
 }
 
+# Seconds a positive contact_exists() answer is served from Redis.
+CONTACT_EXISTS_CACHE_TTL = 60
+
+
+def _contact_exists_cache_key(contact_id):
+	return f"cheese:contact_exists:{contact_id}"
+
+
+def contact_exists(contact_id):
+	"""frappe.db.exists for Cheese Contact with hits cached briefly.
+
+	Only positive answers are cached, so a contact created a moment ago is
+	never reported missing. Rename and delete drop the key.
+	"""
+	if not contact_id:
+		return False
+	key = _contact_exists_cache_key(contact_id)
+	if frappe.cache.get_value(key):
+		return True
+	if not frappe.db.exists("Cheese Contact", contact_id):
+		return False
+	frappe.cache.set_value(key, 1, expires_in_sec=CONTACT_EXISTS_CACHE_TTL)
+	return True
+
 
 class CheeseContact(Document):
 	# begin: auto-generated types
@@ -87,7 +111,10 @@ class CheeseContact(Document):
 
 	def after_rename(self, old_name, new_name, merge=False):
 		"""Called after document is renamed"""
-		pass
+		frappe.cache.delete_value(_contact_exists_cache_key(old_name))
+
+	def on_trash(self):
+		frappe.cache.delete_value(_contact_exists_cache_key(self.name))
 
 	def on_update(self):
 		"""Keep document name in sync with phone only — never rename when full_name changes."""
@@ -14,10 +14,12 @@ class CheeseSupportCase(Document):
 
 	if TYPE_CHECKING:
 		from frappe.types import DF
+		from cheese.cheese.doctype.cheese_support_case_note.cheese_support_case_note import CheeseSupportCaseNote
 
 		contact: DF.Link
 		description: DF.TextEditor
 		incident_type: DF.Literal["LOCAL", "GENERAL"]
+		notes: DF.Table[CheeseSupportCaseNote]
 		status: DF.Literal["OPEN", "IN_PROGRESS", "RESOLVED", "CLOSED"]
 		ticket: DF.Link | None
 	# end: auto-generated types
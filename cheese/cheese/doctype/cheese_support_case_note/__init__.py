@@ -0,0 +1,2 @@
+# Copyright (c) 2024
+# License: MIT
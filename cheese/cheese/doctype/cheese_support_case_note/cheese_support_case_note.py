@@ -0,0 +1,24 @@
+# Copyright (c) 2024
+# License: MIT
+
+from frappe.model.document import Document
+
+
+class CheeseSupportCaseNote(Document):
+	# begin: auto-generated types
+	# This code is auto-generated. Do not modify anything in this block.
+
+	from typing import TYPE_CHECKING
+
+	if TYPE_CHECKING:
+		from frappe.types import DF
+
+		author: DF.Link | None
+		note: DF.SmallText
+		noted_at: DF.Datetime | None
+		parent: DF.Data
+		parentfield: DF.Data
+		parenttype: DF.Data
+	# end: auto-generated types
+
+	pass
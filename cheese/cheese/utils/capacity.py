@@ -1,10 +1,32 @@
 # Copyright (c) 2024
 # License: MIT
 
+from functools import lru_cache
+
 import frappe
 from frappe.query_builder import functions as fn
 from frappe.utils import add_days, getdate
 
+# Ticket statuses that occupy slot capacity.
+ACTIVE_TICKET_STATUSES = ("PENDING", "CONFIRMED", "CHECKED_IN")
+
+
+@lru_cache(maxsize=1024)
+def _parse_date_str(value):
+	return getdate(value)
+
+
+def parse_date(value):
+	"""getdate() with date strings memoized for the life of the worker.
+
+	Request parameters repeat the same few dates across calls; dates are
+	immutable so the parsed value can be shared. Non-string input (None,
+	date, datetime) goes straight to getdate.
+	"""
+	if isinstance(value, str):
+		return _parse_date_str(value)
+	return getdate(value)
+
 
 def iter_calendar_days_inclusive(start, end):
 	"""Yield each calendar date from start through end (inclusive)."""
@@ -69,7 +91,7 @@ def calculate_reserved_capacity(slot_name, selected_date=None, exclude_ticket=No
 
 	ticket = DocType("Cheese Ticket")
 
-	active_statuses = ["PENDING", "CONFIRMED", "CHECKED_IN"]
+	active_statuses = list(ACTIVE_TICKET_STATUSES)
 
 	slot_doc = frappe.get_doc("Cheese Experience Slot", slot_name)
 	exp_doc = frappe.get_doc("Cheese Experience", slot_doc.experience)
@@ -124,6 +146,71 @@ def get_available_capacity(slot_name, selected_date=None, exclude_ticket=None):
 	return max_capacity - reserved
 
 
+def get_available_capacity_bulk(slot_names, date_from, date_to):
+	"""
+	Available capacity for many slots over a date range in a fixed number of queries.
+
+	Equivalent to calling get_available_capacity(slot, day) for every calendar
+	day each slot is active within [date_from, date_to], but reserved seats are
+	summed with a single GROUP BY (slot, selected_date) query instead of one
+	query per slot/day. HOTEL slots keep the per-slot path since their capacity
+	is counted by experience and stay range rather than by slot.
+
+	Args:
+		slot_names: Names of Cheese Experience Slots
+		date_from: Start of the queried range (inclusive)
+		date_to: End of the queried range (inclusive)
+
+	Returns:
+		Dict mapping (slot_name, date) to available capacity
+	"""
+	if not slot_names:
+		return {}
+
+	from frappe.query_builder import DocType
+
+	date_from, date_to = getdate(date_from), getdate(date_to)
+	slots = frappe.get_all(
+		"Cheese Experience Slot",
+		filters={"name": ["in", list(slot_names)]},
+		fields=["name", "experience", "date_from", "date_to", "max_capacity"],
+	)
+	hotel_experiences = set(
+		frappe.get_all(
+			"Cheese Experience",
+			filters={
+				"name": ["in", list({s.experience for s in slots})],
+				"experience_type": "HOTEL",
+			},
+			pluck="name",
+		)
+	) if slots else set()
+
+	reserved = {}
+	seat_slots = [s.name for s in slots if s.experience not in hotel_experiences]
+	if seat_slots:
+		ticket = DocType("Cheese Ticket")
+		rows = (
+			frappe.qb.from_(ticket)
+			.select(ticket.slot, ticket.selected_date, fn.Sum(ticket.party_size))
+			.where(ticket.slot.isin(seat_slots))
+			.where(ticket.status.isin(ACTIVE_TICKET_STATUSES))
+			.where(ticket.selected_date.between(date_from, date_to))
+			.groupby(ticket.slot, ticket.selected_date)
+			.run()
+		)
+		reserved = {(slot, getdate(day)): total or 0 for slot, day, total in rows}
+
+	capacity = {}
+	for slot in slots:
+		for day in slot_calendar_days_in_range(slot.date_from, slot.date_to, date_from, date_to):
+			if slot.experience in hotel_experiences:
+				capacity[(slot.name, day)] = get_available_capacity(slot.name, selected_date=day)
+			else:
+				capacity[(slot.name, day)] = (slot.max_capacity or 0) - reserved.get((slot.name, day), 0)
+	return capacity
+
+
 def _effective_max_capacity(slot, selected_date=None):
 	"""Max capacity of a slot.
 
@@ -32,6 +32,51 @@ def log_event(entity_type, entity_id, event_type, payload=None):
 		frappe.log_error(f"Failed to log event: {e}", "Event Logging Error")
 
 
+def enqueue_system_event(entity_type, entity_id, event_type, payload=None, created_at=None):
+	"""
+	Queue a System Event insert on the short worker queue
+	
+	The event name is resolved up front so callers can still return it; the
+	row itself is written once the current request has committed.
+	
+	Args:
+		entity_type: Type of entity (e.g., "Cheese Contact")
+		entity_id: ID of the entity
+		event_type: Type of event (e.g., "CONTACT_UPDATED")
+		payload: Optional dictionary with event data
+		created_at: Optional event timestamp (defaults to now)
+		
+	Returns:
+		Name the event will be stored under
+	"""
+	created_at = created_at or now_datetime()
+	values = {
+		"doctype": "Cheese System Event",
+		"entity_type": entity_type,
+		"entity_id": entity_id,
+		"event_type": event_type,
+		"payload_json": json.dumps(payload, default=str) if payload else None,
+		"triggered_by": frappe.session.user,
+		"created_at": created_at,
+		"creation": created_at,
+	}
+	event = frappe.get_doc(values)
+	event.set_new_name()
+	values["name"] = event.name
+	frappe.enqueue(
+		"cheese.cheese.utils.events.insert_system_event",
+		queue="short",
+		enqueue_after_commit=True,
+		values=values,
+	)
+	return event.name
+
+
+def insert_system_event(values):
+	"""Background job: persist a System Event queued by enqueue_system_event."""
+	frappe.get_doc(values).insert(ignore_permissions=True, set_name=values["name"])
+
+
 def get_events(entity_type, entity_id, event_type=None):
 	"""
 	Get events for an entity
@@ -90,6 +135,38 @@ def update_route_booking_status(doc, method):
 		frappe.log_error(f"Failed to update route booking status: {e}", "Route Booking Update Error")
 
 
+def clear_availability_cache(doc, method=None):
+	"""Invalidate cached get_available_slots results for the document's experience."""
+	from cheese.api.v1.availability_controller import _availability_version_key
+
+	version = frappe.generate_hash(length=8)
+	# The multi-experience listing includes every experience, so it moves too.
+	frappe.cache.set_value(_availability_version_key(doc.get("experience")), version)
+	frappe.cache.set_value(_availability_version_key(None), version)
+
+
+def clear_booking_status_cache(doc, method=None):
+	"""Invalidate cached get_booking_status results for the ticket's contact."""
+	if not doc.contact:
+		return
+	from cheese.api.v1.booking_controller import _booking_status_version_key
+
+	frappe.cache.set_value(_booking_status_version_key(doc.contact), frappe.generate_hash(length=8))
+
+
+def clear_contact_profile_cache(doc, method=None):
+	"""Invalidate cached get_contact_profile lists for the document's contact."""
+	contact = doc.get("contact")
+	if not contact and doc.get("lead"):
+		# Cheese Quotation reaches its contact through the lead
+		contact = frappe.db.get_value("Cheese Lead", doc.lead, "contact")
+	if not contact:
+		return
+	from cheese.api.v1.contact_controller import _contact_profile_version_key
+
+	frappe.cache.set_value(_contact_profile_version_key(contact), frappe.generate_hash(length=8))
+
+
 def on_ticket_created_notify_establishment(doc, method):
 	"""
 	Send email notification to establishment when a ticket is created.
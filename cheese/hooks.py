@@ -201,7 +201,17 @@ has_permission = {
 doc_events = {
 	"Cheese Ticket": {
 		"validate": "cheese.cheese.utils.events.set_ticket_company",
-		"on_update": "cheese.cheese.utils.events.update_route_booking_status",
+		"on_update": [
+			"cheese.cheese.utils.events.update_route_booking_status",
+			"cheese.cheese.utils.events.clear_availability_cache",
+			"cheese.cheese.utils.events.clear_booking_status_cache",
+			"cheese.cheese.utils.events.clear_contact_profile_cache",
+		],
+		"on_trash": [
+			"cheese.cheese.utils.events.clear_availability_cache",
+			"cheese.cheese.utils.events.clear_booking_status_cache",
+			"cheese.cheese.utils.events.clear_contact_profile_cache",
+		],
 		"after_insert": [
 			"cheese.cheese.utils.lead_automation.on_ticket_insert",
 			"cheese.cheese.utils.events.on_ticket_created_notify_establishment",
@@ -209,11 +219,17 @@ doc_events = {
 		],
 	},
 	"Conversation": {
-		"on_update": "cheese.cheese.utils.lead_automation.on_conversation_update",
+		"on_update": [
+			"cheese.cheese.utils.lead_automation.on_conversation_update",
+			"cheese.cheese.utils.events.clear_contact_profile_cache",
+		],
 		"after_insert": "cheese.cheese.utils.lead_automation.on_conversation_update",
+		"on_trash": "cheese.cheese.utils.events.clear_contact_profile_cache",
 	},
 	"Cheese Experience Slot": {
 		"validate": "cheese.cheese.utils.events.set_slot_company",
+		"on_update": "cheese.cheese.utils.events.clear_availability_cache",
+		"on_trash": "cheese.cheese.utils.events.clear_availability_cache",
 	},
 	"Cheese Attendance": {
 		"validate": "cheese.cheese.utils.events.set_attendance_company",
@@ -226,6 +242,12 @@ doc_events = {
 	},
 	"Cheese Lead": {
 		"validate": "cheese.cheese.utils.events.set_lead_company",
+		"on_update": "cheese.cheese.utils.events.clear_contact_profile_cache",
+		"on_trash": "cheese.cheese.utils.events.clear_contact_profile_cache",
+	},
+	"Cheese Quotation": {
+		"on_update": "cheese.cheese.utils.events.clear_contact_profile_cache",
+		"on_trash": "cheese.cheese.utils.events.clear_contact_profile_cache",
 	},
 	"Cheese Deposit": {
 		"on_update": "cheese.cheese.utils.qr_on_payment.on_deposit_paid",
@@ -0,0 +1,17 @@
+"""Composite indexes for the per-contact list endpoints.
+
+get_contact_leads, get_contact_conversations and get_contact_reservations
+filter on contact and page by ORDER BY modified DESC. With only the
+single-column contact index MariaDB filesorts every row of the contact
+before applying LIMIT; (contact, modified) lets it walk the index backwards
+and stop after one page.
+"""
+
+import frappe
+
+
+def execute():
+	frappe.db.add_index("Cheese Lead", ["contact", "modified"])
+	frappe.db.add_index("Conversation", ["contact", "modified"])
+	frappe.db.add_index("Cheese Ticket", ["contact", "modified"])
+	frappe.db.commit()
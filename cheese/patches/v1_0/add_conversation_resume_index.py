@@ -0,0 +1,14 @@
+"""Composite index for the conversation resume lookup.
+
+open_or_resume_conversation looks for the latest ACTIVE conversation of a
+contact on a channel. (contact, channel, status, modified) answers the
+equality filters and the ORDER BY modified DESC LIMIT 1 from the index
+alone instead of sorting every conversation of the contact.
+"""
+
+import frappe
+
+
+def execute():
+	frappe.db.add_index("Conversation", ["contact", "channel", "status", "modified"])
+	frappe.db.commit()
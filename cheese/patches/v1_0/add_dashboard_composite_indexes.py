@@ -0,0 +1,17 @@
+"""Composite indexes for the dashboard slot and deposit lookups.
+
+get_day_agenda filters Cheese Experience Slot on experience IN (...) plus a
+date_from/date_to range; the existing (experience, slot_status, date_from)
+index stops at experience there since slot_status is not filtered.
+Pending-action and KPI deposit queries filter Cheese Deposit on
+(entity_type, entity_id, status). Cheese Ticket (slot, status) already
+exists (add_ticket_attendance_composite_indexes).
+"""
+
+import frappe
+
+
+def execute():
+	frappe.db.add_index("Cheese Experience Slot", ["experience", "date_from"])
+	frappe.db.add_index("Cheese Deposit", ["entity_type", "entity_id", "status"])
+	frappe.db.commit()
@@ -0,0 +1,17 @@
+"""Composite indexes for the hot ticket / attendance / slot lookups.
+
+Capacity and check-in queries filter Cheese Ticket on (slot, status),
+attendance checks filter Cheese Attendance on (ticket, status), and the
+availability endpoints filter Cheese Experience Slot on experience +
+slot_status + date range. Single-column Link indexes leave MariaDB
+filtering the second column row by row.
+"""
+
+import frappe
+
+
+def execute():
+	frappe.db.add_index("Cheese Ticket", ["slot", "status"])
+	frappe.db.add_index("Cheese Attendance", ["ticket", "status"])
+	frappe.db.add_index("Cheese Experience Slot", ["experience", "slot_status", "date_from"])
+	frappe.db.commit()
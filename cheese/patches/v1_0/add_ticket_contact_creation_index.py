@@ -0,0 +1,14 @@
+"""Composite index for booking status lookups.
+
+get_booking_status finds a booking's tickets by contact and a two-minute
+creation window, excluding cancelled ones. (contact, creation, status)
+serves that range scan from the index instead of walking every ticket of
+the contact.
+"""
+
+import frappe
+
+
+def execute():
+	frappe.db.add_index("Cheese Ticket", ["contact", "creation", "status"])
+	frappe.db.commit()
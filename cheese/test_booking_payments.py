@@ -0,0 +1,50 @@
+# Copyright (c) 2026
+# License: MIT
+"""Tests for how register_payment_for_booking splits a payment across reservations.
+
+Run with: bench --site <site> run-tests --app cheese \
+    --module cheese.test_booking_payments
+"""
+
+from unittest.mock import patch
+
+from frappe.tests.utils import FrappeTestCase
+
+from cheese.api.v1 import booking_controller, deposit_controller
+
+
+class TestRegisterPaymentForBooking(FrappeTestCase):
+	def _register(self, amount, reservations):
+		"""Run register_payment_for_booking and return the record_deposit_payment calls."""
+		status = {"success": True, "data": {"individual_reservations": reservations}}
+		with (
+			patch.object(booking_controller, "get_booking_status", return_value=status),
+			patch.object(
+				deposit_controller, "record_deposit_payment", return_value={"success": True}
+			) as record_payment,
+		):
+			result = booking_controller.register_payment_for_booking("BOOKING-1", amount)
+		self.assertTrue(result["success"], result)
+		return [c.kwargs for c in record_payment.call_args_list]
+
+	def test_shares_add_up_to_the_amount(self):
+		calls = self._register(100, ["T-1", "T-2", "T-3"])
+
+		shares = [c["amount"] for c in calls]
+		self.assertEqual(shares, [33.34, 33.33, 33.33])
+		self.assertEqual(round(sum(shares) * 100), 10000)
+
+	def test_remainder_cents_go_to_the_first_reservations(self):
+		calls = self._register("10.02", ["T-1", "T-2", "T-3", "T-4"])
+
+		self.assertEqual([c["amount"] for c in calls], [2.51, 2.51, 2.5, 2.5])
+
+	def test_zero_shares_are_skipped(self):
+		calls = self._register(0.02, ["T-1", "T-2", "T-3"])
+
+		self.assertEqual([(c["ticket_id"], c["amount"]) for c in calls], [("T-1", 0.01), ("T-2", 0.01)])
+
+	def test_receipt_is_attached_to_the_first_payment_only(self):
+		calls = self._register(50, ["T-1", "T-2"])
+
+		self.assertEqual([c["attach_receipt"] for c in calls], [True, False])
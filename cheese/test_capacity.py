@@ -0,0 +1,87 @@
+# Copyright (c) 2026
+# License: MIT
+"""Tests for bulk slot capacity in ``cheese.cheese.utils.capacity``.
+
+Rows are written with db_insert so the counts depend only on the columns
+the capacity queries read.
+
+Run with: bench --site <site> run-tests --app cheese \
+    --module cheese.test_capacity
+"""
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+from frappe.utils import getdate
+
+from cheese.cheese.utils.capacity import get_available_capacity, get_available_capacity_bulk
+
+EXPERIENCE = "Cheese Capacity Test Experience"
+SINGLE_DAY_SLOT = "CHEESE-CAP-SLOT-1"
+MULTI_DAY_SLOT = "CHEESE-CAP-SLOT-2"
+
+
+def _insert(doc):
+	frappe.get_doc(doc).db_insert()
+
+
+def _insert_ticket(name, slot, selected_date, party_size, status="CONFIRMED"):
+	_insert(
+		{
+			"doctype": "Cheese Ticket",
+			"name": name,
+			"experience": EXPERIENCE,
+			"slot": slot,
+			"selected_date": selected_date,
+			"party_size": party_size,
+			"status": status,
+		}
+	)
+
+
+class TestAvailableCapacityBulk(FrappeTestCase):
+	def setUp(self):
+		_insert({"doctype": "Cheese Experience", "name": EXPERIENCE, "experience_type": "ACTIVITY"})
+		for name, date_from, date_to in (
+			(SINGLE_DAY_SLOT, "2099-03-01", "2099-03-01"),
+			(MULTI_DAY_SLOT, "2099-03-01", "2099-03-03"),
+		):
+			_insert(
+				{
+					"doctype": "Cheese Experience Slot",
+					"name": name,
+					"experience": EXPERIENCE,
+					"date_from": date_from,
+					"date_to": date_to,
+					"max_capacity": 10,
+					"slot_status": "OPEN",
+				}
+			)
+		_insert_ticket("CHEESE-CAP-T1", SINGLE_DAY_SLOT, "2099-03-01", 3)
+		_insert_ticket("CHEESE-CAP-T2", SINGLE_DAY_SLOT, "2099-03-01", 2, status="PENDING")
+		_insert_ticket("CHEESE-CAP-T3", MULTI_DAY_SLOT, "2099-03-02", 4)
+		# Terminal statuses do not hold seats
+		_insert_ticket("CHEESE-CAP-T4", MULTI_DAY_SLOT, "2099-03-02", 5, status="CANCELLED")
+
+	def tearDown(self):
+		frappe.db.rollback()
+
+	def test_one_entry_per_slot_day_in_range(self):
+		capacity = get_available_capacity_bulk([SINGLE_DAY_SLOT, MULTI_DAY_SLOT], "2099-03-01", "2099-03-02")
+
+		self.assertEqual(
+			capacity,
+			{
+				(SINGLE_DAY_SLOT, getdate("2099-03-01")): 5,
+				(MULTI_DAY_SLOT, getdate("2099-03-01")): 10,
+				(MULTI_DAY_SLOT, getdate("2099-03-02")): 6,
+			},
+		)
+
+	def test_matches_per_slot_capacity(self):
+		capacity = get_available_capacity_bulk([SINGLE_DAY_SLOT, MULTI_DAY_SLOT], "2099-03-01", "2099-03-03")
+
+		for (slot, day), available in capacity.items():
+			self.assertEqual(available, get_available_capacity(slot, selected_date=day), (slot, day))
+
+	def test_no_slots_is_empty(self):
+		self.assertEqual(get_available_capacity_bulk([], "2099-03-01", "2099-03-03"), {})
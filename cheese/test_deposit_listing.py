@@ -0,0 +1,89 @@
+# Copyright (c) 2026
+# License: MIT
+"""Tests for list_deposits totals and company filtering.
+
+Tickets and deposits are written with db_insert so the test only depends on
+the columns list_deposits joins on, not on booking validation.
+
+Run with: bench --site <site> run-tests --app cheese \
+    --module cheese.test_deposit_listing
+"""
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+
+from cheese.api.common.responses import window_total
+from cheese.api.v1.deposit_controller import list_deposits
+
+COMPANY_A = "Cheese Deposit List Company A"
+COMPANY_B = "Cheese Deposit List Company B"
+
+
+def _insert_ticket(name, company):
+	frappe.get_doc(
+		{"doctype": "Cheese Ticket", "name": name, "company": company, "status": "PENDING", "party_size": 1}
+	).db_insert()
+
+
+def _insert_deposit(name, ticket, amount_required=100, amount_paid=0):
+	frappe.get_doc(
+		{
+			"doctype": "Cheese Deposit",
+			"name": name,
+			"entity_type": "Cheese Ticket",
+			"entity_id": ticket,
+			"amount_required": amount_required,
+			"amount_paid": amount_paid,
+			"status": "PENDING",
+		}
+	).db_insert()
+
+
+class TestWindowTotal(FrappeTestCase):
+	def test_reads_and_strips_the_window_column(self):
+		rows = [frappe._dict(name="A", total_count=7), frappe._dict(name="B", total_count=7)]
+		self.assertEqual(window_total(rows, 1, lambda: self.fail("counted")), 7)
+		self.assertEqual(rows, [{"name": "A"}, {"name": "B"}])
+
+	def test_counts_separately_only_past_the_last_page(self):
+		self.assertEqual(window_total([], 3, lambda: 12), 12)
+		self.assertEqual(window_total([], 1, lambda: self.fail("counted")), 0)
+
+
+class TestListDeposits(FrappeTestCase):
+	def setUp(self):
+		frappe.set_user("Administrator")
+		_insert_ticket("CHEESE-DL-TICKET-A1", COMPANY_A)
+		_insert_ticket("CHEESE-DL-TICKET-A2", COMPANY_A)
+		_insert_ticket("CHEESE-DL-TICKET-B1", COMPANY_B)
+		_insert_deposit("CHEESE-DL-DEP-A1", "CHEESE-DL-TICKET-A1", amount_paid=40)
+		_insert_deposit("CHEESE-DL-DEP-A2", "CHEESE-DL-TICKET-A2")
+		_insert_deposit("CHEESE-DL-DEP-B1", "CHEESE-DL-TICKET-B1")
+
+	def tearDown(self):
+		frappe.db.rollback()
+
+	def test_company_filter_limits_rows_and_total(self):
+		result = list_deposits(company_id=COMPANY_A, page_size=1)
+
+		self.assertTrue(result["success"], result)
+		self.assertEqual(result["meta"]["total"], 2)
+		self.assertEqual(result["meta"]["total_pages"], 2)
+		self.assertEqual(len(result["data"]), 1)
+		self.assertEqual(result["data"][0]["company"], COMPANY_A)
+		self.assertNotIn("total_count", result["data"][0])
+
+	def test_rows_carry_remaining_amount_and_linked_ticket(self):
+		result = list_deposits(company_id=COMPANY_A, entity_id="CHEESE-DL-TICKET-A1")
+
+		row = result["data"][0]
+		self.assertEqual(row["name"], "CHEESE-DL-DEP-A1")
+		self.assertEqual(row["linked_ticket_id"], "CHEESE-DL-TICKET-A1")
+		self.assertEqual(row["payment_type"], "Deposit")
+		self.assertEqual(row["amount_remaining"], 60)
+
+	def test_page_past_the_end_keeps_the_total(self):
+		result = list_deposits(company_id=COMPANY_B, page=5)
+
+		self.assertEqual(result["data"], [])
+		self.assertEqual(result["meta"]["total"], 1)
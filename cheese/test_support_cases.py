@@ -0,0 +1,59 @@
+# Copyright (c) 2026
+# License: MIT
+"""Tests for support case updates in ``cheese.api.v1.complaint_controller``.
+
+Run with: bench --site <site> run-tests --app cheese \
+    --module cheese.test_support_cases
+"""
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+
+from cheese.api.v1.complaint_controller import update_support_case_status
+
+CONTACT_PHONE = "+10000000921"
+
+
+def _ensure_contact(phone):
+	existing = frappe.get_all("Cheese Contact", filters={"phone": phone}, pluck="name")
+	if existing:
+		return existing[0]
+	doc = frappe.get_doc({"doctype": "Cheese Contact", "full_name": f"Contact {phone}", "phone": phone})
+	doc.insert(ignore_permissions=True)
+	return doc.name
+
+
+class TestSupportCaseNotes(FrappeTestCase):
+	def setUp(self):
+		frappe.set_user("Administrator")
+		self.case = frappe.get_doc(
+			{
+				"doctype": "Cheese Support Case",
+				"contact": _ensure_contact(CONTACT_PHONE),
+				"description": "Original complaint",
+				"incident_type": "GENERAL",
+				"status": "OPEN",
+			}
+		).insert(ignore_permissions=True)
+
+	def tearDown(self):
+		frappe.db.rollback()
+
+	def test_update_appends_note_row_and_keeps_description(self):
+		result = update_support_case_status(self.case.name, "IN_PROGRESS", notes="Called the guest")
+		self.assertTrue(result.get("success"), result)
+
+		case = frappe.get_doc("Cheese Support Case", self.case.name)
+		self.assertEqual(case.description, "Original complaint")
+		self.assertEqual(case.status, "IN_PROGRESS")
+		self.assertEqual([n.note for n in case.notes], ["Called the guest"])
+		self.assertEqual(case.notes[0].author, "Administrator")
+		self.assertIsNotNone(case.notes[0].noted_at)
+
+	def test_successive_notes_get_increasing_idx(self):
+		update_support_case_status(self.case.name, "IN_PROGRESS", notes="First")
+		update_support_case_status(self.case.name, "RESOLVED", notes="Second")
+
+		case = frappe.get_doc("Cheese Support Case", self.case.name)
+		self.assertEqual([(n.idx, n.note) for n in case.notes], [(1, "First"), (2, "Second")])
+		self.assertEqual(case.description, "Original complaint")
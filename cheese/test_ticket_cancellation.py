@@ -0,0 +1,121 @@
+# Copyright (c) 2026
+# License: MIT
+"""Behaviour tests for bulk ticket cancellation and cancel_booking.
+
+Database access is patched out so the tests pin down the order of checks
+and writes rather than fixture data.
+
+Run with: bench --site <site> run-tests --app cheese \
+    --module cheese.test_ticket_cancellation
+"""
+
+from unittest.mock import MagicMock, patch
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+
+from cheese.api.v1 import booking_controller, ticket_controller
+
+
+def _rows(*tickets):
+	"""frappe.get_all stand-in returning the given ticket rows and one slot."""
+	ticket_rows = [frappe._dict(t) for t in tickets]
+	slot_rows = [frappe._dict(name="SLOT-1", date_from="2099-01-01", time_from="10:00:00")]
+
+	def get_all(doctype, **kwargs):
+		return ticket_rows if doctype == "Cheese Ticket" else slot_rows
+
+	return get_all
+
+
+def _ticket(name, status="PENDING"):
+	return {"name": name, "status": status, "slot": "SLOT-1", "experience": "EXP-1", "check_in_date": None}
+
+
+class TestCancelTicketsBulk(FrappeTestCase):
+	def setUp(self):
+		self.docs = {}
+		patches = [
+			patch.object(ticket_controller, "assert_record_access"),
+			patch.object(ticket_controller, "validate_booking_policy"),
+			patch.object(ticket_controller, "update_slot_capacity"),
+			patch.object(ticket_controller.frappe, "get_doc", side_effect=self._get_doc),
+		]
+		self.mocks = [p.start() for p in patches]
+		for p in patches:
+			self.addCleanup(p.stop)
+		self.update_slot_capacity = self.mocks[2]
+
+	def _get_doc(self, doctype, name):
+		return self.docs.setdefault(name, MagicMock(status="PENDING"))
+
+	def test_cancels_every_ticket_and_recomputes_each_slot_once(self):
+		with patch.object(ticket_controller.frappe, "get_all", side_effect=_rows(_ticket("T-1"), _ticket("T-2"))):
+			result = ticket_controller.cancel_tickets_bulk(["T-1", "T-2"])
+
+		self.assertTrue(result["success"])
+		self.assertEqual(result["data"]["cancelled_tickets"], ["T-1", "T-2"])
+		self.assertEqual([d.status for d in self.docs.values()], ["CANCELLED", "CANCELLED"])
+		self.update_slot_capacity.assert_called_once_with("SLOT-1")
+
+	def test_rejected_ticket_stops_before_any_save(self):
+		tickets = _rows(_ticket("T-1"), _ticket("T-2", status="COMPLETED"))
+		with patch.object(ticket_controller.frappe, "get_all", side_effect=tickets):
+			result = ticket_controller.cancel_tickets_bulk(["T-1", "T-2"])
+
+		self.assertFalse(result["success"])
+		self.assertEqual(self.docs, {})
+		self.update_slot_capacity.assert_not_called()
+
+	def test_missing_ticket_is_not_found(self):
+		with patch.object(ticket_controller.frappe, "get_all", side_effect=_rows(_ticket("T-1"))):
+			result = ticket_controller.cancel_tickets_bulk(["T-1", "T-404"])
+
+		self.assertFalse(result["success"])
+		self.assertEqual(result["error"]["code"], "NOT_FOUND")
+
+	def test_confirmed_ticket_with_missing_slot_row_is_not_found(self):
+		orphan = dict(_ticket("T-1", status="CONFIRMED"), slot="SLOT-GONE")
+		with patch.object(ticket_controller.frappe, "get_all", side_effect=_rows(orphan)):
+			result = ticket_controller.cancel_tickets_bulk(["T-1"])
+
+		self.assertFalse(result["success"])
+		self.assertEqual(result["error"]["code"], "NOT_FOUND")
+		self.assertEqual(self.docs, {})
+
+	def test_slot_ids_from_an_earlier_check_skip_the_check(self):
+		with patch.object(ticket_controller, "_check_tickets_cancellable") as check:
+			result = ticket_controller.cancel_tickets_bulk(["T-1"], slot_ids={"SLOT-1"})
+
+		self.assertTrue(result["success"])
+		check.assert_not_called()
+		self.update_slot_capacity.assert_called_once_with("SLOT-1")
+
+	def test_save_validation_error_is_a_validation_response(self):
+		failing = MagicMock(status="PENDING")
+		failing.save.side_effect = frappe.ValidationError("Slot is closed")
+		self.docs["T-1"] = failing
+		with patch.object(ticket_controller.frappe, "get_all", side_effect=_rows(_ticket("T-1"))):
+			result = ticket_controller.cancel_tickets_bulk(["T-1"])
+
+		self.assertFalse(result["success"])
+		self.assertEqual(result["error"]["code"], "VALIDATION_ERROR")
+		self.update_slot_capacity.assert_not_called()
+
+
+class TestCancelBooking(FrappeTestCase):
+	def test_invalid_reservation_leaves_route_bookings_untouched(self):
+		status = {
+			"success": True,
+			"data": {"route_bookings": [{"tickets": ["T-R1"]}], "individual_reservations": ["T-1"]},
+		}
+		rejected = {"success": False, "error": {"code": "VALIDATION_ERROR"}}
+		with (
+			patch.object(booking_controller, "get_booking_status", return_value=status),
+			patch.object(ticket_controller, "_check_tickets_cancellable", return_value=(rejected, set())),
+			patch("cheese.api.v1.route_booking_controller.cancel_route_booking") as cancel_route,
+		):
+			result = booking_controller.cancel_booking("BOOKING-1")
+
+		self.assertIs(result, rejected)
+		cancel_route.assert_not_called()
@@ -165,6 +165,31 @@ export default function SupportDetail() {
                         </CardContent>
                     </Card>
 
+                    {/* Notes */}
+                    <Card className="border-border/60 shadow-sm">
+                        <CardHeader className="border-b bg-muted/20 pb-4">
+                            <CardTitle className="text-sm font-semibold text-muted-foreground uppercase flex items-center">
+                                <Clock className="w-4 h-4 mr-2" /> {t("support.notes", "Notes")}
+                            </CardTitle>
+                        </CardHeader>
+                        <CardContent className="p-6">
+                            {supportCase?.notes?.length ? (
+                                <div className="space-y-4">
+                                    {supportCase.notes.map((n) => (
+                                        <div key={n.name} className="space-y-1">
+                                            <p className="text-xs text-muted-foreground">
+                                                {n.author || "—"} • {n.noted_at ? new Date(n.noted_at).toLocaleString() : "—"}
+                                            </p>
+                                            <p className="text-sm whitespace-pre-wrap">{n.note}</p>
+                                        </div>
+                                    ))}
+                                </div>
+                            ) : (
+                                <p className="text-sm text-muted-foreground">{t("support.noNotes", "No notes yet.")}</p>
+                            )}
+                        </CardContent>
+                    </Card>
+
                 </div>
 
                 {/* Right Sidebar */}